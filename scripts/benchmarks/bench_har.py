@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Offline tool benchmark replaying recorded NotebookLM traffic.
+
+Record the page flows once against a live, authenticated account, then
+replay them as often as needed without network access. Replayed responses
+come from the HAR archives, so timings reflect the server and browser
+rather than NotebookLM's backend and are comparable between runs.
+
+Each run starts the server over stdio and calls the given tools in order;
+every call is timed separately.
+
+Usage:
+    # Record (needs authentication; writes notebooklm-data/har/<account>/)
+    uv run python scripts/benchmarks/bench_har.py --mode record --runs 1 \\
+        --call list_notebooks \\
+        --call 'query_notebook={"notebook_id": "abc123", "query": "Summarize"}'
+
+    # Replay the same calls offline
+    uv run python scripts/benchmarks/bench_har.py --runs 5 \\
+        --call list_notebooks \\
+        --call 'query_notebook={"notebook_id": "abc123", "query": "Summarize"}'
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+SRC_DIR = Path(__file__).resolve().parent.parent.parent / "src"
+
+
+def child_env(mode: str, har_dir: str) -> Dict[str, str]:
+    """Environment for the server process, with src/ importable."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH")]))
+    env.setdefault("PYTHONWARNINGS", "ignore")
+    env["NOTEBOOKLM_HAR_MODE"] = mode
+    # Every call should drive the browser, not a cache or prefetch
+    env.setdefault("NOTEBOOKLM_PREFETCH", "false")
+    if har_dir:
+        env["NOTEBOOKLM_HAR_DIR"] = har_dir
+    return env
+
+
+def parse_call(value: str) -> Tuple[str, Dict[str, Any]]:
+    """Parse ``tool`` or ``tool={json arguments}``."""
+    name, _, arguments = value.partition("=")
+    return name.strip(), json.loads(arguments) if arguments else {}
+
+
+async def measure_run(calls: List[Tuple[str, Dict[str, Any]]], env: Dict[str, str]) -> Dict[str, float]:
+    """Start the server and time each call; failed calls are reported and skipped."""
+    from fastmcp import Client
+    from fastmcp.client.transports import StdioTransport
+
+    transport = StdioTransport(
+        command=sys.executable,
+        args=["-m", "notebooklm_mcp.server"],
+        env=env,
+    )
+
+    timings: Dict[str, float] = {}
+    async with Client(transport) as client:
+        for i, (name, arguments) in enumerate(calls):
+            label = f"{i + 1}:{name}"
+            started = time.perf_counter()
+            try:
+                await client.call_tool(name, arguments)
+            except Exception as e:
+                print(f"  {label} failed: {e}", file=sys.stderr)
+                continue
+            timings[label] = time.perf_counter() - started
+    return timings
+
+
+def summarize(samples: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+    """Reduce samples to median/min/max and relative spread."""
+    results = {}
+    for name, values in samples.items():
+        if not values:
+            continue
+        median = statistics.median(values)
+        spread = statistics.pstdev(values) / statistics.mean(values) if len(values) > 1 else 0.0
+        results[name] = {
+            "median": median,
+            "min": min(values),
+            "max": max(values),
+            "cv": spread,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["replay", "record"], default="replay", help="HAR mode (default: replay)")
+    parser.add_argument("--har-dir", default="", help="Archive directory (default: NOTEBOOKLM_HAR_DIR)")
+    parser.add_argument("--call", action="append", default=[], help="Tool call: name or name={json args}")
+    parser.add_argument("--runs", type=int, default=3, help="Number of runs (default: 3)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    calls = [parse_call(value) for value in args.call] or [("list_notebooks", {})]
+    env = child_env(args.mode, args.har_dir)
+    samples: Dict[str, List[float]] = {}
+
+    for run in range(args.runs):
+        for name, value in asyncio.run(measure_run(calls, env)).items():
+            samples.setdefault(name, []).append(value)
+        print(f"  run {run + 1}/{args.runs} done", file=sys.stderr)
+
+    results = summarize(samples)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("=" * 66)
+    print("NotebookLM MCP HAR benchmark")
+    print(f"mode={args.mode}  runs={args.runs}  calls={len(calls)}")
+    print("=" * 66)
+    print(f"{'call':<24}{'median (s)':>12}{'min (s)':>10}{'max (s)':>10}{'cv':>10}")
+    for name, stats in results.items():
+        print(
+            f"{name:<24}{stats['median']:>12.3f}{stats['min']:>10.3f}"
+            f"{stats['max']:>10.3f}{stats['cv']:>10.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
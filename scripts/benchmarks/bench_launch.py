@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Chromium launch profile benchmark.
+
+For each launch profile (NOTEBOOKLM_LAUNCH_PROFILE), measures over several
+runs:
+  - launch time: starting Playwright and Chromium up to the first open page
+  - first-navigation time: loading a URL in that page (``load`` event)
+  - RSS of the browser process tree after the navigation (Linux only; it
+    includes the Playwright driver)
+
+Each run uses a fresh, empty profile directory unless --user-data-dir is
+given, so it is not logged in and NotebookLM redirects to the Google login
+page, which is still a representative first page load.
+
+Usage:
+    uv run python scripts/benchmarks/bench_launch.py
+    uv run python scripts/benchmarks/bench_launch.py --profiles lean,default --runs 5
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "src"))
+
+from notebooklm_mcp.browser import LAUNCH_PROFILES, NotebookLMBrowser  # noqa: E402
+from notebooklm_mcp.governor import process_tree_rss  # noqa: E402
+
+_MB = 1024 * 1024
+
+
+async def measure_run(profile: str, url: str, user_data_dir: Optional[str]) -> Dict[str, float]:
+    """Launch one browser with the profile and time launch and first navigation."""
+    with tempfile.TemporaryDirectory(prefix="bench-launch-") as tmp:
+        browser = NotebookLMBrowser(headless=True, user_data_dir=user_data_dir or tmp, launch_profile=profile)
+
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
+        await browser.__aenter__()
+        try:
+            timings["launch"] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            await browser.page.goto(url, wait_until="load")
+            timings["first_navigation"] = time.perf_counter() - started
+
+            pid = browser.driver_pid
+            rss = await asyncio.to_thread(process_tree_rss, pid) if pid else None
+            if rss:
+                timings["rss_mb"] = rss / _MB
+        finally:
+            await browser.__aexit__(None, None, None)
+        return timings
+
+
+def summarize(samples: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+    """Reduce samples to median/min/max."""
+    return {
+        name: {
+            "median": statistics.median(values),
+            "min": min(values),
+            "max": max(values),
+        }
+        for name, values in samples.items() if values
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", default="default,lean", help="Comma-separated launch profiles (default: default,lean)")
+    parser.add_argument("--runs", type=int, default=3, help="Number of runs per profile (default: 3)")
+    parser.add_argument("--url", default="https://notebooklm.google.com", help="URL of the first navigation")
+    parser.add_argument("--user-data-dir", default=None, help="Browser profile to launch with (default: a fresh one per run)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    profiles = [name.strip() for name in args.profiles.split(",") if name.strip()]
+    for name in profiles:
+        if name not in LAUNCH_PROFILES:
+            parser.error(f"unknown profile '{name}' (choose from {', '.join(LAUNCH_PROFILES)})")
+
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for name in profiles:
+        samples: Dict[str, List[float]] = {"launch": [], "first_navigation": [], "rss_mb": []}
+        for run in range(args.runs):
+            for metric, value in asyncio.run(measure_run(name, args.url, args.user_data_dir)).items():
+                samples[metric].append(value)
+            print(f"  {name}: run {run + 1}/{args.runs} done", file=sys.stderr)
+        results[name] = summarize(samples)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("=" * 64)
+    print("NotebookLM MCP launch profile benchmark")
+    print(f"runs={args.runs}  url={args.url}")
+    print("=" * 64)
+    print(f"{'profile':<10}{'metric':<18}{'median':>12}{'min':>12}{'max':>12}")
+    for name, metrics in results.items():
+        for metric, stats in metrics.items():
+            unit = "MB" if metric == "rss_mb" else "s"
+            print(
+                f"{name:<10}{metric + ' (' + unit + ')':<18}"
+                f"{stats['median']:>12.3f}{stats['min']:>12.3f}{stats['max']:>12.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for the NotebookLM MCP server.
+
+Measures, over several runs:
+  - import time of notebooklm_mcp.server in a fresh interpreter
+  - time from process launch to an initialized stdio MCP session
+  - time to list tools
+  - time to the first tool call (default: list_notebooks, needs authentication)
+
+Usage:
+    uv run python scripts/benchmarks/bench_startup.py
+    uv run python scripts/benchmarks/bench_startup.py --runs 5 --tool none
+    NOTEBOOKLM_PREWARM=false uv run python scripts/benchmarks/bench_startup.py
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SRC_DIR = Path(__file__).resolve().parent.parent.parent / "src"
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); "
+    "import notebooklm_mcp.server; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def child_env() -> Dict[str, str]:
+    """Environment for child processes, with src/ importable."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH")]))
+    env.setdefault("PYTHONWARNINGS", "ignore")
+    return env
+
+
+def measure_import() -> float:
+    """Import the server module in a fresh interpreter and return seconds."""
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        env=child_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+async def measure_session(tool: Optional[str]) -> Dict[str, float]:
+    """Launch the server over stdio and time the first interactions."""
+    from fastmcp import Client
+    from fastmcp.client.transports import StdioTransport
+
+    transport = StdioTransport(
+        command=sys.executable,
+        args=["-m", "notebooklm_mcp.server"],
+        env=child_env(),
+    )
+
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    async with Client(transport) as client:
+        timings["initialize"] = time.perf_counter() - started
+
+        await client.list_tools()
+        timings["list_tools"] = time.perf_counter() - started
+
+        if tool:
+            try:
+                await client.call_tool(tool, {})
+                timings["first_tool_call"] = time.perf_counter() - started
+            except Exception as e:
+                print(f"  {tool} failed: {e}", file=sys.stderr)
+    return timings
+
+
+def summarize(samples: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+    """Reduce samples to median/min/max."""
+    return {
+        name: {
+            "median": statistics.median(values),
+            "min": min(values),
+            "max": max(values),
+        }
+        for name, values in samples.items() if values
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="Number of runs (default: 3)")
+    parser.add_argument("--tool", default="list_notebooks", help="First tool to call, or 'none'")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    tool = None if args.tool.lower() == "none" else args.tool
+    samples: Dict[str, List[float]] = {
+        "import": [], "initialize": [], "list_tools": [], "first_tool_call": [],
+    }
+
+    for run in range(args.runs):
+        samples["import"].append(measure_import())
+        for name, value in asyncio.run(measure_session(tool)).items():
+            samples[name].append(value)
+        print(f"  run {run + 1}/{args.runs} done", file=sys.stderr)
+
+    results = summarize(samples)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("=" * 60)
+    print("NotebookLM MCP startup benchmark")
+    print(f"prewarm={os.getenv('NOTEBOOKLM_PREWARM', 'true')}  runs={args.runs}  tool={tool}")
+    print("=" * 60)
+    print(f"{'phase':<18}{'median (s)':>14}{'min (s)':>12}{'max (s)':>12}")
+    for name, stats in results.items():
+        print(f"{name:<18}{stats['median']:>14.3f}{stats['min']:>12.3f}{stats['max']:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
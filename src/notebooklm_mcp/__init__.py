@@ -2,7 +2,15 @@
 
 __version__ = "0.1.0"
 
-from .server import mcp, main
-from .browser import NotebookLMBrowser, AuthenticationError
-
 __all__ = ["mcp", "main", "NotebookLMBrowser", "AuthenticationError"]
+
+
+def __getattr__(name):
+    # Resolve exports lazily so importing a submodule does not load the whole server
+    if name in ("mcp", "main"):
+        from . import server
+        return getattr(server, name)
+    if name in ("NotebookLMBrowser", "AuthenticationError"):
+        from . import browser
+        return getattr(browser, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
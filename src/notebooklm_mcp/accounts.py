@@ -0,0 +1,799 @@
+"""
+Multi-account browser pool for NotebookLM automation.
+
+Each account is an authenticated Google profile (a persistent Chrome profile
+or a Playwright storage state file) with its own browser context and a
+bounded number of pages. Calls are routed to an account that can reach the
+target notebook and still has quota and capacity left.
+"""
+import asyncio
+import json
+import os
+import shutil
+import time
+from contextlib import asynccontextmanager
+from datetime import date
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set
+
+from .browser import (
+    NotebookLMBrowser,
+    AuthenticationError,
+    DEFAULT_USER_DATA_DIR,
+    is_browser_crash,
+    get_browser_endpoint,
+    get_browser_protocol,
+    get_har_dir,
+)
+from .calls import budget, current_call, set_phase, start_background_task
+from .governor import BROWSER_RSS, PAGE_JS_HEAP_MAX, PAGE_JS_HEAP_TOTAL, RECYCLES, MemoryGovernor, PageInfo
+from .metrics import REGISTRY
+from .recorder import capture_outlier, watch_page
+
+
+# Consecutive browser-level failures before an account is taken out of rotation
+FAILURE_THRESHOLD = 3
+# How long an account stays out of rotation after repeated failures
+FAILURE_COOLDOWN_SECONDS = 60
+# How long to wait before re-checking an account that failed authentication
+AUTH_COOLDOWN_SECONDS = 300
+
+# Profile entries not worth copying into per-worker profiles
+_PROFILE_COPY_IGNORE = shutil.ignore_patterns(
+    "Singleton*", "*.lock", "Cache", "Code Cache", "GPUCache", "CacheStorage", "ScriptCache",
+)
+
+AUTH_ERROR_MESSAGE = "Not authenticated. Run: python scripts/setup_auth.py"
+
+NOTEBOOKLM_HOME_URL = "https://notebooklm.google.com"
+
+ACCOUNT_HEALTHY = REGISTRY.gauge(
+    "notebooklm_account_healthy",
+    "1 if the account is eligible for routing, 0 while it is cooling down",
+    ["account"],
+)
+ACCOUNT_IN_FLIGHT = REGISTRY.gauge(
+    "notebooklm_account_in_flight",
+    "Calls currently holding a page of the account",
+    ["account"],
+)
+ACCOUNT_CAPACITY = REGISTRY.gauge(
+    "notebooklm_account_capacity",
+    "Maximum number of concurrent pages for the account",
+    ["account"],
+)
+ACCOUNT_IDLE_PAGES = REGISTRY.gauge(
+    "notebooklm_account_idle_pages",
+    "Open pages of the account waiting for the next call",
+    ["account"],
+)
+ACCOUNT_QUOTA_REMAINING = REGISTRY.gauge(
+    "notebooklm_account_quota_remaining",
+    "Remaining daily query quota of the account (-1 when unlimited)",
+    ["account"],
+)
+ACCOUNT_CALLS = REGISTRY.counter(
+    "notebooklm_account_calls_total",
+    "Calls routed to the account by outcome",
+    ["account", "outcome"],
+)
+BROWSER_CRASHES = REGISTRY.counter(
+    "notebooklm_browser_crashes_total",
+    "Crashed pages and disconnected browsers detected, by scope",
+    ["account", "scope"],
+)
+
+
+class PoolBusyError(RuntimeError):
+    """Raised when a background lease would compete with foreground calls."""
+    pass
+
+
+def get_default_max_pages() -> int:
+    """Get the default per-account page limit from environment variable."""
+    return max(1, int(os.getenv("NOTEBOOKLM_MAX_PAGES", "2")))
+
+
+class Account:
+    """One authenticated Google account and its browser resources."""
+
+    def __init__(
+        self,
+        name: str,
+        user_data_dir: Optional[str] = None,
+        storage_state: Optional[str] = None,
+        notebooks: Optional[Iterable[str]] = None,
+        daily_quota: Optional[int] = None,
+        max_concurrency: int = 2,
+        browser_endpoint: Optional[str] = None
+    ):
+        """
+        Initialize account.
+
+        Args:
+            name: Unique account name used in routing and metrics
+            user_data_dir: Path to persistent Chrome profile
+            storage_state: Path to Playwright storage state file
+            notebooks: Notebook IDs the account can reach. None means any
+                notebook; an explicit list restricts routing to those IDs.
+            daily_quota: Maximum number of queries per day (None for unlimited)
+            max_concurrency: Maximum number of pages used at the same time
+            browser_endpoint: External browser to connect to instead of
+                launching one (default from ``NOTEBOOKLM_BROWSER_ENDPOINT``)
+        """
+        self.name = name
+        self.user_data_dir = user_data_dir
+        self.storage_state = storage_state
+        self.restricted = notebooks is not None
+        self.notebooks: Set[str] = set(notebooks or [])
+        self.daily_quota = daily_quota
+        self.max_concurrency = max(1, max_concurrency)
+        self.browser_endpoint = browser_endpoint
+
+        self.browser: Optional[NotebookLMBrowser] = None
+        self.idle_pages: List[Any] = []
+        self.page_info: Dict[Any, PageInfo] = {}
+        self.recycle_reason: Optional[str] = None
+        self.rss: Optional[int] = None
+        self.in_flight = 0
+        self.authenticated: Optional[bool] = None
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+        self.last_error: Optional[str] = None
+        self.start_lock = asyncio.Lock()
+
+        self._quota_day = date.today()
+        self._quota_used = 0
+
+    def knows(self, notebook_id: str) -> bool:
+        """Check whether the notebook is known to be reachable from this account."""
+        return notebook_id in self.notebooks
+
+    @property
+    def quota_remaining(self) -> Optional[int]:
+        """Queries left today, or None when the account has no quota."""
+        if self.daily_quota is None:
+            return None
+        today = date.today()
+        if today != self._quota_day:
+            self._quota_day = today
+            self._quota_used = 0
+        return max(0, self.daily_quota - self._quota_used)
+
+    def consume_quota(self) -> None:
+        """Count one query against today's quota."""
+        if self.quota_remaining is not None:
+            self._quota_used += 1
+
+    def refund_quota(self) -> None:
+        """Return a query counted by ``consume_quota`` that was not sent."""
+        if self.quota_remaining is not None and self._quota_used > 0:
+            self._quota_used -= 1
+
+    @property
+    def is_warm(self) -> bool:
+        """True once the browser is running and the session is authenticated."""
+        return self.browser is not None and bool(self.authenticated)
+
+    def is_healthy(self) -> bool:
+        """Check whether the account is currently eligible for routing."""
+        return time.monotonic() >= self.unhealthy_until
+
+    @property
+    def load(self) -> float:
+        """Fraction of the account's page capacity in use."""
+        return self.in_flight / self.max_concurrency
+
+    def record_success(self) -> None:
+        """Reset failure tracking after a successful call."""
+        self.consecutive_failures = 0
+        self.last_error = None
+
+    def record_failure(self, error: str, auth: bool = False) -> None:
+        """
+        Record a browser-level failure and cool the account down if needed.
+
+        Args:
+            error: Error description
+            auth: True if the failure was an authentication failure
+        """
+        self.last_error = error
+        if auth:
+            self.authenticated = False
+            self.unhealthy_until = time.monotonic() + AUTH_COOLDOWN_SECONDS
+            return
+
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= FAILURE_THRESHOLD:
+            self.unhealthy_until = time.monotonic() + FAILURE_COOLDOWN_SECONDS
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Describe health and load of the account.
+
+        Returns:
+            Account status dictionary
+        """
+        return {
+            "name": self.name,
+            "healthy": self.is_healthy(),
+            "authenticated": self.authenticated,
+            "browser_running": self.browser is not None,
+            "warm": self.is_warm,
+            "in_flight": self.in_flight,
+            "capacity": self.max_concurrency,
+            "idle_pages": len(self.idle_pages),
+            "rss_bytes": self.rss,
+            "quota_remaining": self.quota_remaining,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+        }
+
+
+class PageLease:
+    """A page checked out from an account for the duration of one call."""
+
+    def __init__(self, account: Account, page):
+        self.account = account
+        self.page = page
+
+    def _browser(self) -> NotebookLMBrowser:
+        browser = self.account.browser
+        if browser is None:
+            # Detached after a crash while the page was leased
+            raise RuntimeError(f"Browser of account {self.account.name} is not running")
+        return browser
+
+    async def goto(self, url: str, wait_until: str = "networkidle") -> None:
+        """Navigate the leased page to URL."""
+        await self._browser().goto(url, wait_until=wait_until, page=self.page)
+
+    async def wait_for_selector(self, selector: str, timeout: Optional[int] = None) -> None:
+        """Wait for selector to appear on the leased page."""
+        await self._browser().wait_for_selector(selector, timeout=timeout, page=self.page)
+
+    async def check_authentication(self) -> bool:
+        """Check if the leased page's account is authenticated to NotebookLM."""
+        return await self._browser().check_authentication(page=self.page)
+
+
+class AccountPool:
+    """Routes calls to accounts by notebook reachability, quota and load."""
+
+    def __init__(
+        self,
+        accounts: List[Account],
+        headless: bool = True,
+        timeout: int = 30000,
+        governor: Optional[MemoryGovernor] = None,
+        har_mode: str = "off",
+        launch_profile: str = "default"
+    ):
+        """
+        Initialize account pool.
+
+        Args:
+            accounts: Accounts to manage
+            headless: Run browsers in headless mode
+            timeout: Default browser timeout in milliseconds
+            governor: Memory governor deciding when to recycle pages and contexts
+            har_mode: HAR record/replay mode of the browsers; archives are
+                kept per account under ``NOTEBOOKLM_HAR_DIR``
+            launch_profile: Chromium launch profile of the browsers
+        """
+        if not accounts:
+            raise ValueError("At least one account is required")
+
+        self.accounts: Dict[str, Account] = {}
+        for account in accounts:
+            if account.name in self.accounts:
+                raise ValueError(f"Duplicate account name: {account.name}")
+            self.accounts[account.name] = account
+
+        self.headless = headless
+        self.timeout = timeout
+        self.governor = governor or MemoryGovernor()
+        self.har_mode = har_mode
+        self.launch_profile = launch_profile
+        self._changed: Optional[asyncio.Condition] = None
+        self._governor_task: Optional[asyncio.Task] = None
+        self._waiting = 0
+
+        REGISTRY.add_collector(self._collect_metrics)
+
+    def _condition(self) -> asyncio.Condition:
+        # Created lazily so the condition binds to the running event loop
+        if self._changed is None:
+            self._changed = asyncio.Condition()
+        return self._changed
+
+    def remember_notebooks(self, account_name: str, notebook_ids: Iterable[str]) -> None:
+        """
+        Tag an account with notebooks it has been seen to reach.
+
+        Args:
+            account_name: Account that listed or created the notebooks
+            notebook_ids: Notebook IDs reachable from the account
+        """
+        account = self.accounts.get(account_name)
+        if account:
+            account.notebooks.update(notebook_ids)
+
+    def candidates(self, notebook_id: Optional[str] = None) -> List[Account]:
+        """
+        Get accounts that can reach a notebook, ignoring health and load.
+
+        Args:
+            notebook_id: Target notebook, or None for account-wide calls
+
+        Returns:
+            Accounts eligible for the notebook
+        """
+        accounts = list(self.accounts.values())
+        if notebook_id is None:
+            return accounts
+
+        known = [a for a in accounts if a.knows(notebook_id)]
+        if known:
+            return known
+        # Unknown notebook: only accounts without an explicit notebook list qualify
+        return [a for a in accounts if not a.restricted]
+
+    async def _acquire(
+        self,
+        notebook_id: Optional[str],
+        consumes_quota: bool,
+        account_name: Optional[str],
+        exclude: Set[str],
+        background: bool = False
+    ) -> Account:
+        condition = self._condition()
+        async with condition:
+            while True:
+                if account_name:
+                    if account_name not in self.accounts:
+                        raise ValueError(f"Unknown account: {account_name}")
+                    candidates = [self.accounts[account_name]]
+                else:
+                    candidates = self.candidates(notebook_id)
+
+                if not candidates:
+                    raise RuntimeError(f"No configured account can access notebook {notebook_id}")
+
+                remaining = [a for a in candidates if a.name not in exclude]
+                usable = [
+                    a for a in remaining
+                    if a.is_healthy() and not (consumes_quota and a.quota_remaining == 0)
+                ]
+                if not usable:
+                    if all(a.authenticated is False for a in candidates):
+                        raise AuthenticationError(AUTH_ERROR_MESSAGE)
+                    raise RuntimeError(
+                        "No healthy account with remaining quota"
+                        + (f" for notebook {notebook_id}" if notebook_id else "")
+                    )
+
+                if background:
+                    # Never queue or launch a browser, and always leave a page
+                    # free for foreground calls
+                    free = [a for a in usable if a.is_warm and a.max_concurrency - a.in_flight >= 2]
+                    if self._waiting or not free:
+                        raise PoolBusyError("Account pool is busy with foreground calls")
+                else:
+                    free = [a for a in usable if a.in_flight < a.max_concurrency]
+                if free:
+                    # Least-loaded first; ties go to the account with more headroom
+                    account = min(free, key=lambda a: (a.load, -a.max_concurrency))
+                    account.in_flight += 1
+                    return account
+
+                # Queue for a free page, but not past the call's deadline
+                timeout = budget()
+                self._waiting += 1
+                try:
+                    await asyncio.wait_for(condition.wait(), timeout / 1000 if timeout is not None else None)
+                except asyncio.TimeoutError:
+                    # Only a call's deadline limits the wait
+                    call = current_call()
+                    if call is not None:
+                        raise call.deadline_exceeded()
+                    raise
+                finally:
+                    self._waiting -= 1
+
+    async def _release(self, account: Account) -> None:
+        condition = self._condition()
+        async with condition:
+            account.in_flight -= 1
+            stale = self._detach_if_idle(account)
+            condition.notify_all()
+        if stale:
+            await self._close_browser(stale)
+
+    def _detach_if_idle(self, account: Account) -> Optional[NotebookLMBrowser]:
+        # Must be called with the condition held: in_flight cannot change meanwhile,
+        # so a context is never torn down under a running call
+        if account.recycle_reason is None or account.in_flight > 0 or account.browser is None:
+            return None
+
+        RECYCLES.inc(account=account.name, scope="context", reason=account.recycle_reason)
+        browser = account.browser
+        account.browser = None
+        account.idle_pages = []
+        account.page_info = {}
+        account.authenticated = None
+        account.recycle_reason = None
+        account.rss = None
+        return browser
+
+    async def _close_browser(self, browser: NotebookLMBrowser) -> None:
+        try:
+            await browser.__aexit__(None, None, None)
+        except Exception:
+            pass
+
+    async def _return_page(self, account: Account, page, crashed: bool = False) -> None:
+        info = account.page_info.get(page)
+        if info is None or page.is_closed():
+            # Closed, or belongs to a browser that has since been replaced
+            account.page_info.pop(page, None)
+            return
+
+        if crashed or info.crashed:
+            BROWSER_CRASHES.inc(account=account.name, scope="page")
+            reason: Optional[str] = "crash"
+        else:
+            info.uses += 1
+            await self.governor.measure_page(page, info)
+            reason = self.governor.page_recycle_reason(info)
+            if reason is None:
+                account.idle_pages.append(page)
+                return
+            RECYCLES.inc(account=account.name, scope="page", reason=reason)
+
+        account.page_info.pop(page, None)
+        try:
+            await page.close()
+        except Exception:
+            pass
+
+    def _ensure_governor(self) -> None:
+        if self._governor_task is None and self.governor.limits.check_interval > 0:
+            self._governor_task = start_background_task(self._govern())
+
+    async def _govern(self) -> None:
+        # Periodically measure browser RSS and recycle contexts that grew too large
+        while True:
+            await asyncio.sleep(self.governor.limits.check_interval)
+            for account in self.accounts.values():
+                browser = account.browser
+                if browser is None:
+                    continue
+                try:
+                    account.rss = await self.governor.browser_rss(browser)
+                except Exception:
+                    continue
+                reason = self.governor.context_recycle_reason(account.rss)
+                if reason is None:
+                    continue
+
+                account.recycle_reason = reason
+                condition = self._condition()
+                async with condition:
+                    stale = self._detach_if_idle(account)
+                if stale:
+                    await self._close_browser(stale)
+
+    def _track_page(self, account: Account, page) -> None:
+        info = PageInfo()
+        account.page_info[page] = info
+        page.on("crash", lambda _: setattr(info, "crashed", True))
+
+    async def _detach_dead_browser(self, account: Account) -> None:
+        # A crashed or disconnected browser is dropped at once, even with calls
+        # in flight: their pages are dead too, and the next lease relaunches it
+        browser = account.browser
+        if browser is None or browser.is_alive:
+            return
+
+        BROWSER_CRASHES.inc(account=account.name, scope="browser")
+        account.browser = None
+        account.idle_pages = []
+        account.page_info = {}
+        account.authenticated = None
+        account.recycle_reason = None
+        await self._close_browser(browser)
+
+    async def _checkout_page(self, account: Account):
+        async with account.start_lock:
+            await self._detach_dead_browser(account)
+            if account.browser is None:
+                browser = NotebookLMBrowser(
+                    headless=self.headless,
+                    user_data_dir=account.user_data_dir,
+                    timeout=self.timeout,
+                    storage_state=account.storage_state,
+                    har_mode=self.har_mode,
+                    har_dir=str(get_har_dir() / account.name) if self.har_mode != "off" else None,
+                    launch_profile=self.launch_profile,
+                    endpoint=account.browser_endpoint or get_browser_endpoint(),
+                    protocol=get_browser_protocol(),
+                )
+                await browser.__aenter__()
+                account.browser = browser
+                account.idle_pages = [browser.page]
+                account.page_info = {}
+                self._track_page(account, browser.page)
+                account.authenticated = None
+
+            if not account.authenticated:
+                # Navigates the page to the NotebookLM home page (the app shell)
+                page = account.idle_pages[-1] if account.idle_pages else account.browser.page
+                account.authenticated = await account.browser.check_authentication(page=page)
+                if not account.authenticated:
+                    raise AuthenticationError(AUTH_ERROR_MESSAGE)
+
+        while account.idle_pages:
+            page = account.idle_pages.pop()
+            if not page.is_closed():
+                return page
+            account.page_info.pop(page, None)
+
+        page = await account.browser.new_page()
+        self._track_page(account, page)
+        return page
+
+    @asynccontextmanager
+    async def lease(
+        self,
+        notebook_id: Optional[str] = None,
+        consumes_quota: bool = False,
+        account: Optional[str] = None,
+        background: bool = False
+    ) -> AsyncIterator[PageLease]:
+        """
+        Check out a page from the best account for a call.
+
+        Args:
+            notebook_id: Target notebook, used to pick an account that can reach it
+            consumes_quota: True if the call counts against the daily query quota
+            account: Pin the call to a specific account by name
+            background: Low-priority work: fail instead of waiting, and only
+                take a page if no call is queued and the account keeps a
+                free page for foreground calls
+
+        Yields:
+            Page lease exposing the page and navigation helpers
+
+        Raises:
+            AuthenticationError: If no eligible account is authenticated
+            RuntimeError: If no eligible account is healthy or has quota left
+            PoolBusyError: If a background lease would compete with foreground calls
+        """
+        self._ensure_governor()
+        set_phase("acquire_page")
+        tried: Set[str] = set()
+        while True:
+            selected = await self._acquire(notebook_id, consumes_quota, account, tried, background)
+            try:
+                page = await self._checkout_page(selected)
+            except AuthenticationError as e:
+                selected.record_failure(str(e), auth=True)
+                ACCOUNT_CALLS.inc(account=selected.name, outcome="auth_failed")
+                await self._release(selected)
+                tried.add(selected.name)
+                continue
+            except asyncio.CancelledError:
+                ACCOUNT_CALLS.inc(account=selected.name, outcome="cancelled")
+                await asyncio.shield(self._release(selected))
+                raise
+            except BaseException as e:
+                selected.record_failure(str(e) or type(e).__name__)
+                ACCOUNT_CALLS.inc(account=selected.name, outcome="launch_failed")
+                await self._release(selected)
+                raise
+            break
+
+        if consumes_quota:
+            selected.consume_quota()
+
+        crashed = False
+        cancelled = False
+        try:
+            # Bounds steps without a timeout of their own (clicks, fills) by the deadline
+            page.set_default_timeout(budget(self.timeout))
+            watch_page(page)
+            yield PageLease(selected, page)
+        except asyncio.CancelledError:
+            cancelled = True
+            ACCOUNT_CALLS.inc(account=selected.name, outcome="cancelled")
+            raise
+        except BaseException as e:
+            crashed = page.is_closed() or is_browser_crash(e)
+            if crashed:
+                # The page or browser died under the call: an account health issue
+                selected.record_failure(str(e) or type(e).__name__)
+                await self._detach_dead_browser(selected)
+            else:
+                await capture_outlier(page, e)
+            ACCOUNT_CALLS.inc(account=selected.name, outcome="crashed" if crashed else "error")
+            raise
+        else:
+            selected.record_success()
+            ACCOUNT_CALLS.inc(account=selected.name, outcome="success")
+            await capture_outlier(page)
+        finally:
+            watch_page(None)
+            # Shielded: a cancelled call is cancelled again at every await, and
+            # must still give its page and slot back
+            await asyncio.shield(self._finish_lease(selected, page, crashed, discard=cancelled))
+
+    async def _finish_lease(self, account: Account, page, crashed: bool, discard: bool) -> None:
+        try:
+            if discard:
+                # A call abandoned mid-step may leave a dialog open or an answer
+                # streaming in, and its Playwright waits still pending in the
+                # driver: closing the page ends them, and the slot gets a fresh page
+                account.page_info.pop(page, None)
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+            else:
+                # Between calls: the governor may recycle the page instead of pooling it
+                await self._return_page(account, page, crashed=crashed)
+        finally:
+            await self._release(account)
+
+    async def prewarm(self, pages: int = 1) -> None:
+        """
+        Launch browsers, check authentication and load the app shell ahead of calls.
+
+        Args:
+            pages: Number of pages per account to keep open on the NotebookLM
+                home page (capped at the account's capacity)
+
+        Raises:
+            Exception: The first failure, if no account could be warmed
+        """
+        results = await asyncio.gather(
+            *(self._prewarm_account(account, pages) for account in self.accounts.values()),
+            return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors and len(errors) == len(results):
+            raise errors[0]
+
+    async def _prewarm_account(self, account: Account, pages: int) -> None:
+        # A lease launches the browser and runs the authentication check,
+        # which leaves its page on the NotebookLM home page
+        async with self.lease(account=account.name):
+            pass
+
+        target = min(pages, account.max_concurrency)
+        while account.browser is not None and len(account.idle_pages) < target:
+            page = await account.browser.new_page()
+            self._track_page(account, page)
+            await account.browser.goto(NOTEBOOKLM_HOME_URL, page=page)
+            account.idle_pages.append(page)
+
+    async def close(self) -> None:
+        """Close all account browsers."""
+        if self._governor_task is not None:
+            self._governor_task.cancel()
+            self._governor_task = None
+        for account in self.accounts.values():
+            browser, account.browser = account.browser, None
+            account.idle_pages = []
+            account.page_info = {}
+            if browser:
+                await self._close_browser(browser)
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Describe health and load of every account."""
+        return [account.status() for account in self.accounts.values()]
+
+    def _collect_metrics(self) -> None:
+        for account in self.accounts.values():
+            ACCOUNT_HEALTHY.set(1 if account.is_healthy() else 0, account=account.name)
+            ACCOUNT_IN_FLIGHT.set(account.in_flight, account=account.name)
+            ACCOUNT_CAPACITY.set(account.max_concurrency, account=account.name)
+            ACCOUNT_IDLE_PAGES.set(len(account.idle_pages), account=account.name)
+            remaining = account.quota_remaining
+            ACCOUNT_QUOTA_REMAINING.set(-1 if remaining is None else remaining, account=account.name)
+            if account.browser is None:
+                BROWSER_RSS.set(0, account=account.name)
+            elif account.rss is not None:
+                BROWSER_RSS.set(account.rss, account=account.name)
+            heaps = [info.js_heap for info in account.page_info.values() if info.js_heap]
+            PAGE_JS_HEAP_MAX.set(max(heaps, default=0), account=account.name)
+            PAGE_JS_HEAP_TOTAL.set(sum(heaps), account=account.name)
+
+
+def worker_profile_dir(user_data_dir: Optional[str], worker_id: int) -> str:
+    """
+    Get a private copy of a Chrome profile for a browser worker process.
+
+    Chrome locks a profile to a single running browser, so each worker gets
+    its own copy, refreshed from the original on every worker start. Paths
+    containing ``{worker}`` are used as-is with the worker ID substituted.
+
+    Args:
+        user_data_dir: Original profile path (None for the default profile)
+        worker_id: Index of the worker process
+
+    Returns:
+        Profile path for the worker
+    """
+    source = str(user_data_dir or DEFAULT_USER_DATA_DIR)
+    if "{worker}" in source:
+        return source.format(worker=worker_id)
+
+    target = Path(f"{source.rstrip(os.sep)}-worker-{worker_id}")
+    if Path(source).is_dir():
+        shutil.rmtree(target, ignore_errors=True)
+        shutil.copytree(source, target, ignore=_PROFILE_COPY_IGNORE, dirs_exist_ok=True)
+    return str(target)
+
+
+def load_accounts(config: Optional[str] = None) -> List[Account]:
+    """
+    Load account definitions.
+
+    The configuration comes from ``NOTEBOOKLM_ACCOUNTS`` unless given: either
+    inline JSON or a path to a JSON file holding a list of objects with
+    ``name``, ``user_data_dir`` or ``storage_state``, ``notebooks`` (list of
+    IDs, or ``"*"`` for any), ``daily_quota``, ``max_concurrency`` and
+    ``browser_endpoint``.
+    Without configuration a single account using the default profile is used.
+    Inside a browser worker process, profiles are replaced by per-worker copies.
+
+    Args:
+        config: Inline JSON or path to a JSON file
+
+    Returns:
+        List of accounts
+    """
+    config = config if config is not None else os.getenv("NOTEBOOKLM_ACCOUNTS", "")
+    default_pages = get_default_max_pages()
+    worker_id = os.getenv("NOTEBOOKLM_WORKER_ID")
+
+    def profile(user_data_dir: Optional[str], storage_state: Optional[str]) -> Optional[str]:
+        if worker_id is None or storage_state:
+            return user_data_dir
+        return worker_profile_dir(user_data_dir, int(worker_id))
+
+    if not config.strip():
+        return [Account("default", user_data_dir=profile(None, None), max_concurrency=default_pages)]
+
+    base_dir = Path.cwd()
+    if config.lstrip().startswith(("[", "{")):
+        entries = json.loads(config)
+    else:
+        path = Path(config).expanduser()
+        entries = json.loads(path.read_text())
+        base_dir = path.parent
+
+    if isinstance(entries, dict):
+        entries = entries.get("accounts", [entries])
+
+    def resolve(value: Optional[str]) -> Optional[str]:
+        if not value:
+            return None
+        path = Path(value).expanduser()
+        return str(path if path.is_absolute() else base_dir / path)
+
+    accounts = []
+    for i, entry in enumerate(entries):
+        notebooks = entry.get("notebooks", "*")
+        storage_state = resolve(entry.get("storage_state"))
+        accounts.append(Account(
+            name=entry.get("name") or f"account-{i + 1}",
+            user_data_dir=profile(resolve(entry.get("user_data_dir")), storage_state),
+            storage_state=storage_state,
+            notebooks=None if notebooks in ("*", None) or "*" in notebooks else notebooks,
+            daily_quota=entry.get("daily_quota"),
+            max_concurrency=int(entry.get("max_concurrency", default_pages)),
+            browser_endpoint=entry.get("browser_endpoint"),
+        ))
+    return accounts
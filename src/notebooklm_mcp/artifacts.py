@@ -0,0 +1,105 @@
+"""
+Content-addressed store for generated artifacts (study guides).
+
+Generated text is stored once per content digest under
+``NOTEBOOKLM_DATA_DIR/artifacts/objects``; an index maps a notebook, an
+artifact type and the digest of the notebook's sources at generation time
+to that object. ``generate_study_guide`` serves a stored artifact instead of
+generating again while the sources are unchanged, and ``get_study_guide``
+reads artifacts without touching the browser.
+"""
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .metrics import REGISTRY
+from .storage import JsonFile, atomic_write, get_data_dir
+
+
+ARTIFACT_LOOKUPS = REGISTRY.counter(
+    "notebooklm_artifact_lookups_total",
+    "Artifact store lookups by generate_study_guide, by result",
+    ["result"],
+)
+
+
+def get_guide_timeout() -> int:
+    """Get the study guide generation timeout in milliseconds from environment variable."""
+    return int(float(os.getenv("NOTEBOOKLM_GUIDE_TIMEOUT", "120")) * 1000)
+
+
+class ArtifactStore:
+    """Generated text keyed by notebook, artifact type and source digest."""
+
+    def __init__(self, directory: Optional[Path] = None):
+        """
+        Initialize store.
+
+        Args:
+            directory: Store directory (default: ``artifacts`` in the data directory)
+        """
+        self.directory = Path(directory) if directory else get_data_dir() / "artifacts"
+        self._index = JsonFile(self.directory / "index.json")
+
+    def _object_path(self, digest: str) -> Path:
+        return self.directory / "objects" / digest[:2] / f"{digest[2:]}.md"
+
+    def _read(self, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        try:
+            content = self._object_path(entry["sha256"]).read_text(encoding="utf-8")
+        except OSError:
+            return None
+        return {"artifact": dict(entry), "content": content}
+
+    def get(self, notebook_id: str, kind: str, sources_digest: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Look up an artifact.
+
+        Args:
+            notebook_id: Notebook ID
+            kind: Artifact type, e.g. a study guide type
+            sources_digest: Source digest the artifact must have been
+                generated from, or None for the newest one
+
+        Returns:
+            Dictionary with ``artifact`` (metadata) and ``content``, or None
+        """
+        entries = self._index.data.get(notebook_id, {}).get(kind, {})
+        if sources_digest is not None:
+            entry = entries.get(sources_digest)
+        else:
+            entry = max(entries.values(), key=lambda e: e["created_at"], default=None)
+        return self._read(entry) if entry is not None else None
+
+    def put(self, notebook_id: str, kind: str, sources_digest: str, content: str) -> Dict[str, Any]:
+        """
+        Store an artifact.
+
+        Args:
+            notebook_id: Notebook ID
+            kind: Artifact type
+            sources_digest: Digest of the sources the artifact was generated from
+            content: Artifact text
+
+        Returns:
+            Artifact metadata
+        """
+        data = content.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not path.exists():
+            atomic_write(path, data)
+
+        entry = {
+            "notebook_id": notebook_id,
+            "type": kind,
+            "sources_digest": sources_digest,
+            "sha256": digest,
+            "bytes": len(data),
+            "created_at": time.time(),
+        }
+        with self._index.update() as index:
+            index.setdefault(notebook_id, {}).setdefault(kind, {})[sources_digest] = entry
+        return dict(entry)
@@ -1,7 +1,136 @@
 """Browser automation manager for NotebookLM."""
+import asyncio
+import os
+import time
 from pathlib import Path
-from typing import Optional
-from playwright.async_api import async_playwright, Browser, BrowserContext, Page, TimeoutError as PlaywrightTimeoutError
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from .storage import get_data_dir
+
+if TYPE_CHECKING:
+    # Playwright is imported lazily so server startup does not pay for it
+    from playwright.async_api import Browser, BrowserContext, Page
+
+
+# Default persistent profile location (project root)
+DEFAULT_USER_DATA_DIR = Path(__file__).parent.parent.parent / "chrome-user-data"
+
+
+# Error messages Playwright uses when the page, context or browser went away
+_CRASH_MARKERS = (
+    "target page, context or browser has been closed",
+    "target closed",
+    "target crashed",
+    "page crashed",
+    "browser has been closed",
+    "browser closed",
+    "has been disconnected",
+    "connection closed",
+)
+
+
+HAR_MODES = ("off", "record", "replay")
+
+# Chromium launch settings by profile name. ``lean`` trims what a headless
+# automation browser does not need; ``debug`` shows the browser and slows
+# every action down so it can be watched.
+LAUNCH_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {
+        "viewport": {"width": 1920, "height": 1080},
+        "args": [],
+    },
+    "lean": {
+        # No channel: headless Chromium already runs as the headless shell
+        # (Playwright 1.49+), or in the old headless mode it is built from.
+        # The viewport is still wide enough for NotebookLM's desktop layout
+        "viewport": {"width": 1280, "height": 800},
+        "args": [
+            "--disable-gpu",
+            "--disable-extensions",
+            "--disable-component-extensions-with-background-pages",
+            "--disable-background-networking",
+            "--disable-component-update",
+            "--disable-default-apps",
+            "--disable-sync",
+            "--no-first-run",
+            "--mute-audio",
+        ],
+        "renderer_process_limit": True,
+    },
+    "debug": {
+        "headless": False,
+        "slow_mo": 250,
+        "viewport": {"width": 1920, "height": 1080},
+        "args": [],
+    },
+}
+
+
+def get_har_mode() -> str:
+    """Get the HAR record/replay mode from environment variable."""
+    mode = os.getenv("NOTEBOOKLM_HAR_MODE", "off").lower()
+    if mode not in HAR_MODES:
+        raise ValueError(f"NOTEBOOKLM_HAR_MODE must be one of {', '.join(HAR_MODES)}, got '{mode}'")
+    return mode
+
+
+def get_launch_profile() -> str:
+    """Get the Chromium launch profile from environment variable."""
+    profile = os.getenv("NOTEBOOKLM_LAUNCH_PROFILE", "default").lower()
+    if profile not in LAUNCH_PROFILES:
+        raise ValueError(
+            f"NOTEBOOKLM_LAUNCH_PROFILE must be one of {', '.join(LAUNCH_PROFILES)}, got '{profile}'"
+        )
+    return profile
+
+
+def get_renderer_process_limit() -> int:
+    """Get the renderer process cap of the lean launch profile from environment variable."""
+    return max(1, int(os.getenv("NOTEBOOKLM_RENDERER_PROCESS_LIMIT", "4")))
+
+
+BROWSER_PROTOCOLS = ("cdp", "playwright")
+
+# Connection attempts to an external browser, with backoff in between
+CONNECT_ATTEMPTS = 3
+CONNECT_BACKOFF_SECONDS = 1.0
+
+
+def get_browser_endpoint() -> Optional[str]:
+    """Get the endpoint of an external browser to connect to from environment variable."""
+    return os.getenv("NOTEBOOKLM_BROWSER_ENDPOINT") or None
+
+
+def get_browser_protocol() -> str:
+    """Get the protocol spoken by the external browser endpoint from environment variable."""
+    protocol = os.getenv("NOTEBOOKLM_BROWSER_PROTOCOL", "cdp").lower()
+    if protocol not in BROWSER_PROTOCOLS:
+        raise ValueError(
+            f"NOTEBOOKLM_BROWSER_PROTOCOL must be one of {', '.join(BROWSER_PROTOCOLS)}, got '{protocol}'"
+        )
+    return protocol
+
+
+def get_har_dir() -> Path:
+    """Get the directory of recorded HAR archives from environment variable."""
+    value = os.getenv("NOTEBOOKLM_HAR_DIR")
+    return Path(value).expanduser() if value else get_data_dir() / "har"
+
+
+def har_archives(directory: Path) -> List[Path]:
+    """
+    List the HAR archives in a directory, oldest first.
+
+    Args:
+        directory: Directory the archives were recorded to
+
+    Returns:
+        Paths of ``.har`` and ``.zip`` archives
+    """
+    if not directory.is_dir():
+        return []
+    archives = [path for path in directory.iterdir() if path.suffix in (".har", ".zip")]
+    return sorted(archives, key=lambda path: (path.stat().st_mtime_ns, path.name))
 
 
 class AuthenticationError(Exception):
@@ -9,6 +138,27 @@ class AuthenticationError(Exception):
     pass
 
 
+def is_browser_crash(error: Optional[BaseException]) -> bool:
+    """
+    Check whether an error (or any error it was raised from) means the
+    browser, context or page crashed or was closed.
+
+    Args:
+        error: Exception to inspect
+
+    Returns:
+        True for disconnected browsers, crashed pages and target-closed errors
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        message = str(error).lower()
+        if type(error).__name__ == "TargetClosedError" or any(marker in message for marker in _CRASH_MARKERS):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
 class NotebookLMBrowser:
     """Manages Playwright browser context for NotebookLM automation."""
 
@@ -16,7 +166,13 @@ class NotebookLMBrowser:
         self,
         headless: bool = True,
         user_data_dir: Optional[str] = None,
-        timeout: int = 30000
+        timeout: int = 30000,
+        storage_state: Optional[str] = None,
+        har_mode: str = "off",
+        har_dir: Optional[str] = None,
+        launch_profile: str = "default",
+        endpoint: Optional[str] = None,
+        protocol: str = "cdp"
     ):
         """
         Initialize browser manager.
@@ -25,106 +181,347 @@ class NotebookLMBrowser:
             headless: Run browser in headless mode
             user_data_dir: Path to persistent Chrome profile
             timeout: Default timeout in milliseconds
+            storage_state: Path to a Playwright storage state file. When set,
+                a fresh (non-persistent) context is created from it instead
+                of opening the persistent profile.
+            har_mode: ``record`` to save the browser's traffic as a HAR
+                archive in ``har_dir`` when the context closes, ``replay``
+                to serve all traffic from the archives in ``har_dir``
+                without network access, or ``off``
+            har_dir: Directory of HAR archives (required unless ``off``)
+            launch_profile: Name of the Chromium launch settings in
+                ``LAUNCH_PROFILES`` (``default``, ``lean`` or ``debug``)
+            endpoint: Connect to this already running browser instead of
+                launching one: a CDP endpoint (``http://host:9222``) or a
+                Playwright browser server (``ws://host:port/...``). Launch
+                settings other than the viewport do not apply.
+            protocol: ``cdp`` for ``connect_over_cdp``, ``playwright`` for a
+                Playwright browser server
         """
+        if har_mode not in HAR_MODES:
+            raise ValueError(f"Invalid HAR mode '{har_mode}'")
+        if launch_profile not in LAUNCH_PROFILES:
+            raise ValueError(f"Invalid launch profile '{launch_profile}'")
+        if protocol not in BROWSER_PROTOCOLS:
+            raise ValueError(f"Invalid browser protocol '{protocol}'")
+        if har_mode != "off" and not har_dir:
+            raise ValueError(f"HAR mode '{har_mode}' needs a HAR directory")
         self.headless = headless
         self.timeout = timeout
+        self.storage_state = storage_state
+        self.har_mode = har_mode
+        self.har_dir = Path(har_dir) if har_dir else None
+        self.launch_profile = launch_profile
+        self.endpoint = endpoint
+        self.protocol = protocol
 
         if user_data_dir:
             self.user_data_dir = Path(user_data_dir)
         else:
             # Default to chrome-user-data in project root
-            self.user_data_dir = Path(__file__).parent.parent.parent / "chrome-user-data"
+            self.user_data_dir = DEFAULT_USER_DATA_DIR
 
-        self.playwright = None
-        self.context: Optional[BrowserContext] = None
-        self.page: Optional[Page] = None
+        # Playwright's internals are read by driver_pid, so not typed
+        self.playwright: Any = None
+        self._closed = False
+        self.browser: Optional["Browser"] = None
+        self.context: Optional["BrowserContext"] = None
+        self.page: Optional["Page"] = None
+        # With an external browser's own context, the pages this instance
+        # opened; they are closed on exit and the context is left running
+        self._shared_context = False
+        self._owned_pages: List["Page"] = []
 
     async def __aenter__(self):
         """Start browser context."""
-        self.playwright = await async_playwright().start()
-
-        # Launch persistent context to maintain authentication
-        self.context = await self.playwright.chromium.launch_persistent_context(
-            user_data_dir=str(self.user_data_dir),
-            headless=self.headless,
-            args=[
-                '--disable-blink-features=AutomationControlled',
-            ],
-            viewport={'width': 1920, 'height': 1080},
-        )
+        from playwright.async_api import async_playwright
+
+        starting = asyncio.ensure_future(async_playwright().start())
+        try:
+            self.playwright = await asyncio.shield(starting)
+        except asyncio.CancelledError:
+            # Cancelling the driver handshake leaves Playwright's own tasks
+            # pending forever; let it finish and shut the driver down instead
+            playwright = await starting
+            await playwright.stop()
+            raise
+
+        try:
+            launch, options = self._launch_options()
+            if self.har_mode != "off":
+                # Requests made by service workers bypass recording and routing
+                options['service_workers'] = 'block'
+            if self.har_mode == "record":
+                # One archive per browser launch; replay serves all of them
+                self.har_dir.mkdir(parents=True, exist_ok=True)
+                stamp = time.strftime("%Y%m%d-%H%M%S")
+                options['record_har_path'] = str(self.har_dir / f"{stamp}-{os.getpid()}-{id(self):x}.har")
+                options['record_har_content'] = 'embed'
 
-        # Set default timeout
-        self.context.set_default_timeout(self.timeout)
+            if self.endpoint:
+                self.browser = await self._connect()
+                if self.protocol == "cdp" and self.har_mode == "off" and not self.storage_state:
+                    # The external browser's profile holds the session
+                    self._shared_context = True
+                    contexts = self.browser.contexts
+                    self.context = contexts[0] if contexts else await self.browser.new_context(**options)
+                else:
+                    self.context = await self.browser.new_context(
+                        **({"storage_state": self.storage_state} if self.storage_state else {}),
+                        **options,
+                    )
+                    if self.har_mode == "replay":
+                        await self._route_from_har()
+            elif self.har_mode == "replay":
+                # Recorded pages carry the session, so no profile is opened
+                self.browser = await self.playwright.chromium.launch(**launch)
+                self.context = await self.browser.new_context(**options)
+                await self._route_from_har()
+            elif self.storage_state:
+                # Exported session (cookies + local storage) for this account
+                self.browser = await self.playwright.chromium.launch(**launch)
+                self.context = await self.browser.new_context(
+                    storage_state=self.storage_state,
+                    **options,
+                )
+            else:
+                # Launch persistent context to maintain authentication
+                self.context = await self.playwright.chromium.launch_persistent_context(
+                    user_data_dir=str(self.user_data_dir),
+                    **launch,
+                    **options,
+                )
 
-        # Create new page
-        self.page = await self.context.new_page()
+            # Set default timeout
+            self.context.set_default_timeout(self.timeout)
+
+            # Also fires when the browser crashes or is killed
+            self.context.on("close", lambda _: setattr(self, "_closed", True))
+
+            # Create new page
+            self.page = await self.new_page()
+        except BaseException:
+            # Don't leak the driver when the launch fails or is cancelled
+            try:
+                await self.__aexit__(None, None, None)
+            except Exception:
+                pass
+            raise
 
         return self
 
+    def _launch_options(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Chromium launch arguments and context options of the launch profile.
+
+        Returns:
+            Keyword arguments for ``launch`` and for the context
+        """
+        profile = LAUNCH_PROFILES[self.launch_profile]
+        headless = profile.get("headless", self.headless)
+        args = ['--disable-blink-features=AutomationControlled', *profile["args"]]
+        if profile.get("renderer_process_limit"):
+            args.append(f"--renderer-process-limit={get_renderer_process_limit()}")
+
+        launch: Dict[str, Any] = {"headless": headless, "args": args}
+        if "slow_mo" in profile:
+            launch["slow_mo"] = profile["slow_mo"]
+        return launch, {"viewport": dict(profile["viewport"])}
+
+    async def _connect(self) -> "Browser":
+        """
+        Connect to the external browser, retrying while it (re)starts.
+
+        Returns:
+            Connected browser
+
+        Raises:
+            Exception: The last connection error
+        """
+        from .calls import DeadlineExceeded, budget
+
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                if self.protocol == "cdp":
+                    return await self.playwright.chromium.connect_over_cdp(
+                        self.endpoint, timeout=budget(self.timeout)
+                    )
+                return await self.playwright.chromium.connect(self.endpoint, timeout=budget(self.timeout))
+            except DeadlineExceeded:
+                raise
+            except Exception:
+                if attempt >= CONNECT_ATTEMPTS:
+                    raise
+                await asyncio.sleep(CONNECT_BACKOFF_SECONDS * 2 ** (attempt - 1))
+
+    async def _route_from_har(self) -> None:
+        """Serve every request of the context from the recorded archives."""
+        archives = har_archives(self.har_dir) if self.har_dir else []
+        if not archives:
+            raise RuntimeError(
+                f"No HAR archives in {self.har_dir}; record some with NOTEBOOKLM_HAR_MODE=record"
+            )
+
+        if not self.context:
+            raise RuntimeError("Browser not initialized. Use 'async with' context manager.")
+
+        # Registered first, so it only sees requests no archive matched:
+        # replay never falls through to the network
+        await self.context.route("**/*", lambda route: route.abort("internetdisconnected"))
+        # Later routes take precedence, so the newest recording wins
+        for archive in archives:
+            await self.context.route_from_har(archive, not_found="fallback")
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Clean up browser context."""
-        if self.context:
+        if self._shared_context:
+            # Not ours to close: it keeps the external browser's session warm
+            for page in self._owned_pages:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+        elif self.context:
             await self.context.close()
+        if self.browser:
+            # Only disconnects from an external browser
+            await self.browser.close()
         if self.playwright:
             await self.playwright.stop()
 
-    async def goto(self, url: str, wait_until: str = "networkidle") -> None:
+    @property
+    def is_alive(self) -> bool:
+        """True while the browser is connected and the context is open."""
+        if self.context is None or self._closed:
+            return False
+        if self.browser is not None and not self.browser.is_connected():
+            return False
+        return True
+
+    @property
+    def driver_pid(self) -> Optional[int]:
+        """
+        PID of the Playwright driver process that owns this browser.
+
+        The browser processes are descendants of the driver. Playwright does
+        not expose this publicly, so it is looked up best-effort and None is
+        returned if the internals differ, or if the browser is external.
+        """
+        if self.endpoint:
+            return None
+        try:
+            return self.playwright._impl_obj._connection._transport._proc.pid
+        except AttributeError:
+            return None
+
+    async def new_page(self) -> "Page":
+        """
+        Open an additional page in the browser context.
+
+        Returns:
+            New Playwright page
+        """
+        if not self.context:
+            raise RuntimeError("Browser not initialized. Use 'async with' context manager.")
+
+        page = await self.context.new_page()
+        if self._shared_context:
+            self._owned_pages = [p for p in self._owned_pages if not p.is_closed()] + [page]
+        return page
+
+    def _resolve_page(self, page: Optional["Page"]) -> "Page":
+        page = page or self.page
+        if not page:
+            raise RuntimeError("Browser not initialized. Use 'async with' context manager.")
+        return page
+
+    async def goto(self, url: str, wait_until: str = "networkidle", page: Optional["Page"] = None) -> None:
         """
         Navigate to URL.
 
         Args:
             url: URL to navigate to
             wait_until: When to consider navigation complete
+            page: Page to navigate (defaults to the browser's main page)
         """
-        if not self.page:
-            raise RuntimeError("Browser not initialized. Use 'async with' context manager.")
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+        from .calls import budget, set_phase
+
+        page = self._resolve_page(page)
 
+        set_phase("navigate")
         try:
-            await self.page.goto(url, wait_until=wait_until)
+            await page.goto(url, wait_until=wait_until, timeout=budget(self.timeout))
         except PlaywrightTimeoutError:
             # Try again with less strict wait condition
-            await self.page.goto(url, wait_until="domcontentloaded")
+            await page.goto(url, wait_until="domcontentloaded", timeout=budget(self.timeout))
 
-    async def wait_for_selector(self, selector: str, timeout: Optional[int] = None) -> None:
+    async def wait_for_selector(
+        self,
+        selector: str,
+        timeout: Optional[int] = None,
+        page: Optional["Page"] = None
+    ) -> None:
         """
         Wait for selector to appear.
 
         Args:
             selector: CSS selector to wait for
             timeout: Optional timeout override in milliseconds
+            page: Page to wait on (defaults to the browser's main page)
         """
-        if not self.page:
-            raise RuntimeError("Browser not initialized. Use 'async with' context manager.")
+        from .calls import budget
+
+        page = self._resolve_page(page)
 
-        await self.page.wait_for_selector(selector, timeout=timeout or self.timeout)
+        await page.wait_for_selector(selector, timeout=budget(timeout or self.timeout))
 
-    async def check_authentication(self) -> bool:
+    async def check_authentication(self, page: Optional["Page"] = None) -> bool:
         """
         Check if user is authenticated to NotebookLM.
 
+        Args:
+            page: Page to run the check on (defaults to the browser's main page)
+
         Returns:
             True if authenticated, False otherwise
+
+        Raises:
+            DeadlineExceeded: If the current tool call ran out of time, which
+                says nothing about authentication
         """
-        if not self.page:
-            raise RuntimeError("Browser not initialized. Use 'async with' context manager.")
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+        from .calls import DeadlineExceeded, budget, check_deadline, set_phase
+
+        page = self._resolve_page(page)
 
         try:
-            await self.goto("https://notebooklm.google.com")
+            await self.goto("https://notebooklm.google.com", page=page)
+            set_phase("check_authentication")
 
             # Wait a bit for potential redirects
-            await self.page.wait_for_timeout(2000)
+            await page.wait_for_timeout(budget(2000))
 
             # Check if we're on the login page
-            current_url = self.page.url
+            current_url = page.url
             if "accounts.google.com" in current_url:
                 return False
 
             # Check for NotebookLM UI elements (will be refined after UI inspection)
             try:
-                await self.page.wait_for_selector('[aria-label*="notebook" i], [data-testid], .notebook', timeout=5000)
+                await page.wait_for_selector(
+                    '[aria-label*="notebook" i], [data-testid], .notebook',
+                    timeout=budget(5000)
+                )
                 return True
             except PlaywrightTimeoutError:
+                check_deadline()
                 return False
 
+        except DeadlineExceeded:
+            raise
         except Exception:
+            check_deadline()
             return False
@@ -0,0 +1,341 @@
+"""
+Per-call context and crash recovery for browser tools.
+
+Every tool invocation runs inside a CallContext holding its deadline, the
+phase it is in and whether its side effect (a click that changes NotebookLM
+state) has started. Browser waits take their timeout from ``budget``, so no
+step runs past the deadline, and a call that runs out of time fails with a
+DeadlineExceeded naming the phase. When the browser crashes, calls that have
+not started their side effect are retried transparently with jittered
+backoff; the others fail with an error that says whether the change may
+already have been applied. Cancelled calls are counted by phase; the page
+pool closes the page they were using. The phases a call went through and
+the selectors it waited for are logged for the flight recorder, and a
+sample of calls runs under the profiler.
+"""
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from contextvars import Context, ContextVar
+from typing import Any, Awaitable, Callable, Coroutine, Dict, Optional, overload
+
+from .browser import AuthenticationError, is_browser_crash
+from .metrics import REGISTRY
+from .profiling import save_profile, start_profile
+
+
+# Backoff between crash retries: full jitter over base * 2^attempt, capped
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 5.0
+
+# A wait clamped to the deadline may give up this much before it
+DEADLINE_SLACK_SECONDS = 0.05
+
+# Entries kept in a call's phase and selector logs, and page snapshots
+CALL_LOG_SIZE = 200
+CALL_FRAMES = 3
+
+TOOL_RETRIES = REGISTRY.counter(
+    "notebooklm_tool_retries_total",
+    "Tool calls retried after a browser crash",
+    ["tool"],
+)
+TOOL_CRASHES = REGISTRY.counter(
+    "notebooklm_tool_crashes_total",
+    "Tool calls hit by a browser crash, by whether the side effect had started",
+    ["tool", "side_effect"],
+)
+TOOL_CANCELLATIONS = REGISTRY.counter(
+    "notebooklm_tool_cancellations_total",
+    "Tool calls cancelled by the client, by the phase they were in",
+    ["tool", "phase"],
+)
+TOOL_DEADLINES = REGISTRY.counter(
+    "notebooklm_tool_deadline_exceeded_total",
+    "Tool calls that ran out of time, by the phase they were in",
+    ["tool", "phase"],
+)
+
+_current_call: ContextVar[Optional["CallContext"]] = ContextVar("notebooklm_call", default=None)
+
+
+def get_call_timeout() -> float:
+    """Get the default per-call deadline in seconds from environment variable."""
+    return float(os.getenv("NOTEBOOKLM_CALL_TIMEOUT", "300"))
+
+
+def get_crash_retries() -> int:
+    """Get the maximum number of crash retries from environment variable."""
+    return max(0, int(os.getenv("NOTEBOOKLM_CRASH_RETRIES", "2")))
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a tool call runs out of time."""
+
+    def __init__(self, tool: str, phase: str, timeout: float, elapsed: float):
+        """
+        Initialize error.
+
+        Args:
+            tool: Tool name
+            phase: Phase the call was in when time ran out
+            timeout: The call's overall timeout in seconds
+            elapsed: Seconds since the call started
+        """
+        super().__init__(
+            f"{tool} exceeded its {timeout:g}s deadline during {phase} (after {elapsed:.1f}s)"
+        )
+        self.tool = tool
+        self.phase = phase
+
+
+class CallContext:
+    """State of one tool invocation."""
+
+    def __init__(self, tool: str, timeout: Optional[float] = None):
+        """
+        Initialize call context.
+
+        Args:
+            tool: Tool name
+            timeout: Seconds until the call's deadline (default from environment)
+        """
+        self.tool = tool
+        self.timeout = timeout if timeout is not None else get_call_timeout()
+        self.started = time.monotonic()
+        self.deadline = self.started + self.timeout
+        self.phase = "start"
+        self.attempt = 0
+        self.side_effect_started = False
+        self.steps: deque = deque(maxlen=CALL_LOG_SIZE)
+        self.selector_attempts: deque = deque(maxlen=CALL_LOG_SIZE)
+        self.frames: deque = deque(maxlen=CALL_FRAMES)
+        # Page the call works on, snapshotted by the flight recorder
+        self.page: Any = None
+        self.pending_frame: Optional[asyncio.Future] = None
+
+    def elapsed(self) -> float:
+        """Seconds since the call started."""
+        return time.monotonic() - self.started
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (never negative)."""
+        return max(0.0, self.deadline - time.monotonic())
+
+    def deadline_exceeded(self) -> DeadlineExceeded:
+        """Build the error for this call running out of time in its current phase."""
+        return DeadlineExceeded(self.tool, self.phase, self.timeout, self.elapsed())
+
+
+def current_call() -> Optional[CallContext]:
+    """Get the context of the tool call running in this task, if any."""
+    return _current_call.get()
+
+
+def start_background_task(coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+    """
+    Start a task that does not belong to the current tool call.
+
+    Tasks copy the context they are created in, so a task started during a
+    call would otherwise be bound by that call's deadline and write into its
+    log long after it returned.
+
+    Args:
+        coro: Coroutine to run
+
+    Returns:
+        The task
+    """
+    return Context().run(asyncio.create_task, coro)
+
+
+def mark_side_effect() -> None:
+    """
+    Record that the current call is about to change NotebookLM state.
+
+    Call this right before the submitting click. From then on a browser
+    crash is no longer retried, and the error reports that the change may
+    already have been applied.
+    """
+    call = current_call()
+    if call is not None:
+        call.side_effect_started = True
+
+
+def set_phase(phase: str) -> None:
+    """
+    Record the step the current call is in, for deadline errors and metrics.
+
+    Args:
+        phase: Short step name, e.g. ``navigate`` or ``wait_for_response``
+    """
+    call = current_call()
+    if call is not None and phase != call.phase:
+        call.phase = phase
+        call.steps.append({"phase": phase, "at": round(call.elapsed(), 3)})
+        if call.page is not None:
+            # Imported here: the recorder depends on this module
+            from .recorder import snapshot_phase
+            snapshot_phase(call)
+
+
+def note_selector(selector: str, timeout: Optional[int], seconds: float, matched: bool) -> None:
+    """
+    Log a selector wait of the current call for the flight recorder.
+
+    Args:
+        selector: CSS selector waited for
+        timeout: Timeout the wait was given in milliseconds
+        seconds: How long the wait took
+        matched: Whether the selector matched
+    """
+    call = current_call()
+    if call is not None:
+        call.selector_attempts.append({
+            "selector": selector,
+            "phase": call.phase,
+            "at": round(call.elapsed() - seconds, 3),
+            "timeout_ms": timeout,
+            "ms": round(seconds * 1000),
+            "matched": matched,
+        })
+
+
+def check_deadline() -> None:
+    """
+    Fail if the current call has run out of time.
+
+    Raises:
+        DeadlineExceeded: If the call's deadline has (all but) passed
+    """
+    call = current_call()
+    if call is not None and call.remaining() <= DEADLINE_SLACK_SECONDS:
+        raise call.deadline_exceeded()
+
+
+@overload
+def budget(timeout: int) -> int: ...
+
+
+@overload
+def budget(timeout: None = None) -> Optional[int]: ...
+
+
+def budget(timeout: Optional[int] = None) -> Optional[int]:
+    """
+    Clamp a browser timeout to the time the current call has left.
+
+    Args:
+        timeout: The step's own timeout in milliseconds, or None for no
+            limit of its own
+
+    Returns:
+        Timeout in milliseconds for the step (``timeout`` unchanged outside
+        a tool call)
+
+    Raises:
+        DeadlineExceeded: If the call has no time left
+    """
+    call = current_call()
+    if call is None:
+        return timeout
+    check_deadline()
+    # Playwright treats a timeout of 0 as no timeout at all
+    remaining_ms = max(1, int(call.remaining() * 1000))
+    return remaining_ms if timeout is None else min(timeout, remaining_ms)
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Jittered exponential backoff.
+
+    Args:
+        attempt: Number of attempts already made (1 for the first retry)
+
+    Returns:
+        Delay in seconds
+    """
+    return random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt))
+
+
+def _crash_error(call: CallContext, error: BaseException) -> RuntimeError:
+    if call.side_effect_started:
+        note = (
+            "The browser crashed after the change was submitted; it may already "
+            "have been applied. Check the notebook before retrying."
+        )
+    else:
+        note = (
+            "The browser crashed before anything was submitted; nothing was "
+            "applied and the call can be retried safely."
+        )
+    return RuntimeError(f"{error} ({note})")
+
+
+async def run_call(
+    tool: str,
+    func: Callable[..., Awaitable[Any]],
+    arguments: Dict[str, Any],
+    idempotent: bool = False,
+    timeout: Optional[float] = None
+) -> Any:
+    """
+    Run a tool implementation in a fresh call context.
+
+    Args:
+        tool: Tool name
+        func: Tool implementation
+        arguments: Tool arguments
+        idempotent: True if the call may be repeated as long as its side
+            effect has not started
+        timeout: Seconds the call may take (default from environment)
+
+    Returns:
+        Tool result
+
+    Raises:
+        DeadlineExceeded: If the call ran out of time
+    """
+    from .recorder import finish_call
+
+    call = CallContext(tool, timeout)
+    token = _current_call.set(call)
+    profile = start_profile()
+    error: Optional[BaseException] = None
+    try:
+        while True:
+            call.attempt += 1
+            try:
+                return await func(**arguments)
+            except AuthenticationError:
+                raise
+            except asyncio.CancelledError:
+                TOOL_CANCELLATIONS.inc(tool=tool, phase=call.phase)
+                raise
+            except Exception as e:
+                if call.remaining() <= DEADLINE_SLACK_SECONDS:
+                    # Whichever wait gave up first, the cause is the deadline
+                    TOOL_DEADLINES.inc(tool=tool, phase=call.phase)
+                    raise call.deadline_exceeded() from e
+                if not is_browser_crash(e):
+                    raise
+
+                TOOL_CRASHES.inc(tool=tool, side_effect="started" if call.side_effect_started else "not_started")
+                retryable = idempotent and not call.side_effect_started
+                delay = backoff_delay(call.attempt)
+                if not retryable or call.attempt > get_crash_retries() or delay >= call.remaining():
+                    raise _crash_error(call, e) from e
+
+                # The pool relaunches the dead browser on the next lease
+                TOOL_RETRIES.inc(tool=tool)
+                await asyncio.sleep(delay)
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _current_call.reset(token)
+        if profile is not None:
+            save_profile(profile, tool, call.elapsed())
+        finish_call(call, arguments, error)
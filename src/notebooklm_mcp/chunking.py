@@ -0,0 +1,100 @@
+"""
+Splitting of oversized text sources.
+
+NotebookLM rejects sources over its size limit, and only after a long
+upload. ``add_source`` splits text over ``NOTEBOOKLM_MAX_SOURCE_WORDS`` into
+numbered parts that are added as separate sources. Splits fall on heading
+and paragraph boundaries where possible, then on lines, and only split
+within a line for a single line over the limit.
+"""
+import os
+import re
+from typing import List
+
+
+# Markdown ("# Title") and setext ("Title\n=====") headings
+_HEADING = re.compile(r"^(#{1,6}\s+\S|[^\n]+\n(=+|-+)[ \t]*$)", re.MULTILINE)
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n")
+
+
+def get_max_source_words() -> int:
+    """Get the word count above which text sources are split from environment variable."""
+    return max(1, int(os.getenv("NOTEBOOKLM_MAX_SOURCE_WORDS", "500000")))
+
+
+def get_chunk_concurrency() -> int:
+    """Get the number of parts of a split source added at once from environment variable."""
+    return max(1, int(os.getenv("NOTEBOOKLM_CHUNK_CONCURRENCY", "3")))
+
+
+def count_words(text: str) -> int:
+    """Count whitespace-separated words."""
+    return len(text.split())
+
+
+def _split_block(block: str, max_words: int) -> List[str]:
+    """Split a paragraph over the limit on lines, then on words."""
+    parts: List[str] = []
+    current: List[str] = []
+    words = 0
+    for line in block.split("\n"):
+        line_words = line.split()
+        if len(line_words) > max_words:
+            if current:
+                parts.append("\n".join(current))
+                current, words = [], 0
+            parts.extend(
+                " ".join(line_words[i:i + max_words])
+                for i in range(0, len(line_words), max_words)
+            )
+            continue
+        if current and words + len(line_words) > max_words:
+            parts.append("\n".join(current))
+            current, words = [], 0
+        current.append(line)
+        words += len(line_words)
+    if current:
+        parts.append("\n".join(current))
+    return parts
+
+
+def split_text(text: str, max_words: int) -> List[str]:
+    """
+    Split text into parts of at most ``max_words`` words.
+
+    Paragraphs are kept whole and packed greedily; once a part is at least
+    half full, a heading starts the next part so sections stay together.
+
+    Args:
+        text: Text to split
+        max_words: Maximum words per part
+
+    Returns:
+        Parts in document order (a single part if the text is within the limit)
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    words = 0
+
+    def flush():
+        nonlocal current, words
+        if current:
+            chunks.append("\n\n".join(current))
+        current, words = [], 0
+
+    for block in _PARAGRAPH_BREAK.split(text.strip()):
+        block = block.strip("\n")
+        block_words = count_words(block)
+        if not block_words:
+            continue
+        if block_words > max_words:
+            flush()
+            chunks.extend(_split_block(block, max_words))
+            continue
+        heading = bool(_HEADING.match(block))
+        if current and (words + block_words > max_words or (heading and words >= max_words // 2)):
+            flush()
+        current.append(block)
+        words += block_words
+    flush()
+    return chunks
@@ -0,0 +1,104 @@
+"""
+Request coalescing for read-only tools.
+
+When several identical read-only calls arrive together (for example every
+agent listing notebooks at startup), only the first one runs; the others
+attach to it and receive the same result. Calls are identical when the tool
+name and the normalized arguments match.
+"""
+import asyncio
+import json
+from typing import Any, Callable, Coroutine, Dict
+
+from .metrics import REGISTRY
+
+
+COALESCED_CALLS = REGISTRY.counter(
+    "notebooklm_coalesced_calls_total",
+    "Read-only tool calls by coalescing role: leaders run, followers reuse a leader's result",
+    ["tool", "role"],
+)
+COALESCING_IN_FLIGHT = REGISTRY.gauge(
+    "notebooklm_coalescing_in_flight",
+    "Coalesced calls currently running",
+)
+
+
+def normalize_arguments(arguments: Dict[str, Any]) -> str:
+    """
+    Build the part of a coalescing key that comes from the arguments.
+
+    Whitespace runs in strings are collapsed and keys are sorted, so calls
+    that differ only in formatting share a key.
+
+    Args:
+        arguments: Tool arguments
+
+    Returns:
+        Canonical JSON representation of the arguments
+    """
+    def normalize(value: Any) -> Any:
+        if isinstance(value, str):
+            return " ".join(value.split())
+        if isinstance(value, dict):
+            return {str(k): normalize(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [normalize(v) for v in value]
+        return value
+
+    return json.dumps(normalize(arguments), sort_keys=True, default=str)
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time and shares its result."""
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+
+    async def run(self, tool: str, arguments: Dict[str, Any], func: Callable[[], Coroutine[Any, Any, Any]]) -> Any:
+        """
+        Run a call, or attach to an identical call already in flight.
+
+        The call runs in its own task, so one caller being cancelled does not
+        fail the others; it is only cancelled once every caller has gone.
+
+        Args:
+            tool: Tool name
+            arguments: Tool arguments
+            func: Starts the call when no identical call is in flight
+
+        Returns:
+            Result of the call
+        """
+        key = f"{tool}:{normalize_arguments(arguments)}"
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.create_task(func()))
+            self._flights[key] = flight
+            COALESCED_CALLS.inc(tool=tool, role="leader")
+            COALESCING_IN_FLIGHT.inc()
+
+            def done(_task, key=key, flight=flight):
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                COALESCING_IN_FLIGHT.dec()
+
+            flight.task.add_done_callback(done)
+        else:
+            COALESCED_CALLS.inc(tool=tool, role="follower")
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
@@ -0,0 +1,228 @@
+"""
+Streaming download of generated audio overviews.
+
+The audio URL is read from the notebook's player and fetched with the
+browser context's request client, so the account's cookies apply without
+exporting them. The file is fetched in ``Range`` requests of
+``NOTEBOOKLM_DOWNLOAD_CHUNK_MB`` and appended to a ``.part`` file, so memory
+use is bounded by one chunk and an interrupted download resumes where it
+stopped. Finished files are named after the audio's identity (ETag, or size
+and Last-Modified), so fetching the same audio again is a no-op.
+"""
+import hashlib
+import json
+import mimetypes
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .calls import budget
+from .metrics import REGISTRY
+from .storage import atomic_write, get_data_dir
+
+
+AUDIO_DOWNLOADS = REGISTRY.counter(
+    "notebooklm_audio_downloads_total",
+    "Audio overview downloads, by outcome",
+    ["outcome"],
+)
+AUDIO_DOWNLOAD_BYTES = REGISTRY.counter(
+    "notebooklm_audio_download_bytes_total",
+    "Bytes of audio overviews downloaded",
+)
+
+_EXTENSIONS = {
+    "audio/mpeg": ".mp3",
+    "audio/mp4": ".m4a",
+    "audio/x-m4a": ".m4a",
+    "audio/wav": ".wav",
+    "audio/x-wav": ".wav",
+    "audio/ogg": ".ogg",
+    "audio/webm": ".webm",
+}
+
+
+def get_audio_timeout() -> int:
+    """Get the wait for a playable audio overview in milliseconds from environment variable."""
+    return int(float(os.getenv("NOTEBOOKLM_AUDIO_TIMEOUT", "60")) * 1000)
+
+
+def get_download_chunk_bytes() -> int:
+    """Get the download chunk size in bytes from environment variable."""
+    return max(1, int(float(os.getenv("NOTEBOOKLM_DOWNLOAD_CHUNK_MB", "4")) * 1024 * 1024))
+
+
+def audio_dir(notebook_id: str) -> Path:
+    """Directory holding a notebook's downloaded audio."""
+    return get_data_dir() / "audio" / notebook_id
+
+
+def _extension(content_type: Optional[str]) -> str:
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    return _EXTENSIONS.get(content_type) or mimetypes.guess_extension(content_type) or ".audio"
+
+
+def _identity(headers: Dict[str, str], total: Optional[int]) -> Optional[str]:
+    identity = headers.get("etag")
+    if not identity and total is not None and headers.get("last-modified"):
+        identity = f"{total}:{headers['last-modified']}"
+    return identity
+
+
+async def probe_audio(request, url: str) -> Dict[str, Any]:
+    """
+    Read size and identity of the audio without downloading it.
+
+    Asks with HEAD. Servers that reject HEAD are asked for the first byte
+    instead; if such a server ignores the Range header and sends the whole
+    file, that response is kept rather than fetched a second time.
+
+    Args:
+        request: Playwright APIRequestContext of the account's browser context
+        url: Audio URL
+
+    Returns:
+        Dictionary with ``total`` (None if unknown), ``ranges`` (True if the
+        server honours Range requests), ``content_type``, ``identity``
+        (the ETag, or size and Last-Modified; None if the server sends
+        neither) and ``body`` (the whole file if the probe received it,
+        otherwise None)
+    """
+    response = await request.head(url, timeout=budget())
+    try:
+        if response.status < 400:
+            headers = response.headers
+            total = int(headers["content-length"]) if headers.get("content-length", "").isdigit() else None
+            return {
+                "total": total,
+                "ranges": headers.get("accept-ranges", "").lower() == "bytes" and total is not None,
+                "content_type": headers.get("content-type"),
+                "identity": _identity(headers, total),
+                "body": None,
+            }
+    finally:
+        await response.dispose()
+
+    response = await request.get(url, headers={"Range": "bytes=0-0"}, timeout=budget())
+    try:
+        if response.status >= 400:
+            raise RuntimeError(f"Audio request failed with HTTP {response.status}")
+        headers = response.headers
+        ranges = response.status == 206
+        total = None
+        body = None
+        if ranges and "/" in headers.get("content-range", ""):
+            size = headers["content-range"].rsplit("/", 1)[1]
+            total = int(size) if size.isdigit() else None
+        elif not ranges:
+            # Range ignored: this is the whole file
+            body = await response.body()
+            total = len(body)
+        return {
+            "total": total,
+            "ranges": ranges and total is not None,
+            "content_type": headers.get("content-type"),
+            "identity": _identity(headers, total),
+            "body": body,
+        }
+    finally:
+        await response.dispose()
+
+
+async def download_ranges(request, url: str, part: Path, total: int, chunk: int) -> int:
+    """
+    Append the rest of a file to a ``.part`` file in Range requests.
+
+    Args:
+        request: Playwright APIRequestContext
+        url: File URL
+        part: Partial file; its current size is where the download resumes
+        total: Total file size
+        chunk: Bytes per request
+
+    Returns:
+        Number of bytes downloaded by this call
+    """
+    start = part.stat().st_size if part.exists() else 0
+    downloaded = 0
+    with open(part, "ab") as f:
+        while start < total:
+            end = min(start + chunk, total) - 1
+            response = await request.get(url, headers={"Range": f"bytes={start}-{end}"}, timeout=budget())
+            try:
+                if response.status != 206:
+                    raise RuntimeError(f"Range request failed with HTTP {response.status}")
+                body = await response.body()
+            finally:
+                await response.dispose()
+            if not body:
+                raise RuntimeError(f"Empty response for bytes {start}-{end}")
+            f.write(body)
+            f.flush()
+            start += len(body)
+            downloaded += len(body)
+            AUDIO_DOWNLOAD_BYTES.inc(len(body))
+    return downloaded
+
+
+async def download_audio(page, notebook_id: str, audio: Dict[str, Any], save_via_download) -> Dict[str, Any]:
+    """
+    Download a notebook's audio overview to the data directory.
+
+    Args:
+        page: Playwright page showing the notebook
+        notebook_id: ID of the notebook
+        audio: Player source from ``wait_for_audio_source``
+        save_via_download: Coroutine function saving the audio to a given
+            path through the page's own download button, used when the
+            server does not support Range requests
+
+    Returns:
+        Dictionary with ``path``, ``bytes``, ``content_type``,
+        ``deduplicated``, ``resumed_from`` and ``downloaded_bytes``
+    """
+    request = page.context.request
+    info = await probe_audio(request, audio["src"])
+    key = hashlib.sha256(f"{notebook_id}\n{info['identity']}".encode()).hexdigest()[:16]
+    directory = audio_dir(notebook_id)
+    path = directory / f"audio-{key}{_extension(info['content_type'])}"
+    result = {"path": str(path), "content_type": info["content_type"], "resumed_from": 0, "downloaded_bytes": 0}
+
+    # Without an identity the file on disk may be an older audio: download again
+    identified = info["identity"] is not None
+    if identified and path.exists() and (info["total"] is None or path.stat().st_size == info["total"]):
+        AUDIO_DOWNLOADS.inc(outcome="deduplicated")
+        return {**result, "bytes": path.stat().st_size, "deduplicated": True}
+
+    directory.mkdir(parents=True, exist_ok=True)
+    part = path.with_name(path.name + ".part")
+    if info["body"] is not None:
+        # The probe already received the whole file
+        atomic_write(part, info["body"])
+        result["downloaded_bytes"] = len(info["body"])
+        AUDIO_DOWNLOAD_BYTES.inc(result["downloaded_bytes"])
+    elif info["ranges"]:
+        # Resume only a partial file of the same audio
+        meta = part.with_name(part.name + ".json")
+        try:
+            resumable = json.loads(meta.read_text()) == {"identity": info["identity"], "total": info["total"]}
+        except (OSError, ValueError):
+            resumable = False
+        resumable = resumable and identified
+        if not resumable or (part.exists() and part.stat().st_size > info["total"]):
+            part.unlink(missing_ok=True)
+        atomic_write(meta, json.dumps({"identity": info["identity"], "total": info["total"]}).encode())
+        result["resumed_from"] = part.stat().st_size if part.exists() else 0
+        result["downloaded_bytes"] = await download_ranges(
+            request, audio["src"], part, info["total"], get_download_chunk_bytes()
+        )
+        meta.unlink(missing_ok=True)
+    else:
+        part.unlink(missing_ok=True)
+        await save_via_download(part)
+        result["downloaded_bytes"] = part.stat().st_size
+        AUDIO_DOWNLOAD_BYTES.inc(result["downloaded_bytes"])
+
+    os.replace(part, path)
+    AUDIO_DOWNLOADS.inc(outcome="resumed" if result["resumed_from"] else "downloaded")
+    return {**result, "bytes": path.stat().st_size, "deduplicated": False}
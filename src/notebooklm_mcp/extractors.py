@@ -0,0 +1,632 @@
+"""
+In-page extraction scripts for NotebookLM.
+
+Each extractor gathers everything it needs with a single ``page.evaluate``
+call, so no extra navigation or per-element round trips are spent. Selector
+fallbacks are passed in from ``Selectors`` so they stay in one place.
+
+Chat answers are tied to their turn: ``count_responses`` snapshots how many
+elements each response selector matches before a question is submitted, and
+the answer is the first element past that count for the first selector that
+grew. This keeps working on pages that already show earlier turns.
+
+Waits are capped by the remaining time of the current tool call.
+"""
+import time
+from typing import Any, Dict, List, Optional
+
+from .calls import budget, check_deadline
+from .selectors import Selectors
+
+
+# Shared helpers, prepended to the scripts below
+_HELPERS_JS = """
+  const queryAll = (selector, root = document) => {
+    try { return Array.from(root.querySelectorAll(selector)); } catch (e) { return []; }
+  };
+  const pick = (selectors, root = document) => {
+    for (const selector of selectors) {
+      const found = queryAll(selector, root);
+      if (found.length) return found;
+    }
+    return [];
+  };
+  const locateResponse = (selectors, before) => {
+    if (!before) {
+      const responses = pick(selectors);
+      return responses.length ? responses[responses.length - 1] : null;
+    }
+    for (let i = 0; i < selectors.length; i++) {
+      const found = queryAll(selectors[i]);
+      if (found.length > (before[i] || 0)) return found[before[i] || 0];
+    }
+    return null;
+  };
+"""
+
+_RESPONSE_COUNTS_JS = """
+(responseSelectors) => {
+""" + _HELPERS_JS + """
+  return responseSelectors.map(selector => queryAll(selector).length);
+}
+"""
+
+_HAS_NEW_RESPONSE_JS = """
+({responseSelectors, before}) => {
+""" + _HELPERS_JS + """
+  return locateResponse(responseSelectors, before) !== null;
+}
+"""
+
+_ANSWER_TEXT_JS = """
+({responseSelectors, before}) => {
+""" + _HELPERS_JS + """
+  const root = locateResponse(responseSelectors, before);
+  return root ? root.innerText : null;
+}
+"""
+
+# Walks the turn's response and returns its text with inline [n] markers,
+# the citation spans and the notebook's source list.
+_STRUCTURED_ANSWER_JS = """
+({responseSelectors, citationSelectors, sourceSelectors, before}) => {
+""" + _HELPERS_JS + """
+  const matches = (el, selectors) => selectors.some(s => { try { return el.matches(s); } catch (e) { return false; } });
+  const clean = (text) => (text || '').replace(/\\s+/g, ' ').trim();
+
+  const root = locateResponse(responseSelectors, before);
+  if (!root) return null;
+
+  const sources = pick(sourceSelectors).map((el, i) => ({
+    index: i + 1,
+    title: clean((el.innerText || '').split('\\n')[0]).slice(0, 200),
+    id: el.getAttribute('data-source-id') || el.getAttribute('data-id') || el.id || null,
+  }));
+
+  const resolveSource = (el, label) => {
+    const sourceId = el.getAttribute('data-source-id') || null;
+    const described = clean(
+      el.getAttribute('aria-label') || el.getAttribute('title') ||
+      el.getAttribute('mattooltip') || el.getAttribute('data-tooltip') || ''
+    );
+    let source = null;
+    if (sourceId) source = sources.find(s => s.id === sourceId) || null;
+    if (!source && described) {
+      source = sources.find(s => s.title && described.includes(s.title)) || null;
+    }
+    return {
+      source_id: source ? source.id : sourceId,
+      source_title: source ? source.title : (described && described !== label ? described : null),
+      source_index: source ? source.index : null,
+    };
+  };
+
+  const blockTags = new Set(['P', 'DIV', 'LI', 'UL', 'OL', 'BR', 'H1', 'H2', 'H3', 'H4', 'H5', 'H6', 'TR', 'TABLE']);
+  let answer = '';
+  let lastMarkerEnd = 0;
+  const citations = [];
+
+  const claimStart = (markerStart) => {
+    const segment = answer.slice(lastMarkerEnd, markerStart);
+    if (!segment.trim() && citations.length) {
+      // Adjacent markers ([1][2]) cite the same claim
+      return citations[citations.length - 1].start;
+    }
+    const body = segment.replace(/[\\s.!?]+$/, '');
+    const boundary = Math.max(body.lastIndexOf('. '), body.lastIndexOf('! '), body.lastIndexOf('? '), body.lastIndexOf('\\n'));
+    let start = lastMarkerEnd + (boundary >= 0 ? boundary + 1 : 0);
+    while (start < markerStart && /\\s/.test(answer[start])) start++;
+    return start;
+  };
+
+  const walk = (node) => {
+    if (node.nodeType === Node.TEXT_NODE) {
+      answer += node.textContent;
+      return;
+    }
+    if (node.nodeType !== Node.ELEMENT_NODE) return;
+
+    if (matches(node, citationSelectors)) {
+      const label = clean(node.innerText || node.textContent) || String(citations.length + 1);
+      const markerStart = answer.length;
+      const start = claimStart(markerStart);
+      let end = markerStart;
+      while (end > start && /\\s/.test(answer[end - 1])) end--;
+      answer += `[${label}]`;
+      citations.push({
+        marker: label,
+        start,
+        end: citations.length && start === citations[citations.length - 1].start
+          ? citations[citations.length - 1].end : end,
+        marker_start: markerStart,
+        marker_end: answer.length,
+        ...resolveSource(node, label),
+      });
+      lastMarkerEnd = answer.length;
+      return;
+    }
+
+    const block = blockTags.has(node.tagName);
+    if (block && answer && !answer.endsWith('\\n')) answer += '\\n';
+    node.childNodes.forEach(walk);
+    if (block && answer && !answer.endsWith('\\n')) answer += '\\n';
+  };
+  walk(root);
+
+  answer = answer.replace(/\\s+$/, '');
+  for (const citation of citations) {
+    citation.claim = answer.slice(citation.start, citation.end);
+  }
+  return {answer, citations, sources};
+}
+"""
+
+# Reads title, created date, role and (when the DOM exposes it) the ID of
+# every row of the home page's notebook table, without clicking anything.
+_NOTEBOOK_ROWS_JS = """
+({rowSelectors, titleSelectors, createdSelectors, roleSelectors}) => {
+""" + _HELPERS_JS + """
+  const clean = (text) => (text || '').replace(/\\s+/g, ' ').trim();
+  const cellText = (row, selectors) => {
+    const cells = pick(selectors, row);
+    return cells.length ? clean(cells[0].innerText) : null;
+  };
+  const idPattern = /\\/notebook\\/([A-Za-z0-9_-]+)/;
+  const rowId = (row) => {
+    const link = row.querySelector('a[href*="/notebook/"]');
+    const match = link && idPattern.exec(link.getAttribute('href'));
+    if (match) return match[1];
+    for (const attr of ['data-project-id', 'data-notebook-id', 'data-id']) {
+      const holder = row.hasAttribute(attr) ? row : row.querySelector(`[${attr}]`);
+      if (holder) return holder.getAttribute(attr);
+    }
+    return null;
+  };
+  return pick(rowSelectors).map((row, index) => ({
+    index,
+    title: cellText(row, titleSelectors) || 'Untitled',
+    created: cellText(row, createdSelectors),
+    role: cellText(row, roleSelectors),
+    id: rowId(row),
+  }));
+}
+"""
+
+# Reads the title and processing state of every item in the sources list.
+_SOURCE_STATES_JS = """
+({sourceSelectors, processingSelectors, failedSelectors}) => {
+""" + _HELPERS_JS + """
+  const clean = (text) => (text || '').replace(/\\s+/g, ' ').trim();
+  const has = (item, selectors) => selectors.some(selector => {
+    try { return item.matches(selector) || item.querySelector(selector) !== null; } catch (e) { return false; }
+  });
+  return pick(sourceSelectors).map((item, index) => ({
+    index,
+    title: clean((item.innerText || '').split('\\n')[0]).slice(0, 200),
+    state: has(item, failedSelectors) ? 'failed' : has(item, processingSelectors) ? 'processing' : 'ready',
+  }));
+}
+"""
+
+# Source titles and states plus the last-modified text of the open notebook,
+# or null while the sources list is empty and ``requireSources`` is set.
+_NOTEBOOK_STATE_JS = """
+({sourceSelectors, emptySelectors, processingSelectors, failedSelectors, modifiedSelectors, requireSources}) => {
+""" + _HELPERS_JS + """
+  const clean = (text) => (text || '').replace(/\\s+/g, ' ').trim();
+  const has = (item, selectors) => selectors.some(selector => {
+    try { return item.matches(selector) || item.querySelector(selector) !== null; } catch (e) { return false; }
+  });
+  const items = pick(sourceSelectors);
+  if (requireSources && !items.length && !pick(emptySelectors).length) return null;
+  const modified = pick(modifiedSelectors);
+  return {
+    sources: items.map(item => ({
+      title: clean((item.innerText || '').split('\\n')[0]).slice(0, 200),
+      state: has(item, failedSelectors) ? 'failed' : has(item, processingSelectors) ? 'processing' : 'ready',
+    })),
+    modified: modified.length
+      ? clean(modified[0].getAttribute('datetime') || modified[0].getAttribute('title') || modified[0].innerText) || null
+      : null,
+  };
+}
+"""
+
+# Finds the first source not accounted for by the titles listed before a
+# submit and, when ``expected`` titles are given, only one with such a title,
+# so uploads running in parallel each find their own source.
+_FIND_NEW_SOURCE_JS = """
+  const clean = (text) => (text || '').replace(/\\s+/g, ' ').trim();
+  const findNew = (items, known, expected) => {
+    const remaining = {};
+    for (const title of known) remaining[title] = (remaining[title] || 0) + 1;
+    for (let i = 0; i < items.length; i++) {
+      const title = clean((items[i].innerText || '').split('\\n')[0]).slice(0, 200);
+      if (remaining[title]) remaining[title]--;
+      else if (!expected || expected.includes(title)) return i;
+    }
+    return -1;
+  };
+"""
+
+# Index (plus one) of the new source, or 0 while there is none.
+_NEW_SOURCE_JS = """
+({sourceSelectors, known, expected}) => {
+""" + _HELPERS_JS + _FIND_NEW_SOURCE_JS + """
+  return findNew(pick(sourceSelectors), known, expected) + 1;
+}
+"""
+
+_SOURCE_SETTLED_JS = """
+({sourceSelectors, processingSelectors, index, known, expected}) => {
+""" + _HELPERS_JS + _FIND_NEW_SOURCE_JS + """
+  const items = pick(sourceSelectors);
+  // With expected titles the source is found again, as parallel uploads shift the list
+  const item = items[expected ? findNew(items, known, expected) : index];
+  if (!item) return false;
+  return !processingSelectors.some(selector => {
+    try { return item.matches(selector) || item.querySelector(selector) !== null; } catch (e) { return false; }
+  });
+}
+"""
+
+# Source URL and (once metadata is loaded) duration of the audio overview
+# player, or null while there is no playable audio.
+_AUDIO_SOURCE_JS = """
+(audioSelectors) => {
+""" + _HELPERS_JS + """
+  for (const audio of pick(audioSelectors)) {
+    const source = audio.querySelector('source[src]');
+    const src = audio.currentSrc || audio.getAttribute('src') || (source && source.getAttribute('src'));
+    if (src && !src.startsWith('blob:')) {
+      return {src: new URL(src, location.href).href, duration: isFinite(audio.duration) ? audio.duration : null};
+    }
+  }
+  return null;
+}
+"""
+
+
+async def read_notebook_rows(page) -> List[Dict[str, Any]]:
+    """
+    Read the metadata of every notebook row on the home page.
+
+    Args:
+        page: Playwright page showing the NotebookLM home page
+
+    Returns:
+        Rows in page order with ``index``, ``title``, ``created`` (as
+        displayed), ``role`` and ``id`` (None when the row must be opened
+        to learn its ID)
+    """
+    return await page.evaluate(
+        _NOTEBOOK_ROWS_JS,
+        {
+            "rowSelectors": Selectors.NOTEBOOK_TABLE_ROW,
+            "titleSelectors": Selectors.NOTEBOOK_TABLE_TITLE,
+            "createdSelectors": Selectors.NOTEBOOK_TABLE_CREATED,
+            "roleSelectors": Selectors.NOTEBOOK_TABLE_ROLE,
+        },
+    )
+
+
+async def count_matches(page, selectors: List[str]) -> List[int]:
+    """
+    Snapshot how many elements each selector matches.
+
+    Take the snapshot right before the action that adds an element (a chat
+    answer, a generated note) and pass it to ``wait_for_new_match`` and
+    ``extract_new_text`` to get that element.
+
+    Args:
+        page: Playwright page
+        selectors: Fallback selectors of the element
+
+    Returns:
+        Match count per selector
+    """
+    return await page.evaluate(_RESPONSE_COUNTS_JS, selectors)
+
+
+async def wait_for_new_match(page, selectors: List[str], before: List[int], timeout: int = 10000) -> None:
+    """
+    Wait until an element past the ``before`` counts is on the page.
+
+    Args:
+        page: Playwright page
+        selectors: Fallback selectors of the element
+        before: Counts from ``count_matches``
+        timeout: Timeout in milliseconds
+
+    Raises:
+        TimeoutError: If no new element appears in time
+    """
+    await page.wait_for_function(
+        _HAS_NEW_RESPONSE_JS,
+        arg={"responseSelectors": selectors, "before": before},
+        timeout=budget(timeout),
+    )
+
+
+async def extract_new_text(page, selectors: List[str], before: Optional[List[int]] = None) -> Optional[str]:
+    """
+    Extract the text of the element added after the ``before`` counts.
+
+    Args:
+        page: Playwright page
+        selectors: Fallback selectors of the element
+        before: Counts from ``count_matches``, or None for the last match
+
+    Returns:
+        Element text, or None if there is no such element
+    """
+    return await page.evaluate(
+        _ANSWER_TEXT_JS,
+        {"responseSelectors": selectors, "before": before},
+    )
+
+
+async def wait_for_stable_text(
+    page,
+    selectors: List[str],
+    before: List[int],
+    timeout: int,
+    interval: int = 1500
+) -> Optional[str]:
+    """
+    Wait for a new element and return its text once it stops changing.
+
+    For content that is generated progressively, such as study guides.
+
+    Args:
+        page: Playwright page
+        selectors: Fallback selectors of the element
+        before: Counts from ``count_matches``
+        timeout: Overall timeout in milliseconds
+        interval: Milliseconds between two reads that must agree
+
+    Returns:
+        Final text, or None if no element appeared or its text was still
+        changing when the timeout passed
+    """
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+    timeout = budget(timeout)
+    deadline = time.monotonic() + timeout / 1000
+    try:
+        await wait_for_new_match(page, selectors, before, timeout)
+    except PlaywrightTimeoutError:
+        return None
+
+    last = None
+    while True:
+        text = await extract_new_text(page, selectors, before)
+        if text and text.strip() and text == last:
+            return text.strip()
+        last = text
+        if time.monotonic() + interval / 1000 > deadline:
+            return None
+        await page.wait_for_timeout(interval)
+
+
+async def count_responses(page) -> List[int]:
+    """
+    Snapshot how many elements each chat response selector matches.
+
+    Take the snapshot right before submitting a question and pass it to the
+    other extractors to read that question's answer.
+
+    Args:
+        page: Playwright page showing the notebook chat
+
+    Returns:
+        Match count per selector in ``Selectors.CHAT_RESPONSE``
+    """
+    return await count_matches(page, Selectors.CHAT_RESPONSE)
+
+
+async def wait_for_response(page, before: List[int], timeout: int = 10000) -> None:
+    """
+    Wait until the answer for the turn after ``before`` is on the page.
+
+    Args:
+        page: Playwright page showing the notebook chat
+        before: Response counts taken before the question was submitted
+        timeout: Timeout in milliseconds
+
+    Raises:
+        TimeoutError: If no new response appears in time
+    """
+    await wait_for_new_match(page, Selectors.CHAT_RESPONSE, before, timeout)
+
+
+async def extract_answer_text(page, before: Optional[List[int]] = None) -> Optional[str]:
+    """
+    Extract the plain text of a chat answer.
+
+    Args:
+        page: Playwright page showing the notebook chat
+        before: Response counts taken before the question was submitted,
+            or None for the last answer on the page
+
+    Returns:
+        Answer text, or None if there is no such response
+    """
+    return await extract_new_text(page, Selectors.CHAT_RESPONSE, before)
+
+
+async def extract_structured_answer(page, before: Optional[List[int]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Extract a chat answer with its citations in one evaluation.
+
+    Args:
+        page: Playwright page showing the notebook chat
+        before: Response counts taken before the question was submitted,
+            or None for the last answer on the page
+
+    Returns:
+        Dictionary with ``answer`` (text with inline ``[n]`` markers),
+        ``citations`` (marker, claim span offsets into the answer, and the
+        source title/ID the marker points to when it can be resolved) and
+        ``sources`` (index, title, id), or None if there is no such response
+    """
+    return await page.evaluate(
+        _STRUCTURED_ANSWER_JS,
+        {
+            "responseSelectors": Selectors.CHAT_RESPONSE,
+            "citationSelectors": Selectors.CITATION_MARKER,
+            "sourceSelectors": Selectors.SOURCES_LIST,
+            "before": before,
+        },
+    )
+
+
+async def read_source_states(page) -> List[Dict[str, Any]]:
+    """
+    Read the title and processing state of every source in a notebook.
+
+    Args:
+        page: Playwright page showing the notebook
+
+    Returns:
+        Sources in list order with ``index``, ``title`` and ``state``
+        (``processing``, ``ready`` or ``failed``)
+    """
+    return await page.evaluate(
+        _SOURCE_STATES_JS,
+        {
+            "sourceSelectors": Selectors.SOURCES_LIST,
+            "processingSelectors": Selectors.SOURCE_PROCESSING,
+            "failedSelectors": Selectors.SOURCE_FAILED,
+        },
+    )
+
+
+async def read_notebook_state(page, timeout: int = 5000) -> Dict[str, Any]:
+    """
+    Read the open notebook's sources and last-modified text in one pass.
+
+    Waits for the sources list or the empty-notebook placeholder to render;
+    a notebook showing neither after ``timeout`` is read as empty.
+
+    Args:
+        page: Playwright page showing the notebook
+        timeout: Timeout in milliseconds for the sources list to appear
+
+    Returns:
+        Dictionary with ``sources`` (``title`` and ``state`` of each, in
+        list order) and ``last_modified`` (None if the UI shows none)
+    """
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+    arg = {
+        "sourceSelectors": Selectors.SOURCES_LIST,
+        "emptySelectors": Selectors.SOURCES_EMPTY,
+        "processingSelectors": Selectors.SOURCE_PROCESSING,
+        "failedSelectors": Selectors.SOURCE_FAILED,
+        "modifiedSelectors": Selectors.NOTEBOOK_LAST_MODIFIED,
+        "requireSources": True,
+    }
+    try:
+        handle = await page.wait_for_function(_NOTEBOOK_STATE_JS, arg=arg, timeout=budget(timeout))
+        state = await handle.json_value()
+    except PlaywrightTimeoutError:
+        check_deadline()
+        state = await page.evaluate(_NOTEBOOK_STATE_JS, {**arg, "requireSources": False})
+    return {"sources": state["sources"], "last_modified": state["modified"]}
+
+
+async def wait_for_new_source(
+    page,
+    known: List[str],
+    timeout: int = 10000,
+    expected: Optional[List[str]] = None
+) -> int:
+    """
+    Wait until a source that was not listed before appears.
+
+    Args:
+        page: Playwright page showing the notebook
+        known: Source titles listed before the source was added
+        timeout: Timeout in milliseconds
+        expected: Titles the new source may have, or None to take any new
+            source
+
+    Returns:
+        Index of the new source in the sources list
+
+    Raises:
+        TimeoutError: If no new source appears in time
+    """
+    handle = await page.wait_for_function(
+        _NEW_SOURCE_JS,
+        arg={"sourceSelectors": Selectors.SOURCES_LIST, "known": known, "expected": expected},
+        timeout=budget(timeout),
+    )
+    return int(await handle.json_value()) - 1
+
+
+async def wait_for_source_settled(
+    page,
+    index: int,
+    timeout: int = 10000,
+    known: Optional[List[str]] = None,
+    expected: Optional[List[str]] = None
+) -> None:
+    """
+    Wait until a source no longer shows a processing indicator.
+
+    Args:
+        page: Playwright page showing the notebook
+        index: Index of the source in the sources list
+        timeout: Timeout in milliseconds
+        known: Source titles listed before the source was added
+        expected: Titles the new source may have; if given, the source is
+            looked up by ``known`` and ``expected`` instead of ``index``
+
+    Raises:
+        TimeoutError: If the source is still processing after the timeout
+    """
+    await page.wait_for_function(
+        _SOURCE_SETTLED_JS,
+        arg={
+            "sourceSelectors": Selectors.SOURCES_LIST,
+            "processingSelectors": Selectors.SOURCE_PROCESSING,
+            "index": index,
+            "known": known or [],
+            "expected": expected,
+        },
+        timeout=budget(timeout),
+    )
+
+
+async def read_audio_source(page) -> Optional[Dict[str, Any]]:
+    """
+    Read the audio overview player's source.
+
+    Args:
+        page: Playwright page showing the notebook
+
+    Returns:
+        Dictionary with ``src`` (absolute URL) and ``duration`` in seconds
+        (None until the metadata is loaded), or None if there is no audio
+    """
+    return await page.evaluate(_AUDIO_SOURCE_JS, Selectors.AUDIO_PLAYER)
+
+
+async def wait_for_audio_source(page, timeout: int) -> Dict[str, Any]:
+    """
+    Wait until the audio overview player has a downloadable source.
+
+    Args:
+        page: Playwright page showing the notebook
+        timeout: Timeout in milliseconds
+
+    Returns:
+        Same as ``read_audio_source``
+
+    Raises:
+        TimeoutError: If no audio is available in time
+    """
+    handle = await page.wait_for_function(_AUDIO_SOURCE_JS, arg=Selectors.AUDIO_PLAYER, timeout=budget(timeout))
+    return await handle.json_value()
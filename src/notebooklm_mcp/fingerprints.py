@@ -0,0 +1,85 @@
+"""
+Cheap change fingerprints of notebooks.
+
+A fingerprint is computed from what one in-page script reads off the open
+notebook: the source titles (as ``indexing.sources_digest``, so it lines up
+with the digest stored with study guides), how many sources are still
+processing or failed, and the last-modified time where the UI shows one.
+It changes when a source is added, removed, renamed or finishes processing.
+Read-only tools take it back as ``if_changed_since`` and answer "not
+modified" without touching the browser when background prefetch has a
+fresh fingerprint of the notebook, and otherwise right after loading it,
+skipping the scrape or the question.
+"""
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from .extractors import read_notebook_state
+from .indexing import sources_digest
+from .metrics import REGISTRY
+
+
+CONDITIONAL_READS = REGISTRY.counter(
+    "notebooklm_conditional_reads_total",
+    "Reads with if_changed_since, by tool and whether the notebook had changed",
+    ["tool", "result"],
+)
+
+
+def fingerprint_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compute the fingerprint of a notebook state.
+
+    Args:
+        state: Result of ``extractors.read_notebook_state``
+
+    Returns:
+        Dictionary with ``fingerprint``, ``source_count``, ``sources_digest``,
+        ``pending_sources`` (processing or failed) and ``last_modified``
+    """
+    sources = state["sources"]
+    digest = sources_digest(sources)
+    pending = sum(1 for source in sources if source["state"] != "ready")
+    key = json.dumps([digest, pending, state.get("last_modified")])
+    return {
+        "fingerprint": hashlib.sha256(key.encode("utf-8")).hexdigest()[:16],
+        "source_count": len(sources),
+        "sources_digest": digest,
+        "pending_sources": pending,
+        "last_modified": state.get("last_modified"),
+    }
+
+
+async def read_fingerprint(page, timeout: int = 5000) -> Dict[str, Any]:
+    """
+    Read the fingerprint of the notebook open on a page.
+
+    Args:
+        page: Playwright page showing the notebook
+        timeout: Timeout in milliseconds for the sources list to appear
+
+    Returns:
+        Same as ``fingerprint_state``
+    """
+    return fingerprint_state(await read_notebook_state(page, timeout=timeout))
+
+
+def not_modified(tool: str, fingerprint: Dict[str, Any], if_changed_since: Optional[str]) -> bool:
+    """
+    Check a conditional read's fingerprint and count the outcome.
+
+    Args:
+        tool: Tool name
+        fingerprint: Current fingerprint from ``read_fingerprint``
+        if_changed_since: Fingerprint the caller has, or None for an
+            unconditional read
+
+    Returns:
+        True if the caller's fingerprint is still current
+    """
+    if not if_changed_since:
+        return False
+    unchanged = fingerprint["fingerprint"] == if_changed_since.strip()
+    CONDITIONAL_READS.inc(tool=tool, result="not_modified" if unchanged else "modified")
+    return unchanged
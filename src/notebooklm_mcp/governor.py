@@ -0,0 +1,203 @@
+"""
+Memory governor for pooled browser pages and contexts.
+
+NotebookLM is a heavy Angular app and long-lived pages leak memory. The
+governor tracks each page's use count, age and JS heap, plus the RSS of each
+account's browser process tree, and decides when a page or a whole context
+should be recycled. Recycling itself is done by the account pool, and only
+between calls.
+"""
+import asyncio
+import os
+import time
+from typing import Dict, Optional
+
+from .metrics import REGISTRY
+
+
+RECYCLES = REGISTRY.counter(
+    "notebooklm_recycles_total",
+    "Pages or browser contexts recycled by the memory governor",
+    ["account", "scope", "reason"],
+)
+BROWSER_RSS = REGISTRY.gauge(
+    "notebooklm_browser_rss_bytes",
+    "Resident memory of the account's browser process tree",
+    ["account"],
+)
+PAGE_JS_HEAP_MAX = REGISTRY.gauge(
+    "notebooklm_page_js_heap_max_bytes",
+    "Largest JS heap among the account's pages at their last release",
+    ["account"],
+)
+PAGE_JS_HEAP_TOTAL = REGISTRY.gauge(
+    "notebooklm_page_js_heap_total_bytes",
+    "Sum of the JS heaps of the account's pages at their last release",
+    ["account"],
+)
+
+_MB = 1024 * 1024
+
+
+class PageInfo:
+    """Usage statistics of one pooled page."""
+
+    def __init__(self):
+        self.created = time.monotonic()
+        self.uses = 0
+        self.js_heap: Optional[int] = None
+        self.crashed = False
+
+    @property
+    def age(self) -> float:
+        """Seconds since the page was opened."""
+        return time.monotonic() - self.created
+
+
+class MemoryLimits:
+    """Recycle thresholds, read from environment variables by default."""
+
+    def __init__(
+        self,
+        page_max_uses: Optional[int] = None,
+        page_max_age: Optional[float] = None,
+        page_max_heap_mb: Optional[float] = None,
+        browser_max_rss_mb: Optional[float] = None,
+        check_interval: Optional[float] = None
+    ):
+        """
+        Initialize limits. A limit of 0 disables that check.
+
+        Args:
+            page_max_uses: Calls served by a page before it is recycled
+            page_max_age: Seconds a page may live before it is recycled
+            page_max_heap_mb: JS heap (MB) above which a page is recycled
+            browser_max_rss_mb: Browser process tree RSS (MB) above which the
+                whole context is recycled
+            check_interval: Seconds between browser RSS measurements
+        """
+        self.page_max_uses = page_max_uses if page_max_uses is not None else int(
+            os.getenv("NOTEBOOKLM_PAGE_MAX_USES", "50"))
+        self.page_max_age = page_max_age if page_max_age is not None else float(
+            os.getenv("NOTEBOOKLM_PAGE_MAX_AGE", "1800"))
+        self.page_max_heap_mb = page_max_heap_mb if page_max_heap_mb is not None else float(
+            os.getenv("NOTEBOOKLM_PAGE_MAX_HEAP_MB", "512"))
+        self.browser_max_rss_mb = browser_max_rss_mb if browser_max_rss_mb is not None else float(
+            os.getenv("NOTEBOOKLM_BROWSER_MAX_RSS_MB", "2048"))
+        self.check_interval = check_interval if check_interval is not None else float(
+            os.getenv("NOTEBOOKLM_GOVERNOR_INTERVAL", "30"))
+
+
+class MemoryGovernor:
+    """Decides when pages and contexts must be recycled."""
+
+    def __init__(self, limits: Optional[MemoryLimits] = None):
+        self.limits = limits or MemoryLimits()
+
+    async def measure_page(self, page, info: PageInfo) -> None:
+        """
+        Record the page's current JS heap size.
+
+        Args:
+            page: Playwright page
+            info: Statistics of the page
+        """
+        try:
+            heap = await page.evaluate(
+                "() => (performance.memory && performance.memory.usedJSHeapSize) || null"
+            )
+        except Exception:
+            return
+        if heap:
+            info.js_heap = int(heap)
+
+    def page_recycle_reason(self, info: PageInfo) -> Optional[str]:
+        """
+        Check a page that was just released against the limits.
+
+        Args:
+            info: Statistics of the page
+
+        Returns:
+            Reason to recycle ("uses", "age" or "heap"), or None to keep it
+        """
+        limits = self.limits
+        if limits.page_max_uses and info.uses >= limits.page_max_uses:
+            return "uses"
+        if limits.page_max_age and info.age >= limits.page_max_age:
+            return "age"
+        if limits.page_max_heap_mb and info.js_heap and info.js_heap >= limits.page_max_heap_mb * _MB:
+            return "heap"
+        return None
+
+    async def browser_rss(self, browser) -> Optional[int]:
+        """
+        Measure the RSS of a browser's process tree.
+
+        Args:
+            browser: NotebookLMBrowser
+
+        Returns:
+            RSS in bytes, or None when it cannot be measured on this platform
+        """
+        pid = browser.driver_pid
+        if pid is None:
+            return None
+        return await asyncio.to_thread(process_tree_rss, pid)
+
+    def context_recycle_reason(self, rss: Optional[int]) -> Optional[str]:
+        """
+        Check a browser's RSS against the limits.
+
+        Args:
+            rss: Process tree RSS in bytes
+
+        Returns:
+            "rss" if the context should be recycled, None otherwise
+        """
+        if rss and self.limits.browser_max_rss_mb and rss >= self.limits.browser_max_rss_mb * _MB:
+            return "rss"
+        return None
+
+
+def process_tree_rss(root_pid: int) -> Optional[int]:
+    """
+    Sum the resident memory of a process and all its descendants.
+
+    Reads /proc, so it only works on Linux.
+
+    Args:
+        root_pid: PID at the top of the tree
+
+    Returns:
+        RSS in bytes, or None if /proc is unavailable
+    """
+    proc = "/proc"
+    if not os.path.isdir(proc):
+        return None
+
+    children: Dict[int, list] = {}
+    for entry in os.listdir(proc):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"{proc}/{entry}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name may contain spaces; fields after it are positional
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        try:
+            with open(f"{proc}/{pid}/statm") as f:
+                total += int(f.read().split()[1]) * page_size
+        except OSError:
+            pass
+        stack.extend(children.get(pid, []))
+    return total
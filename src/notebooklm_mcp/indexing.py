@@ -0,0 +1,235 @@
+"""
+Tracking of newly added sources until NotebookLM has processed them.
+
+A source is added by snapshotting the titles in the sources list, submitting
+it, and waiting for a title that was not there before; it is usable once
+that item stops showing a processing indicator. When the caller does not
+want to wait, the state is returned with a source handle: an opaque,
+self-contained token (notebook, title or the earlier titles, submit time)
+that ``get_source_status`` can poll from any process.
+"""
+import base64
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from .extractors import read_source_states, wait_for_new_source, wait_for_source_settled
+
+
+# How long a new source may take to appear in the list after a URL or text submit
+LIST_TIMEOUT_MS = 10000
+
+# How long a new source may take to settle when not waiting for indexing
+SETTLE_TIMEOUT_MS = 3000
+
+
+def get_index_timeout() -> int:
+    """Get the wait-until-indexed timeout in milliseconds from environment variable."""
+    return int(float(os.getenv("NOTEBOOKLM_INDEX_TIMEOUT", "180")) * 1000)
+
+
+def _title_hash(title: str) -> str:
+    return hashlib.sha1(title.encode("utf-8")).hexdigest()[:8]
+
+
+def expected_titles(titles: List[str]) -> List[str]:
+    """
+    Normalize the titles a new source may be listed under the way the
+    sources list is read (whitespace collapsed, at most 200 characters).
+
+    Args:
+        titles: Candidate titles, e.g. an upload's file name with and
+            without extension
+
+    Returns:
+        Normalized titles
+    """
+    return [" ".join(title.split())[:200] for title in titles]
+
+
+def sources_digest(sources: List[Dict[str, Any]]) -> str:
+    """
+    Digest of a notebook's source list, independent of list order.
+
+    Args:
+        sources: Sources with a ``title``
+
+    Returns:
+        Short hex digest that changes when a source is added, removed or renamed
+    """
+    titles = sorted(source["title"] for source in sources)
+    key = json.dumps([len(titles), titles])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+
+async def snapshot_titles(page) -> List[str]:
+    """
+    Read the titles in the sources list before adding a source.
+
+    Args:
+        page: Playwright page showing the notebook
+
+    Returns:
+        Source titles in list order
+    """
+    return [source["title"] for source in await read_source_states(page)]
+
+
+async def track_new_source(
+    page,
+    notebook_id: str,
+    known: List[str],
+    submitted_at: float,
+    list_timeout: int,
+    settle_timeout: int,
+    expected: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Wait for a submitted source to be listed and, within a bound, processed.
+
+    Args:
+        page: Playwright page showing the notebook
+        notebook_id: ID of the notebook
+        known: Titles from ``snapshot_titles`` taken before the submit
+        submitted_at: ``time.time()`` of the submit
+        list_timeout: Milliseconds to wait for the source to be listed
+        settle_timeout: Milliseconds to wait for it to finish processing
+        expected: Titles from ``expected_titles`` the source will be listed
+            under, or None to take the first new source. Needed when other
+            sources may be added to the notebook at the same time.
+
+    Returns:
+        Dictionary with ``title`` (None if not listed yet), ``state``
+        (``pending``, ``processing``, ``ready`` or ``failed``),
+        ``listed_seconds`` and ``processing_seconds`` since the submit (None
+        until reached) and ``source_handle`` for ``get_source_status``
+    """
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+    result: Dict[str, Any] = {
+        "title": None,
+        "state": "pending",
+        "listed_seconds": None,
+        "processing_seconds": None,
+    }
+    try:
+        index = await wait_for_new_source(page, known, timeout=list_timeout, expected=expected)
+    except PlaywrightTimeoutError:
+        result["source_handle"] = encode_source_handle(notebook_id, None, known, submitted_at, expected)
+        return result
+    result["listed_seconds"] = round(time.time() - submitted_at, 3)
+
+    try:
+        await wait_for_source_settled(page, index, timeout=settle_timeout, known=known, expected=expected)
+    except PlaywrightTimeoutError:
+        pass
+
+    states = await read_source_states(page)
+    if expected is not None:
+        # Other sources may have been listed since, so the index can be stale
+        source = find_tracked_source(states, {
+            "title": None,
+            "known_hashes": [_title_hash(title) for title in known],
+            "expected": expected,
+        })
+    else:
+        source = states[index] if index < len(states) else None
+    if source is not None:
+        result["title"] = source["title"]
+        result["state"] = source["state"]
+    else:
+        result["state"] = "processing"
+    if result["state"] in ("ready", "failed"):
+        result["processing_seconds"] = round(time.time() - submitted_at, 3)
+    result["source_handle"] = encode_source_handle(notebook_id, result["title"], known, submitted_at, expected)
+    return result
+
+
+def encode_source_handle(
+    notebook_id: str,
+    title: Optional[str],
+    known: List[str],
+    submitted_at: float,
+    expected: Optional[List[str]] = None
+) -> str:
+    """
+    Build a source handle.
+
+    Args:
+        notebook_id: Notebook the source was added to
+        title: Title of the new source, or None if it was not listed yet
+        known: Titles listed before the submit (kept as short hashes, only
+            needed while the title is unknown)
+        submitted_at: ``time.time()`` of the submit
+        expected: Titles the source will be listed under, if known (only
+            needed while the title is unknown)
+
+    Returns:
+        Opaque handle string
+    """
+    payload: Dict[str, Any] = {"n": notebook_id, "s": round(submitted_at, 3)}
+    if title is not None:
+        payload["t"] = title
+    else:
+        payload["k"] = [_title_hash(known_title) for known_title in known]
+        if expected is not None:
+            payload["e"] = expected
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_source_handle(handle: str) -> Dict[str, Any]:
+    """
+    Read a source handle.
+
+    Args:
+        handle: Handle returned by add_source
+
+    Returns:
+        Dictionary with ``notebook_id``, ``title`` (may be None),
+        ``known_hashes``, ``expected`` (may be None) and ``submitted_at``
+
+    Raises:
+        ValueError: If the handle is malformed
+    """
+    try:
+        padded = handle + "=" * (-len(handle) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return {
+            "notebook_id": str(payload["n"]),
+            "title": payload.get("t"),
+            "known_hashes": list(payload.get("k", [])),
+            "expected": list(payload["e"]) if "e" in payload else None,
+            "submitted_at": float(payload["s"]),
+        }
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid source handle")
+
+
+def find_tracked_source(states: List[Dict[str, Any]], handle: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Find the source a handle refers to in the current sources list.
+
+    Args:
+        states: Sources from ``read_source_states``
+        handle: Decoded handle
+
+    Returns:
+        The source, or None if it is not listed
+    """
+    if handle["title"] is not None:
+        matches = [source for source in states if source["title"] == handle["title"]]
+        return matches[-1] if matches else None
+
+    remaining: Dict[str, int] = {}
+    for known_hash in handle["known_hashes"]:
+        remaining[known_hash] = remaining.get(known_hash, 0) + 1
+    expected = handle.get("expected")
+    for source in states:
+        title_hash = _title_hash(source["title"])
+        if remaining.get(title_hash):
+            remaining[title_hash] -= 1
+        elif expected is None or source["title"] in expected:
+            return source
+    return None
@@ -0,0 +1,228 @@
+"""
+Persistent ledger of sources added to notebooks.
+
+``add_source`` records a content key for every source it adds: the
+normalized URL for websites and YouTube videos, a SHA-256 digest for text
+and uploaded files. Re-running an ingestion job then skips items the
+notebook already has with a dictionary lookup instead of minutes of browser
+work. The ledger is one JSON file under ``NOTEBOOKLM_DATA_DIR``, shared by
+worker processes: it is reloaded when another process has changed it, and
+updated under a file lock and rewritten atomically.
+"""
+import hashlib
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .metrics import REGISTRY
+from .storage import JsonFile, get_data_dir
+
+
+SOURCE_LEDGER_CHECKS = REGISTRY.counter(
+    "notebooklm_source_ledger_checks_total",
+    "add_source ledger checks, by result",
+    ["result"],
+)
+
+# Query parameters that never change what a URL points to
+_TRACKING_PARAMS = re.compile(r"^(utm_.*|fbclid|gclid|mc_cid|mc_eid|ref|ref_src)$", re.IGNORECASE)
+_YOUTUBE_ID = re.compile(r"^[A-Za-z0-9_-]{11}$")
+
+
+def get_ledger_mode() -> bool:
+    """Get source ledger setting from environment variable."""
+    return os.getenv("NOTEBOOKLM_SOURCE_LEDGER", "true").lower() == "true"
+
+
+def _youtube_video_id(parts) -> Optional[str]:
+    host = parts.netloc.lower().split(":")[0]
+    if host.startswith("www.") or host.startswith("m."):
+        host = host.split(".", 1)[1]
+    path = parts.path.strip("/").split("/")
+    video_id = None
+    if host == "youtu.be":
+        video_id = path[0] if path else None
+    elif host in ("youtube.com", "music.youtube.com"):
+        if path and path[0] == "watch":
+            video_id = dict(parse_qsl(parts.query)).get("v")
+        elif len(path) >= 2 and path[0] in ("shorts", "embed", "live", "v"):
+            video_id = path[1]
+    return video_id if video_id and _YOUTUBE_ID.match(video_id) else None
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a URL so that equivalent spellings compare equal.
+
+    Lowercases scheme and host, drops default ports, fragments, tracking
+    parameters and trailing slashes, and sorts the query. YouTube links of
+    any form become ``youtube:<video id>``.
+
+    Args:
+        url: URL as given to add_source
+
+    Returns:
+        Normalized URL
+    """
+    url = url.strip()
+    if "://" not in url:
+        url = "https://" + url
+    parts = urlsplit(url)
+
+    video_id = _youtube_video_id(parts)
+    if video_id:
+        return f"youtube:{video_id}"
+
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    # http and https copies of a page are the same source
+    if scheme == "http":
+        scheme = "https"
+    path = re.sub(r"/+", "/", parts.path).rstrip("/")
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _TRACKING_PARAMS.match(key)
+    ))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def _listed_title(title: str) -> str:
+    # Cached source lists keep an item's whole text cut to 100 characters;
+    # its first line is the title
+    return " ".join(title.strip().split("\n")[0].split())[:100]
+
+
+def source_key(source_type: str, content: str) -> str:
+    """
+    Compute the ledger key of a source.
+
+    Args:
+        source_type: add_source source type
+        content: URL, text content, or path of a local file
+
+    Returns:
+        ``url:<normalized URL>``, ``youtube:<video id>``, ``text:<sha256>``
+        or ``file:<sha256 of the file contents>``
+    """
+    if source_type == "file":
+        digest = hashlib.sha256()
+        with open(content, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return "file:" + digest.hexdigest()
+    if source_type == "text":
+        # Line endings and trailing whitespace do not make a new document
+        text = "\n".join(line.rstrip() for line in content.replace("\r\n", "\n").split("\n")).strip()
+        return "text:" + hashlib.sha256(text.encode("utf-8")).hexdigest()
+    normalized = normalize_url(content)
+    return normalized if normalized.startswith("youtube:") else f"url:{normalized}"
+
+
+class SourceLedger:
+    """Content keys of the sources added to each notebook, persisted as JSON."""
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Initialize ledger.
+
+        Args:
+            path: Ledger file (default: ``sources.json`` in the data directory)
+        """
+        self._file = JsonFile(Path(path) if path else get_data_dir() / "sources.json")
+
+    @property
+    def path(self) -> Path:
+        """Ledger file."""
+        return self._file.path
+
+    def get(self, notebook_id: str, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a source.
+
+        Args:
+            notebook_id: Notebook ID
+            key: Key from ``source_key``
+
+        Returns:
+            Ledger entry (``source_type``, ``added_at``), or None if not recorded
+        """
+        entry = self._file.data.get(notebook_id, {}).get(key)
+        return dict(entry) if entry is not None else None
+
+    def count(self, notebook_id: str) -> int:
+        """Number of sources recorded for a notebook, not counting aliases."""
+        return sum(1 for entry in self._file.data.get(notebook_id, {}).values() if not entry.get("alias"))
+
+    def check(
+        self,
+        notebook_id: str,
+        key: str,
+        live_titles: Optional[List[str]] = None
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Check whether a notebook still has a recorded source.
+
+        Args:
+            notebook_id: Notebook ID
+            key: Key from ``source_key``
+            live_titles: Titles of the notebook's current sources, if known
+
+        Returns:
+            Tuple of the result and the ledger entry: ``new`` (not
+            recorded), ``skipped`` (recorded and, where it can be told,
+            still listed) or ``stale`` (recorded, but its title is no
+            longer among ``live_titles``)
+        """
+        entry = self.get(notebook_id, key)
+        if entry is None:
+            return "new", None
+        if live_titles is None:
+            return "skipped", entry
+        if entry.get("parts") is not None:
+            # A split document is present while all of its parts are
+            listed = all(self.check(notebook_id, part, live_titles)[0] == "skipped" for part in entry["parts"])
+        elif entry.get("title"):
+            listed = _listed_title(entry["title"]) in {_listed_title(title) for title in live_titles}
+        else:
+            # Recorded before its title was listed: nothing to compare
+            listed = True
+        return ("skipped" if listed else "stale"), entry
+
+    def record(
+        self,
+        notebook_id: str,
+        key: str,
+        source_type: str,
+        alias: bool = False,
+        title: Optional[str] = None,
+        parts: Optional[List[str]] = None
+    ) -> None:
+        """
+        Record a source as added.
+
+        Args:
+            notebook_id: Notebook ID
+            key: Key from ``source_key``
+            source_type: add_source source type
+            alias: The key stands for sources recorded under their own keys
+                (a split document and its parts), so it is not counted as
+                a source of its own
+            title: Title the source is listed under, if known
+            parts: Keys of the sources an alias stands for
+        """
+        entry: Dict[str, Any] = {"source_type": source_type, "added_at": time.time()}
+        if alias:
+            entry["alias"] = True
+        if title:
+            entry["title"] = title
+        if parts is not None:
+            entry["parts"] = parts
+        with self._file.update() as data:
+            data.setdefault(notebook_id, {})[key] = entry
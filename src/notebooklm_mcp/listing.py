@@ -0,0 +1,165 @@
+"""
+Filtering, sorting and paging of notebook listings.
+
+Rows come from ``extractors.read_notebook_rows``; all filtering and sorting
+happens on that metadata, so only the rows of the requested page ever need
+to be opened. Cursors are opaque to clients and bound to the filters they
+were issued for.
+"""
+import base64
+import hashlib
+import json
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Literal, Optional, Tuple
+
+
+SortOrder = Literal["default", "title", "created_asc", "created_desc"]
+
+_DATE_FORMATS = ("%b %d, %Y", "%B %d, %Y", "%d %b %Y", "%d %B %Y", "%Y-%m-%d", "%m/%d/%Y", "%d/%m/%Y")
+
+
+def parse_created(text: Optional[str], today: Optional[date] = None) -> Optional[date]:
+    """
+    Parse a creation date as displayed in the notebook table.
+
+    Args:
+        text: Displayed date ("Mar 5, 2025", "2025-03-05", "Today", ...)
+        today: Reference date for relative values (default: today)
+
+    Returns:
+        Parsed date, or None if the text is not a recognized date
+    """
+    if not text:
+        return None
+    text = text.strip()
+    today = today or date.today()
+    relative = {"today": 0, "yesterday": 1}
+    if text.lower() in relative:
+        return today - timedelta(days=relative[text.lower()])
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+class NotebookQuery:
+    """Filters and sort order of a notebook listing."""
+
+    def __init__(
+        self,
+        title_prefix: Optional[str] = None,
+        created_after: Optional[str] = None,
+        role: Optional[str] = None,
+        sort: SortOrder = "default"
+    ):
+        """
+        Initialize query.
+
+        Args:
+            title_prefix: Keep notebooks whose title starts with this (case-insensitive)
+            created_after: Keep notebooks created on or after this ISO date
+            role: Keep notebooks where the account has this role (case-insensitive)
+            sort: Sort order; "default" keeps NotebookLM's own order
+
+        Raises:
+            ValueError: If created_after is not an ISO date
+        """
+        self.title_prefix = title_prefix.strip().lower() if title_prefix else None
+        self.created_after: Optional[date] = None
+        if created_after:
+            try:
+                self.created_after = date.fromisoformat(created_after.strip()[:10])
+            except ValueError:
+                raise ValueError(f"created_after must be an ISO date (YYYY-MM-DD), got: {created_after}")
+        self.role = role.strip().lower() if role else None
+        self.sort = sort
+
+    @property
+    def signature(self) -> str:
+        """Short hash identifying the filters and sort order."""
+        key = json.dumps([
+            self.title_prefix,
+            self.created_after.isoformat() if self.created_after else None,
+            self.role,
+            self.sort,
+        ])
+        return hashlib.sha1(key.encode()).hexdigest()[:12]
+
+    def matches(self, row: Dict[str, Any]) -> bool:
+        """Check whether a row passes the filters."""
+        if self.title_prefix and not (row.get("title") or "").lower().startswith(self.title_prefix):
+            return False
+        if self.role and (row.get("role") or "").strip().lower() != self.role:
+            return False
+        if self.created_after:
+            # Rows without a readable date cannot be shown to match
+            created = parse_created(row.get("created"))
+            if created is None or created < self.created_after:
+                return False
+        return True
+
+    def apply(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Filter and sort rows.
+
+        Args:
+            rows: Rows in page order
+
+        Returns:
+            Matching rows in the requested order
+        """
+        matching = [row for row in rows if self.matches(row)]
+        if self.sort == "title":
+            matching.sort(key=lambda row: (row.get("title") or "").lower())
+        elif self.sort in ("created_asc", "created_desc"):
+            descending = self.sort == "created_desc"
+            dated = [row for row in matching if parse_created(row.get("created"))]
+            undated = [row for row in matching if not parse_created(row.get("created"))]
+            dated.sort(key=lambda row: parse_created(row.get("created")) or date.min, reverse=descending)
+            # Undated rows go last either way
+            matching = dated + undated
+        return matching
+
+
+def encode_cursor(query: NotebookQuery, account_index: int, offset: int, limit: int) -> str:
+    """
+    Build a continuation cursor.
+
+    Args:
+        query: Query the cursor continues
+        account_index: Position of the account being listed
+        offset: Position of the next row in the account's filtered listing
+        limit: Page size
+
+    Returns:
+        Opaque cursor string
+    """
+    payload = {"q": query.signature, "a": account_index, "o": offset, "l": limit}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, query: NotebookQuery) -> Tuple[int, int, int]:
+    """
+    Read a continuation cursor.
+
+    Args:
+        cursor: Cursor returned by a previous page
+        query: Query of the current call
+
+    Returns:
+        Tuple of (account_index, offset, limit)
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for other filters
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        signature, account_index, offset, limit = payload["q"], int(payload["a"]), int(payload["o"]), int(payload["l"])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if signature != query.signature:
+        raise ValueError("Cursor was issued for different filters or sort order")
+    return account_index, offset, limit
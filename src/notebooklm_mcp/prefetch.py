@@ -0,0 +1,196 @@
+"""
+Background prefetch of notebook sources.
+
+Agents usually call ``get_notebook_sources`` on several notebooks right after
+``list_notebooks``. The prefetcher visits listed notebooks with spare pool
+capacity and keeps their sources and fingerprint in a TTL cache, so those
+calls, and conditional reads of an unchanged notebook, return without
+touching the browser. It only uses background leases and stops as
+soon as foreground calls need the pool.
+"""
+import asyncio
+import copy
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .accounts import AccountPool, PageLease, PoolBusyError
+from .calls import start_background_task
+from .metrics import REGISTRY
+
+
+SOURCE_CACHE_LOOKUPS = REGISTRY.counter(
+    "notebooklm_source_cache_lookups_total",
+    "Source cache lookups by get_notebook_sources, by result",
+    ["result"],
+)
+PREFETCHES = REGISTRY.counter(
+    "notebooklm_prefetch_total",
+    "Notebook source prefetches, by outcome",
+    ["outcome"],
+)
+
+# Expiry time, sources and the fingerprint read with them
+_Entry = Tuple[float, List[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+
+def get_prefetch_mode() -> bool:
+    """Get background source prefetch setting from environment variable."""
+    return os.getenv("NOTEBOOKLM_PREFETCH", "false").lower() == "true"
+
+
+def get_prefetch_ttl() -> float:
+    """Get the source cache TTL in seconds from environment variable."""
+    return float(os.getenv("NOTEBOOKLM_PREFETCH_TTL", "300"))
+
+
+def get_prefetch_max() -> int:
+    """Get the maximum number of notebooks prefetched per listing from environment variable."""
+    return max(0, int(os.getenv("NOTEBOOKLM_PREFETCH_MAX", "10")))
+
+
+class SourceCache:
+    """Notebook sources and fingerprints with an expiry time."""
+
+    def __init__(self, ttl: Optional[float] = None):
+        """
+        Initialize cache.
+
+        Args:
+            ttl: Seconds an entry stays fresh (default from environment)
+        """
+        self.ttl = ttl if ttl is not None else get_prefetch_ttl()
+        self._entries: Dict[str, _Entry] = {}
+
+    def _entry(self, notebook_id: str) -> Optional[_Entry]:
+        entry = self._entries.get(notebook_id)
+        if entry is not None and time.monotonic() >= entry[0]:
+            del self._entries[notebook_id]
+            return None
+        return entry
+
+    def get(self, notebook_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get fresh cached sources.
+
+        Args:
+            notebook_id: Notebook ID
+
+        Returns:
+            Copy of the cached sources, or None if missing or expired
+        """
+        entry = self._entry(notebook_id)
+        return copy.deepcopy(entry[1]) if entry is not None else None
+
+    def fingerprint(self, notebook_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the fingerprint read together with fresh cached sources.
+
+        Args:
+            notebook_id: Notebook ID
+
+        Returns:
+            Copy of the fingerprint (as ``fingerprints.fingerprint_state``),
+            or None if missing, expired or stored without one
+        """
+        entry = self._entry(notebook_id)
+        return dict(entry[2]) if entry is not None and entry[2] is not None else None
+
+    def fresh(self, notebook_id: str) -> bool:
+        """Check whether the notebook has a fresh entry."""
+        return self._entry(notebook_id) is not None
+
+    def put(
+        self,
+        notebook_id: str,
+        sources: List[Dict[str, Any]],
+        fingerprint: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Store sources for a notebook, with the fingerprint read alongside them."""
+        if self.ttl > 0:
+            self._entries[notebook_id] = (
+                time.monotonic() + self.ttl,
+                copy.deepcopy(sources),
+                dict(fingerprint) if fingerprint is not None else None,
+            )
+
+    def invalidate(self, notebook_id: str) -> None:
+        """Drop a notebook's entry, e.g. after its sources changed."""
+        self._entries.pop(notebook_id, None)
+
+
+class SourcePrefetcher:
+    """Fills a SourceCache in the background with spare pool capacity."""
+
+    def __init__(
+        self,
+        pool: AccountPool,
+        cache: SourceCache,
+        fetch: Callable[[PageLease, str], Awaitable[Tuple[List[Dict[str, Any]], Dict[str, Any]]]],
+        max_notebooks: Optional[int] = None
+    ):
+        """
+        Initialize prefetcher.
+
+        Args:
+            pool: Account pool to take background leases from
+            cache: Cache to fill
+            fetch: Reads the sources and fingerprint of a notebook on a
+                leased page
+            max_notebooks: Maximum notebooks prefetched per listing
+                (default from environment)
+        """
+        self.pool = pool
+        self.cache = cache
+        self.fetch = fetch
+        self.max_notebooks = max_notebooks if max_notebooks is not None else get_prefetch_max()
+        self._queue: List[str] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def schedule(self, notebook_ids: Iterable[str]) -> None:
+        """
+        Queue notebooks for prefetch, replacing any earlier queue.
+
+        Args:
+            notebook_ids: Notebooks in the order they were listed
+        """
+        queue: List[str] = []
+        for notebook_id in notebook_ids:
+            if len(queue) >= self.max_notebooks:
+                break
+            if notebook_id not in queue and not self.cache.fresh(notebook_id):
+                queue.append(notebook_id)
+        self._queue = queue
+
+        if self._queue and (self._task is None or self._task.done()):
+            # Not part of the listing call that scheduled it
+            self._task = start_background_task(self._run())
+
+    async def _run(self) -> None:
+        # Let the call that scheduled us return its result first
+        await asyncio.sleep(0)
+        while self._queue:
+            notebook_id = self._queue.pop(0)
+            if self.cache.fresh(notebook_id):
+                continue
+            try:
+                async with self.pool.lease(notebook_id, background=True) as browser:
+                    sources, fingerprint = await self.fetch(browser, notebook_id)
+            except PoolBusyError:
+                # Foreground calls need the pool: give up on the rest
+                PREFETCHES.inc(len(self._queue) + 1, outcome="skipped_busy")
+                self._queue = []
+                return
+            except Exception:
+                PREFETCHES.inc(outcome="failed")
+                continue
+            self.cache.put(notebook_id, sources, fingerprint)
+            PREFETCHES.inc(outcome="fetched")
+
+    async def close(self) -> None:
+        """Stop prefetching."""
+        self._queue = []
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
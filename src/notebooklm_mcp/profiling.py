@@ -0,0 +1,113 @@
+"""
+Sampled cProfile profiles of tool calls.
+
+With ``NOTEBOOKLM_PROFILE_RATE`` above 0, that fraction of tool calls runs
+under cProfile and the stats are written to ``NOTEBOOKLM_PROFILE_DIR`` as
+``<time>-<tool>-<latency>ms-<pid>.prof`` (open with ``python -m pstats`` or
+snakeviz). The rate defaults to 0, which costs one comparison per call.
+
+cProfile sees the whole thread, so a profile also contains whatever other
+calls ran on the event loop at the same time, and only one call per
+process is profiled at a time.
+"""
+import cProfile
+import os
+import random
+import time
+from pathlib import Path
+from typing import Optional
+
+from .metrics import REGISTRY
+from .storage import get_data_dir
+
+
+PROFILED_CALLS = REGISTRY.counter(
+    "notebooklm_profiled_calls_total",
+    "Tool calls run under the profiler",
+    ["tool"],
+)
+
+# Profile currently collecting in this process, if any
+_active: Optional[cProfile.Profile] = None
+
+
+def get_profile_rate() -> float:
+    """Get the fraction of tool calls to profile from environment variable."""
+    return min(1.0, max(0.0, float(os.getenv("NOTEBOOKLM_PROFILE_RATE", "0"))))
+
+
+def get_profile_dir() -> Path:
+    """Get the directory for call profiles from environment variable."""
+    value = os.getenv("NOTEBOOKLM_PROFILE_DIR")
+    return Path(value).expanduser() if value else get_data_dir() / "profiles"
+
+
+def get_profile_max_files() -> int:
+    """Get the number of profiles kept on disk from environment variable."""
+    return max(1, int(os.getenv("NOTEBOOKLM_PROFILE_MAX_FILES", "100")))
+
+
+def start_profile() -> Optional[cProfile.Profile]:
+    """
+    Start profiling the current call if it is sampled.
+
+    Returns:
+        The running profiler, or None if the call is not sampled or another
+        call is already being profiled
+    """
+    global _active
+    rate = get_profile_rate()
+    if rate <= 0 or _active is not None or random.random() >= rate:
+        return None
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # Another profiler or debugger owns the thread
+        return None
+    _active = profile
+    return profile
+
+
+def save_profile(profile: cProfile.Profile, tool: str, seconds: float) -> Optional[Path]:
+    """
+    Stop a profiler started by ``start_profile`` and write its stats.
+
+    Args:
+        profile: Running profiler
+        tool: Tool name
+        seconds: Call latency
+
+    Returns:
+        Path of the profile, or None if it could not be written
+    """
+    global _active
+    profile.disable()
+    _active = None
+
+    directory = get_profile_dir()
+    path = directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{tool}-{round(seconds * 1000)}ms-{os.getpid()}.prof"
+    tmp = path.with_name(f".{path.name}.tmp")
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        profile.dump_stats(str(tmp))
+        os.replace(tmp, path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        return None
+
+    PROFILED_CALLS.inc(tool=tool)
+    _prune(directory, get_profile_max_files())
+    return path
+
+
+def _prune(directory: Path, keep: int) -> None:
+    profiles = []
+    for path in directory.glob("*.prof"):
+        try:
+            profiles.append((path.stat().st_mtime_ns, path))
+        except OSError:
+            continue
+    profiles.sort(reverse=True)
+    for _, path in profiles[keep:]:
+        path.unlink(missing_ok=True)
@@ -0,0 +1,320 @@
+"""
+Flight recorder for slow and failed tool calls.
+
+Every call keeps a small in-memory log while it runs: the phases it went
+through and each selector it waited for, with timings, and the last few
+screenshots and DOMs of its page, taken in the background as it enters a
+new phase. When a call fails, or takes longer than
+``NOTEBOOKLM_RECORDER_SLOW_SECONDS``, the log is written to
+``NOTEBOOKLM_DATA_DIR/recordings`` with those snapshots and one of the page
+as the call left it, so a call that stalled also shows the page from
+before the stall. Nothing is written for normal calls. The directory keeps the newest
+``NOTEBOOKLM_RECORDER_MAX_RECORDS`` recordings; older ones are deleted.
+"""
+import asyncio
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .calls import CallContext, current_call
+from .metrics import REGISTRY
+from .storage import atomic_write, get_data_dir
+
+
+# Snapshots taken closer together than this show the same page
+FRAME_INTERVAL_SECONDS = 1.0
+# Snapshots are diagnostics, not part of the call, so they have their own limit
+SNAPSHOT_TIMEOUT_MS = 3000
+MAX_HTML_BYTES = 1024 * 1024
+MAX_ARGUMENT_CHARS = 200
+# IDs as written by finish_call: <time>-<tool>-<random hex>
+_RECORD_ID = re.compile(r"\d{8}-\d{6}-[A-Za-z0-9_]+-[0-9a-f]{8}")
+
+FLIGHT_RECORDINGS = REGISTRY.counter(
+    "notebooklm_flight_recordings_total",
+    "Tool calls written to the flight recorder, by reason",
+    ["tool", "reason"],
+)
+
+
+def get_recorder_mode() -> bool:
+    """Get flight recorder setting from environment variable."""
+    return os.getenv("NOTEBOOKLM_RECORDER", "true").lower() == "true"
+
+
+def get_recorder_slow_seconds() -> float:
+    """Get the latency above which calls are recorded, in seconds, from environment variable."""
+    return float(os.getenv("NOTEBOOKLM_RECORDER_SLOW_SECONDS", "60"))
+
+
+def get_recorder_max_records() -> int:
+    """Get the number of recordings kept on disk from environment variable."""
+    return max(1, int(os.getenv("NOTEBOOKLM_RECORDER_MAX_RECORDS", "50")))
+
+
+def get_recorder_phase_frames() -> bool:
+    """Get the setting for snapshots at phase changes from environment variable."""
+    return os.getenv("NOTEBOOKLM_RECORDER_PHASE_FRAMES", "true").lower() == "true"
+
+
+def get_recordings_dir() -> Path:
+    """Get the directory of flight recordings."""
+    return get_data_dir() / "recordings"
+
+
+def is_slow(call: CallContext) -> bool:
+    """Check whether a call has been running longer than the recording threshold."""
+    return call.elapsed() >= get_recorder_slow_seconds()
+
+
+def watch_page(page) -> None:
+    """
+    Snapshot a page as the current call moves through its phases.
+
+    Args:
+        page: Page the call has just leased, or None when it gives the
+            page back
+    """
+    call = current_call()
+    if call is not None:
+        call.page = page
+
+
+def snapshot_phase(call: CallContext) -> None:
+    """
+    Snapshot the call's page in the background as it enters a new phase.
+
+    Skipped while the previous snapshot is still being taken or was taken
+    less than ``FRAME_INTERVAL_SECONDS`` ago.
+
+    Args:
+        call: Call that changed phase, with a watched page
+    """
+    if not get_recorder_mode() or not get_recorder_phase_frames() or call.page.is_closed():
+        return
+    if call.pending_frame is not None and not call.pending_frame.done():
+        return
+    if call.frames and call.elapsed() - call.frames[-1]["at"] < FRAME_INTERVAL_SECONDS:
+        return
+    call.pending_frame = asyncio.ensure_future(capture_frame(call.page, f"phase:{call.phase}", force=True))
+
+
+async def capture_frame(page, label: str, force: bool = False) -> None:
+    """
+    Keep a screenshot and the DOM of a page in the current call's log.
+
+    Does nothing outside a tool call or with the recorder off. Failures are
+    ignored: a page that cannot be captured must not fail the call.
+
+    Args:
+        page: Playwright page
+        label: What the snapshot shows, e.g. ``phase:navigate``, ``error``
+            or ``slow``
+        force: Take it even if the last snapshot is less than
+            ``FRAME_INTERVAL_SECONDS`` old
+    """
+    call = current_call()
+    if call is None or not get_recorder_mode() or page.is_closed():
+        return
+    at = call.elapsed()
+    if not force and call.frames and at - call.frames[-1]["at"] < FRAME_INTERVAL_SECONDS:
+        return
+
+    frame: Dict[str, Any] = {"label": label, "at": round(at, 3), "phase": call.phase, "url": page.url}
+    try:
+        frame["screenshot"] = await page.screenshot(type="jpeg", quality=60, timeout=SNAPSHOT_TIMEOUT_MS)
+    except Exception:
+        pass
+    try:
+        html = await asyncio.wait_for(page.content(), SNAPSHOT_TIMEOUT_MS / 1000)
+        frame["html"] = html.encode("utf-8")[:MAX_HTML_BYTES]
+    except Exception:
+        pass
+    call.frames.append(frame)
+
+
+async def capture_outlier(page, error: Optional[BaseException] = None) -> None:
+    """
+    Snapshot a page at the end of a call that failed or ran slow.
+
+    Args:
+        page: Page the call used
+        error: The call's error, or None if it succeeded. Cancellation and
+            other non-``Exception`` errors are not captured.
+    """
+    call = current_call()
+    if call is None:
+        return
+    pending, call.pending_frame = call.pending_frame, None
+    if isinstance(error, Exception):
+        label: Optional[str] = "error"
+    elif error is None and is_slow(call):
+        label = "slow"
+    else:
+        label = None
+    if pending is not None and not pending.done():
+        if label is None:
+            pending.cancel()
+        # Bounded by the snapshot timeouts
+        await asyncio.gather(pending, return_exceptions=True)
+    if label is not None:
+        await capture_frame(page, label, force=True)
+
+
+def _summarize_arguments(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    summary = {}
+    for name, value in arguments.items():
+        if isinstance(value, str) and len(value) > MAX_ARGUMENT_CHARS:
+            value = value[:MAX_ARGUMENT_CHARS] + f"... ({len(value)} chars)"
+        elif not isinstance(value, (str, int, float, bool, type(None))):
+            value = repr(value)[:MAX_ARGUMENT_CHARS]
+        summary[name] = value
+    return summary
+
+
+def finish_call(
+    call: CallContext,
+    arguments: Dict[str, Any],
+    error: Optional[BaseException] = None
+) -> Optional[str]:
+    """
+    Write a finished call to the recorder if it failed or ran slow.
+
+    Args:
+        call: Context of the finished call
+        arguments: Tool arguments
+        error: The exception the call ended with, or None if it succeeded
+
+    Returns:
+        Recording ID, or None if the call was not recorded
+    """
+    if not get_recorder_mode():
+        return None
+    elapsed = call.elapsed()
+    slow = elapsed >= get_recorder_slow_seconds()
+    if isinstance(error, asyncio.CancelledError):
+        # Clients cancel for their own reasons; only slow calls say something
+        reason = "cancelled" if slow else None
+    elif error is not None:
+        reason = "error"
+    else:
+        reason = "slow" if slow else None
+    if reason is None:
+        return None
+
+    record_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{call.tool}-{uuid.uuid4().hex[:8]}"
+    directory = get_recordings_dir() / record_id
+    frames = []
+    try:
+        for i, frame in enumerate(call.frames):
+            entry = {key: frame[key] for key in ("label", "at", "phase", "url")}
+            if "screenshot" in frame:
+                entry["screenshot"] = f"frame-{i}.jpg"
+                atomic_write(directory / entry["screenshot"], frame["screenshot"])
+            if "html" in frame:
+                entry["html"] = f"frame-{i}.html"
+                atomic_write(directory / entry["html"], frame["html"])
+            frames.append(entry)
+
+        record = {
+            "id": record_id,
+            "tool": call.tool,
+            "reason": reason,
+            "error": (str(error) or type(error).__name__) if error is not None else None,
+            "started_at": time.time() - elapsed,
+            "seconds": round(elapsed, 3),
+            "timeout": call.timeout,
+            "phase": call.phase,
+            "attempts": call.attempt,
+            "pid": os.getpid(),
+            "arguments": _summarize_arguments(arguments),
+            "steps": list(call.steps),
+            "selectors": list(call.selector_attempts),
+            "frames": frames,
+        }
+        atomic_write(directory / "record.json", json.dumps(record, indent=2).encode("utf-8"))
+    except OSError:
+        shutil.rmtree(directory, ignore_errors=True)
+        return None
+
+    FLIGHT_RECORDINGS.inc(tool=call.tool, reason=reason)
+    _prune(get_recorder_max_records())
+    return record_id
+
+
+def _recording_dirs() -> List[Path]:
+    """Recording directories, newest first."""
+    root = get_recordings_dir()
+    if not root.is_dir():
+        return []
+    entries = []
+    for path in root.iterdir():
+        try:
+            entries.append((path.stat().st_mtime_ns, path))
+        except OSError:
+            continue
+    return [path for _, path in sorted(entries, key=lambda entry: (entry[0], entry[1].name), reverse=True)]
+
+
+def _prune(keep: int) -> None:
+    for path in _recording_dirs()[keep:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def list_recordings(limit: int = 20, tool: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Summaries of the newest recordings.
+
+    Args:
+        limit: Maximum number of recordings
+        tool: Only recordings of this tool
+
+    Returns:
+        Recording summaries, newest first
+    """
+    summaries: List[Dict[str, Any]] = []
+    for path in _recording_dirs():
+        if len(summaries) >= limit:
+            break
+        try:
+            record = json.loads((path / "record.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            # Still being written, or pruned by another process
+            continue
+        if tool and record.get("tool") != tool:
+            continue
+        summaries.append({
+            key: record.get(key)
+            for key in ("id", "tool", "reason", "error", "started_at", "seconds", "phase")
+        })
+    return summaries
+
+
+def get_recording(record_id: str) -> Dict[str, Any]:
+    """
+    Load one recording.
+
+    Args:
+        record_id: Recording ID
+
+    Returns:
+        The recording, with the screenshot and DOM file names resolved to
+        absolute paths
+
+    Raises:
+        ValueError: If the recording does not exist
+    """
+    directory = get_recordings_dir() / record_id
+    if not _RECORD_ID.fullmatch(record_id) or not (directory / "record.json").is_file():
+        raise ValueError(f"Unknown recording: {record_id}")
+    record = json.loads((directory / "record.json").read_text(encoding="utf-8"))
+    for frame in record.get("frames", []):
+        for key in ("screenshot", "html"):
+            if key in frame:
+                frame[key] = str(directory / frame[key])
+    return record
@@ -6,8 +6,11 @@ These selectors use multiple fallback strategies for resilience.
 Update these after inspecting the actual NotebookLM UI.
 """
 
+import time
 from typing import List
 
+from .calls import budget, check_deadline, note_selector
+
 
 class Selectors:
     """Container for NotebookLM UI selectors with fallback strategies."""
@@ -26,6 +29,16 @@ class Selectors:
     # Table view selectors (current NotebookLM UI)
     NOTEBOOK_TABLE_ROW: List[str] = ['tr[mat-row]']
     NOTEBOOK_TABLE_TITLE: List[str] = ['td.title-column .project-table-title']
+    NOTEBOOK_TABLE_CREATED: List[str] = [
+        'td.created-column',
+        'td[class*="created"]',
+        'td[class*="date"]',
+    ]
+    NOTEBOOK_TABLE_ROLE: List[str] = [
+        'td.role-column',
+        'td[class*="role"]',
+        'td[class*="owner"]',
+    ]
 
     # Individual notebook card elements
     NOTEBOOK_TITLE: List[str] = [
@@ -76,6 +89,18 @@ class Selectors:
         '[data-testid="source-type-youtube"]',
     ]
 
+    SOURCE_TYPE_FILE: List[str] = [
+        'button:has-text("choose file")',
+        '[aria-label*="upload" i]',
+        'button:has-text("Upload")',
+        '[data-testid="source-type-file"]',
+    ]
+
+    # Hidden file input of the upload dialog (set directly, no file chooser)
+    SOURCE_FILE_INPUT: List[str] = [
+        'input[type="file"]',
+    ]
+
     # Source input fields
     SOURCE_URL_INPUT: List[str] = [
         'input[type="url"]',
@@ -115,6 +140,14 @@ class Selectors:
         'div[class*="message"]',  # Legacy fallback
     ]
 
+    # Inline citation markers inside a chat response
+    CITATION_MARKER: List[str] = [
+        'button.citation-marker',  # Current: numbered citation chip
+        '[class*="citation-marker"]',
+        '[data-testid="citation"]',  # Legacy
+        'sup[class*="citation"]',
+    ]
+
     # Study guide/document generation
     GENERATE_GUIDE_BUTTON: List[str] = [
         '[aria-label*="study guide" i]',
@@ -137,6 +170,14 @@ class Selectors:
         '[aria-label*="table of contents" i]',
     ]
 
+    # Generated study guide / note content
+    STUDY_GUIDE_CONTENT: List[str] = [
+        'note-editor .ql-editor',  # Current: note opened in the Studio panel
+        '[class*="note-editor"] [contenteditable]',
+        '[class*="note-content"]',
+        '[data-testid="note-content"]',  # Legacy
+    ]
+
     # Audio overview (podcast)
     GENERATE_AUDIO_BUTTON: List[str] = [
         '[aria-label*="audio" i]',
@@ -144,6 +185,24 @@ class Selectors:
         '[data-testid="generate-audio"]',
     ]
 
+    # Generated audio overview player
+    AUDIO_PLAYER: List[str] = [
+        'audio-player audio',  # Current: Studio panel player
+        '[data-testid="audio-player"] audio',  # Legacy
+        'audio',
+    ]
+
+    AUDIO_LOAD_BUTTON: List[str] = [
+        'button:has-text("Load")',
+        '[aria-label*="load" i]',
+    ]
+
+    AUDIO_DOWNLOAD_BUTTON: List[str] = [
+        '[aria-label*="download" i]',
+        'button:has-text("Download")',
+        'a[download]',
+    ]
+
     # Sources list
     SOURCES_LIST: List[str] = [
         '[data-testid="source-item"]',
@@ -151,6 +210,40 @@ class Selectors:
         'li[class*="source"]',
     ]
 
+    # Placeholder of a notebook without sources
+    SOURCES_EMPTY: List[str] = [
+        '[data-testid="sources-empty-state"]',
+        '[class*="source"] [class*="empty-state"]',
+        '[aria-label*="no sources" i]',
+    ]
+
+    # State of an item in the sources list
+    SOURCE_PROCESSING: List[str] = [
+        '[role="progressbar"]',
+        'mat-progress-spinner',
+        'mat-spinner',
+        '[aria-busy="true"]',
+        '[class*="loading"]',
+        '[class*="spinner"]',
+    ]
+
+    # Only the item's own status icon and labels: generic error classes are
+    # present on healthy items too
+    SOURCE_FAILED: List[str] = [
+        '[data-testid="source-error"]',
+        'mat-icon[fonticon="error"]',
+        'mat-icon[data-mat-icon-name="error"]',
+        '[role="img"][aria-label*="error" i]',
+        '[aria-label*="failed" i]',
+    ]
+
+    # Last-modified time of the open notebook, where the UI shows one
+    NOTEBOOK_LAST_MODIFIED: List[str] = [
+        '[data-testid="notebook-last-modified"]',
+        '[aria-label*="last modified" i]',
+        '[aria-label*="last edited" i]',
+    ]
+
     # Common UI elements
     LOADING_INDICATOR: List[str] = [
         '.thinking-message',  # Current: "Assessing relevance..." message
@@ -175,21 +268,26 @@ async def find_element(page, selectors: List[str], timeout: int = 5000):
     Args:
         page: Playwright page object
         selectors: List of CSS selectors to try
-        timeout: Timeout per selector in milliseconds
+        timeout: Timeout per selector in milliseconds (capped by the
+            current call's remaining time)
 
     Returns:
         First matching element
 
     Raises:
         TimeoutError: If no selector matches
+        DeadlineExceeded: If the current call runs out of time
     """
     from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
     for selector in selectors:
+        started = time.monotonic()
         try:
-            element = await page.wait_for_selector(selector, timeout=timeout)
+            element = await page.wait_for_selector(selector, timeout=budget(timeout))
+            note_selector(selector, timeout, time.monotonic() - started, True)
             return element
         except PlaywrightTimeoutError:
+            note_selector(selector, timeout, time.monotonic() - started, False)
             continue
 
     raise PlaywrightTimeoutError(
@@ -204,20 +302,29 @@ async def find_all_elements(page, selectors: List[str], timeout: int = 5000):
     Args:
         page: Playwright page object
         selectors: List of CSS selectors to try
-        timeout: Timeout per selector in milliseconds
+        timeout: Timeout per selector in milliseconds (capped by the
+            current call's remaining time)
 
     Returns:
         List of matching elements
+
+    Raises:
+        DeadlineExceeded: If the current call runs out of time
     """
     from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
     for selector in selectors:
+        started = time.monotonic()
         try:
-            await page.wait_for_selector(selector, timeout=timeout)
+            await page.wait_for_selector(selector, timeout=budget(timeout))
             elements = await page.query_selector_all(selector)
+            note_selector(selector, timeout, time.monotonic() - started, bool(elements))
             if elements:
                 return elements
         except PlaywrightTimeoutError:
+            note_selector(selector, timeout, time.monotonic() - started, False)
             continue
 
+    # Running out of time is not the same as finding nothing
+    check_deadline()
     return []
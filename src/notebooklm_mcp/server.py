@@ -1,16 +1,120 @@
 """NotebookLM MCP Server - Connects Claude to Google NotebookLM."""
+import asyncio
+import functools
+import inspect
 import os
-from typing import List, Dict, Literal
+import shutil
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Awaitable, Callable, List, Dict, Literal, Optional, Tuple, Union
 from fastmcp import FastMCP
+from fastmcp.server.dependencies import get_context
 from pydantic import Field
-from playwright.async_api import TimeoutError as PlaywrightTimeoutError
-
-from .browser import NotebookLMBrowser, AuthenticationError
+from pydantic.fields import FieldInfo
+
+from .accounts import NOTEBOOKLM_HOME_URL, AccountPool, PageLease, load_accounts
+from .artifacts import ARTIFACT_LOOKUPS, ArtifactStore, get_guide_timeout
+from .browser import AuthenticationError, get_har_mode, get_launch_profile, is_browser_crash
+from .calls import budget, check_deadline, mark_side_effect, run_call, set_phase
+from .chunking import count_words, get_chunk_concurrency, get_max_source_words, split_text
+from .coalescing import SingleFlight
+from .downloads import download_audio, get_audio_timeout
+from .extractors import (
+    count_matches,
+    count_responses,
+    extract_answer_text,
+    extract_structured_answer,
+    read_notebook_rows,
+    read_notebook_state,
+    read_audio_source,
+    read_source_states,
+    wait_for_audio_source,
+    wait_for_response,
+    wait_for_stable_text,
+)
+from .fingerprints import not_modified, read_fingerprint
+from .indexing import (
+    LIST_TIMEOUT_MS,
+    SETTLE_TIMEOUT_MS,
+    decode_source_handle,
+    encode_source_handle,
+    find_tracked_source,
+    get_index_timeout,
+    snapshot_titles,
+    sources_digest,
+    track_new_source,
+)
+from .ledger import SOURCE_LEDGER_CHECKS, SourceLedger, get_ledger_mode, source_key
+from .listing import NotebookQuery, SortOrder, decode_cursor, encode_cursor
+from .metrics import REGISTRY, render_metrics
+from .prefetch import SOURCE_CACHE_LOOKUPS, SourceCache, SourcePrefetcher, get_prefetch_mode
+from .recorder import get_recording, list_recordings
 from .selectors import Selectors, find_element, find_all_elements
+from .sessions import SessionManager, session_worker
+from .titles import TitleIndex
+from .uploads import (
+    check_upload_file,
+    get_text_upload_bytes,
+    get_upload_timeout,
+    text_title,
+    upload_source_file,
+    write_text_upload,
+)
+
+
+_account_pool: Optional[AccountPool] = None
+_session_manager: Optional[SessionManager] = None
+_source_cache: Optional[SourceCache] = None
+_prefetcher: Optional[SourcePrefetcher] = None
+_source_ledger: Optional[SourceLedger] = None
+_artifact_store: Optional[ArtifactStore] = None
+_title_index: Optional[TitleIndex] = None
+_worker_dispatcher = None
+
+# Undecorated tool implementations by name, run directly by worker processes
+TOOL_IMPLEMENTATIONS: Dict[str, Callable[..., Awaitable[Any]]] = {}
+
+# Page size of list_notebooks when paging with a cursor only
+DEFAULT_PAGE_SIZE = 20
+
+# Identical in-flight read-only calls share one browser run
+_single_flight = SingleFlight()
+
+# Progress of the background browser prewarm started with the server
+_prewarm_state: Dict[str, Any] = {"status": "disabled"}
+
+
+async def close_browsers() -> None:
+    """Stop worker processes, end chat sessions and close pooled browsers."""
+    global _worker_dispatcher
+    if _worker_dispatcher is not None:
+        dispatcher, _worker_dispatcher = _worker_dispatcher, None
+        await dispatcher.close()
+    if _prefetcher is not None:
+        await _prefetcher.close()
+    if _session_manager is not None:
+        await _session_manager.close()
+    if _account_pool is not None:
+        await _account_pool.close()
+
+
+@asynccontextmanager
+async def lifespan(server):
+    """Prewarm browsers in the background and close them on shutdown."""
+    prewarm = asyncio.create_task(prewarm_browsers()) if get_prewarm_mode() else None
+    try:
+        yield
+    finally:
+        if prewarm and not prewarm.done():
+            prewarm.cancel()
+            await asyncio.gather(prewarm, return_exceptions=True)
+        await close_browsers()
 
 
 # Initialize FastMCP server
-mcp = FastMCP("notebooklm")
+mcp = FastMCP("notebooklm", lifespan=lifespan)
 
 
 def get_headless_mode() -> bool:
@@ -18,85 +122,555 @@ def get_headless_mode() -> bool:
     return os.getenv("NOTEBOOKLM_HEADLESS", "true").lower() == "true"
 
 
-# ============================================================================
-# PHASE 1 TOOLS - Essential Operations
-# ============================================================================
+def get_prewarm_mode() -> bool:
+    """Get background browser prewarm setting from environment variable."""
+    return os.getenv("NOTEBOOKLM_PREWARM", "true").lower() == "true"
 
-@mcp.tool()
-async def list_notebooks() -> List[Dict[str, str]]:
+
+def get_prewarm_pages() -> int:
+    """Get the number of pages per account to prewarm from environment variable."""
+    return max(1, int(os.getenv("NOTEBOOKLM_PREWARM_PAGES", "1")))
+
+
+def get_worker_count() -> int:
+    """Get the number of browser worker processes from environment variable."""
+    return max(0, int(os.getenv("NOTEBOOKLM_WORKERS", "0")))
+
+
+def get_account_pool() -> AccountPool:
+    """Get the process-wide account pool, creating it on first use."""
+    global _account_pool
+    if _account_pool is None:
+        _account_pool = AccountPool(
+            load_accounts(),
+            headless=get_headless_mode(),
+            har_mode=get_har_mode(),
+            launch_profile=get_launch_profile(),
+        )
+    return _account_pool
+
+
+def get_session_manager() -> SessionManager:
+    """Get the process-wide chat session manager, creating it on first use."""
+    global _session_manager
+    if _session_manager is None:
+        _session_manager = SessionManager()
+    return _session_manager
+
+
+def get_source_cache() -> SourceCache:
+    """Get the process-wide notebook source cache, creating it on first use."""
+    global _source_cache
+    if _source_cache is None:
+        _source_cache = SourceCache()
+    return _source_cache
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Get the persistent artifact store, creating it on first use."""
+    global _artifact_store
+    if _artifact_store is None:
+        _artifact_store = ArtifactStore()
+    return _artifact_store
+
+
+def get_source_ledger() -> SourceLedger:
+    """Get the persistent source ledger, creating it on first use."""
+    global _source_ledger
+    if _source_ledger is None:
+        _source_ledger = SourceLedger()
+    return _source_ledger
+
+
+def get_title_index() -> TitleIndex:
+    """Get the notebook title index, creating it on first use."""
+    global _title_index
+    if _title_index is None:
+        _title_index = TitleIndex()
+    return _title_index
+
+
+def _schedule_prefetch(notebooks: List[Dict[str, str]]) -> None:
+    """Queue listed notebooks for background source prefetch, if enabled."""
+    global _prefetcher
+    if not get_prefetch_mode():
+        return
+    if _prefetcher is None:
+        _prefetcher = SourcePrefetcher(get_account_pool(), get_source_cache(), _read_notebook_sources)
+    _prefetcher.schedule(notebook["id"] for notebook in notebooks)
+
+
+def get_worker_dispatcher():
+    """
+    Get the worker dispatcher, starting the workers on first use.
+
+    Returns:
+        WorkerDispatcher, or None when tools run in this process (worker mode
+        off, or this process is itself a worker)
+    """
+    global _worker_dispatcher
+    if _worker_dispatcher is None:
+        size = get_worker_count()
+        if size == 0 or os.getenv("NOTEBOOKLM_WORKER_ID"):
+            return None
+
+        from .workers import WorkerDispatcher
+
+        _worker_dispatcher = WorkerDispatcher(size)
+        _worker_dispatcher.start()
+        REGISTRY.add_collector(_worker_dispatcher.collect_metrics)
+    return _worker_dispatcher
+
+
+async def prewarm_browsers() -> None:
+    """
+    Launch browsers, check authentication and load the NotebookLM app shell.
+
+    Runs in the background right after startup so the first tool call finds
+    a warm page. In worker mode this only starts the workers, which prewarm
+    their own browsers.
+    """
+    started = time.monotonic()
+    _prewarm_state.clear()
+    _prewarm_state["status"] = "running"
+    try:
+        if get_worker_dispatcher() is None:
+            await get_account_pool().prewarm(get_prewarm_pages())
+    except Exception as e:
+        _prewarm_state.update(status="failed", error=str(e) or type(e).__name__)
+    else:
+        _prewarm_state["status"] = "done"
+    _prewarm_state["seconds"] = round(time.monotonic() - started, 3)
+
+
+def get_warm_state() -> Dict[str, Any]:
     """
-    List all available NotebookLM notebooks.
+    Describe how warm this process's browsers are.
 
     Returns:
-        List of notebooks with id, title, and url
+        Prewarm progress and per-account browser state
     """
+    return {
+        "prewarm": dict(_prewarm_state),
+        "accounts": _account_pool.status() if _account_pool is not None else [],
+    }
+
+
+# Argument added to every browser tool for the call's overall deadline
+TIMEOUT_ARGUMENT = "timeout_seconds"
+
+
+def _request_timeout() -> Optional[float]:
+    """Get the deadline sent with the MCP request as ``_meta.timeout``, in seconds."""
     try:
-        async with NotebookLMBrowser(headless=get_headless_mode()) as browser:
-            # Check authentication
-            is_authenticated = await browser.check_authentication()
-            if not is_authenticated:
-                raise AuthenticationError(
-                    "Not authenticated. Run: python scripts/setup_auth.py"
-                )
+        request = get_context().request_context
+    except RuntimeError:
+        # Not inside an MCP request, e.g. a direct call
+        return None
+    meta = request.meta if request is not None else None
+    value = (meta.model_extra or {}).get("timeout") if meta is not None else None
+    try:
+        timeout = float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+    return timeout if timeout is not None and timeout > 0 else None
+
+
+def _with_timeout_argument(wrapper: Callable[..., Any], func: Callable[..., Any]) -> None:
+    """Expose ``TIMEOUT_ARGUMENT`` in a tool wrapper's signature (and so its schema)."""
+    signature = inspect.signature(func)
+    timeout = inspect.Parameter(
+        TIMEOUT_ARGUMENT,
+        inspect.Parameter.POSITIONAL_OR_KEYWORD,
+        default=Field(
+            default=None,
+            gt=0,
+            description="Seconds the call may take in total (default: the request's _meta.timeout, "
+                        "else NOTEBOOKLM_CALL_TIMEOUT)"
+        ),
+        annotation=Optional[float],
+    )
+    wrapper.__signature__ = signature.replace(  # type: ignore[attr-defined]
+        parameters=[*signature.parameters.values(), timeout]
+    )
+    wrapper.__annotations__ = {**func.__annotations__, TIMEOUT_ARGUMENT: Optional[float]}
 
-            # Navigate to NotebookLM home (shows all notebooks)
-            await browser.goto("https://notebooklm.google.com")
-            await browser.page.wait_for_timeout(3000)
 
-            # Find table rows (NotebookLM uses table view)
-            rows = await browser.page.query_selector_all('tr[mat-row]')
+def browser_tool(idempotent: bool = False, coalesce: bool = False):
+    """
+    Mark a tool as doing browser work.
+
+    The tool runs in its own call context with crash recovery: if the
+    browser crashes, idempotent tools are retried until their side effect
+    (see ``mark_side_effect``) has started, and other failures report
+    whether the change may already have been applied. In worker mode the
+    call is sent to a browser worker process (with affinity on
+    ``notebook_id``, and pinned to the worker owning ``session_id``);
+    otherwise it runs in this process.
+
+    The tool gains a ``timeout_seconds`` argument for its overall deadline,
+    which falls back to the MCP request's ``_meta.timeout`` and then to
+    ``NOTEBOOKLM_CALL_TIMEOUT``. Every browser wait is capped by the time
+    left (see ``calls.budget``), and a call that runs out fails with a
+    DeadlineExceeded naming the phase it was in. Coalesced calls share the
+    deadline of the call that started the run.
 
-            if not rows:
-                return []
+    Args:
+        idempotent: True if the tool may be repeated safely before its side effect
+        coalesce: True for read-only tools whose identical concurrent calls
+            may share one browser run (calls on a session are never coalesced)
+    """
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        name = func.__name__
+
+        async def run_local(**kwargs):
+            timeout = kwargs.pop(TIMEOUT_ARGUMENT, None)
+            return await run_call(name, func, kwargs, idempotent=idempotent, timeout=timeout)
+
+        TOOL_IMPLEMENTATIONS[name] = run_local
+
+        async def dispatch(timeout: Optional[float], **kwargs):
+            arguments = {**kwargs, TIMEOUT_ARGUMENT: timeout} if timeout is not None else kwargs
+            dispatcher = get_worker_dispatcher()
+            if dispatcher is None:
+                return await run_local(**arguments)
+            return await dispatcher.call(
+                name,
+                arguments,
+                notebook_id=kwargs.get("notebook_id"),
+                worker_id=session_worker(kwargs.get("session_id")),
+            )
 
-            notebooks = []
+        @functools.wraps(func)
+        async def wrapper(**kwargs):
+            timeout = kwargs.pop(TIMEOUT_ARGUMENT, None)
+            if timeout is None:
+                timeout = _request_timeout()
+            if coalesce and not kwargs.get("session_id"):
+                return await _single_flight.run(name, kwargs, lambda: dispatch(timeout, **kwargs))
+            return await dispatch(timeout, **kwargs)
 
-            # Extract data from each row by clicking and capturing URL
-            for i, _ in enumerate(rows):
-                try:
-                    # Navigate back to home to get fresh page state
-                    await browser.goto("https://notebooklm.google.com")
-                    await browser.page.wait_for_timeout(2000)
+        _with_timeout_argument(wrapper, func)
+        return wrapper
 
-                    # Get all rows again (fresh references)
-                    rows_fresh = await browser.page.query_selector_all('tr[mat-row]')
-                    if i >= len(rows_fresh):
+    return decorator
+
+
+# Argument added next to ``notebook_id``: the notebook's ID or approximate title
+NOTEBOOK_ARGUMENT = "notebook"
+
+
+def notebook_argument(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """
+    Let a tool name its notebook by title.
+
+    The tool gains a ``notebook`` argument that takes a notebook ID or an
+    approximate title, resolved through the title index before the call is
+    dispatched; ``notebook_id`` becomes optional, and exactly one of the two
+    must be given.
+
+    Args:
+        func: Tool with a ``notebook_id`` argument
+
+    Returns:
+        Tool wrapper
+    """
+    def required(parameter: inspect.Parameter) -> bool:
+        default = parameter.default
+        return default is inspect.Parameter.empty or (isinstance(default, FieldInfo) and default.is_required())
+
+    signature = inspect.signature(func)
+    original = signature.parameters["notebook_id"]
+    description = getattr(original.default, "description", None) or "Notebook ID"
+    notebook_arguments = [
+        original.replace(
+            default=Field(default=None, description=f"{description} (or pass notebook)"),
+            annotation=Optional[str],
+        ),
+        inspect.Parameter(
+            NOTEBOOK_ARGUMENT,
+            inspect.Parameter.POSITIONAL_OR_KEYWORD,
+            default=Field(
+                default=None,
+                description="Notebook ID or title; approximate titles are matched against "
+                            "notebooks seen by list_notebooks and create_notebook"
+            ),
+            annotation=Optional[str],
+        ),
+    ]
+    # Now optional, so they go after the arguments that are still required
+    others = [p for p in signature.parameters.values() if p.name != "notebook_id"]
+    split = max((i + 1 for i, p in enumerate(others) if required(p)), default=0)
+    parameters = others[:split] + notebook_arguments + others[split:]
+
+    @functools.wraps(func)
+    async def wrapper(**kwargs):
+        notebook = kwargs.pop(NOTEBOOK_ARGUMENT, None)
+        if notebook:
+            if kwargs.get("notebook_id"):
+                raise ValueError("Pass either notebook_id or notebook, not both")
+            kwargs["notebook_id"] = get_title_index().resolve(notebook)
+        elif not kwargs.get("notebook_id"):
+            raise ValueError("notebook_id or notebook is required")
+        return await func(**kwargs)
+
+    wrapper.__signature__ = signature.replace(parameters=parameters)  # type: ignore[attr-defined]
+    wrapper.__annotations__ = {
+        **func.__annotations__,
+        "notebook_id": Optional[str],
+        NOTEBOOK_ARGUMENT: Optional[str],
+    }
+    return wrapper
+
+
+# ============================================================================
+# PHASE 1 TOOLS - Essential Operations
+# ============================================================================
+
+async def _open_notebook_row(browser: PageLease, index: int) -> Optional[str]:
+    """
+    Open a notebook from the home page table to learn its URL.
+
+    Args:
+        browser: Leased page
+        index: Position of the row in the table
+
+    Returns:
+        Notebook URL, or None if the row could not be opened
+    """
+    set_phase("open_notebook_row")
+    # Navigate back to home to get fresh page state
+    if "/notebook/" in browser.page.url or not browser.page.url.startswith(NOTEBOOKLM_HOME_URL):
+        await browser.goto(NOTEBOOKLM_HOME_URL)
+        await browser.page.wait_for_timeout(budget(2000))
+
+    # Get all rows again (fresh references)
+    rows = await browser.page.query_selector_all(Selectors.NOTEBOOK_TABLE_ROW[0])
+    if index >= len(rows):
+        return None
+
+    # Click the title cell to navigate to notebook
+    clickable = await rows[index].query_selector('td.title-column')
+    if not clickable:
+        return None
+    await clickable.click()
+    await browser.page.wait_for_timeout(budget(2000))
+
+    url = browser.page.url
+    return url if "/notebook/" in url else None
+
+
+async def _list_account_notebooks(
+    pool: AccountPool,
+    account: str,
+    query: Optional[NotebookQuery] = None,
+    offset: int = 0,
+    limit: Optional[int] = None
+) -> Tuple[List[Dict[str, str]], int]:
+    """
+    List the notebooks reachable from one account.
+
+    Row metadata is read in one pass; only rows inside the requested window
+    whose ID is not in the DOM are opened.
+
+    Args:
+        pool: Account pool to lease the page from
+        account: Name of the account to list
+        query: Filters and sort order (default: everything, NotebookLM's order)
+        offset: Number of matching rows to skip
+        limit: Maximum number of rows to return (None for all)
+
+    Returns:
+        Tuple of (notebooks with id, title, url and, when shown, created and
+        role; number of rows matching the query)
+    """
+    query = query or NotebookQuery()
+    async with pool.lease(account=account) as browser:
+        # Navigate to NotebookLM home (shows all notebooks)
+        await browser.goto(NOTEBOOKLM_HOME_URL)
+        await browser.page.wait_for_timeout(budget(3000))
+
+        # Read every row's metadata (NotebookLM uses table view)
+        set_phase("read_notebooks")
+        matching = query.apply(await read_notebook_rows(browser.page))
+        window = matching[offset:offset + limit] if limit is not None else matching[offset:]
+
+        notebooks = []
+        url: Optional[str]
+        for row in window:
+            try:
+                if row["id"]:
+                    notebook_id = row["id"]
+                    url = f"{NOTEBOOKLM_HOME_URL}/notebook/{notebook_id}"
+                else:
+                    url = await _open_notebook_row(browser, row["index"])
+                    if url is None:
                         continue
+                    # Extract notebook ID from URL
+                    notebook_id = url.split("/notebook/")[-1].split("?")[0].split("#")[0]
+
+                notebook = {"id": notebook_id, "title": row["title"], "url": url}
+                for key in ("created", "role"):
+                    if row.get(key):
+                        notebook[key] = row[key]
+                notebooks.append(notebook)
+
+            except Exception as e:
+                if is_browser_crash(e):
+                    raise
+                check_deadline()
+                # Continue to next notebook if one fails
+                continue
+
+        # Remember which notebooks this account can reach for routing
+        pool.remember_notebooks(account, [nb["id"] for nb in notebooks])
+        get_title_index().update(notebooks)
+        return notebooks, len(matching)
+
+
+async def _list_notebook_page(
+    pool: AccountPool,
+    query: NotebookQuery,
+    limit: Optional[int],
+    cursor: Optional[str]
+) -> Dict[str, Any]:
+    """
+    List one page of notebooks, walking accounts in configuration order.
+
+    Args:
+        pool: Account pool
+        query: Filters and sort order
+        limit: Page size (taken from the cursor when None)
+        cursor: Continuation cursor from the previous page, or None
+
+    Returns:
+        Dictionary with ``notebooks`` and ``next_cursor`` (None on the last page)
+    """
+    names = list(pool.accounts)
+    several = len(names) > 1
+    if cursor:
+        account_index, offset, page_size = decode_cursor(cursor, query)
+    else:
+        account_index, offset, page_size = 0, 0, 0
+    page_size = limit or page_size or DEFAULT_PAGE_SIZE
+
+    notebooks: List[Dict[str, str]] = []
+    seen = set()
+    next_cursor = None
+    while account_index < len(names):
+        name = names[account_index]
+        if several and not pool.accounts[name].is_healthy():
+            account_index, offset = account_index + 1, 0
+            continue
+
+        wanted = page_size - len(notebooks)
+        found, total = await _list_account_notebooks(pool, name, query, offset, wanted)
+        for notebook in found:
+            if notebook["id"] not in seen:
+                seen.add(notebook["id"])
+                notebooks.append({**notebook, "account": name} if several else notebook)
+
+        if offset + wanted < total:
+            next_cursor = encode_cursor(query, account_index, offset + wanted, page_size)
+            break
+        account_index, offset = account_index + 1, 0
+        if len(notebooks) >= page_size:
+            if account_index < len(names):
+                next_cursor = encode_cursor(query, account_index, 0, page_size)
+            break
+
+    return {"notebooks": notebooks, "next_cursor": next_cursor}
 
-                    row = rows_fresh[i]
 
-                    # Extract title from table cell
-                    title_cell = await row.query_selector('td.title-column .project-table-title')
-                    title = "Untitled"
-                    if title_cell:
-                        title = await title_cell.inner_text()
-                        title = title.strip()
+@mcp.tool()
+@browser_tool(idempotent=True, coalesce=True)
+async def list_notebooks(
+    limit: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Page size. When set (or with a cursor), returns one page and a next_cursor"
+    ),
+    cursor: Optional[str] = Field(
+        default=None,
+        description="next_cursor from the previous page, to continue the listing"
+    ),
+    title_prefix: Optional[str] = Field(
+        default=None,
+        description="Only notebooks whose title starts with this (case-insensitive)"
+    ),
+    created_after: Optional[str] = Field(
+        default=None,
+        description="Only notebooks created on or after this date (YYYY-MM-DD)"
+    ),
+    role: Optional[str] = Field(
+        default=None,
+        description="Only notebooks where you have this role, e.g. Owner or Reader"
+    ),
+    sort: SortOrder = Field(
+        default="default",
+        description="Sort order: default (NotebookLM's order), title, created_asc or created_desc"
+    )
+) -> Union[List[Dict[str, str]], Dict[str, Any]]:
+    """
+    List available NotebookLM notebooks.
 
-                    # Click the title cell to navigate to notebook
-                    clickable = await row.query_selector('td.title-column')
-                    if clickable:
-                        await clickable.click()
-                        await browser.page.wait_for_timeout(2000)
+    With several accounts configured, each notebook carries the name of its
+    account. Without limit or cursor every matching notebook is returned
+    (accounts are listed concurrently). With them, one page is returned
+    together with a cursor for the next one; pages walk the accounts in
+    configuration order, so sorting applies within each account.
 
-                        # Get the notebook URL
-                        url = browser.page.url
+    Args:
+        limit: Page size
+        cursor: Continuation cursor from the previous page
+        title_prefix: Title prefix filter
+        created_after: Creation date filter (YYYY-MM-DD)
+        role: Role filter
+        sort: Sort order
 
-                        if "/notebook/" in url:
-                            # Extract notebook ID from URL
-                            notebook_id = url.split("/notebook/")[-1].split("?")[0].split("#")[0]
+    Returns:
+        List of notebooks with id, title, and url; or, when paging, a
+        dictionary with ``notebooks`` and ``next_cursor``
+    """
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
-                            notebooks.append({
-                                "id": notebook_id,
-                                "title": title,
-                                "url": url
-                            })
+    try:
+        pool = get_account_pool()
+        query = NotebookQuery(title_prefix, created_after, role, sort)
 
-                except Exception:
-                    # Continue to next notebook if one fails
-                    continue
+        if limit is not None or cursor:
+            page = await _list_notebook_page(pool, query, limit, cursor)
+            _schedule_prefetch(page["notebooks"])
+            return page
 
+        if len(pool.accounts) == 1:
+            notebooks, _ = await _list_account_notebooks(pool, next(iter(pool.accounts)), query)
+            _schedule_prefetch(notebooks)
             return notebooks
 
+        names = [account.name for account in pool.accounts.values() if account.is_healthy()]
+        results = await asyncio.gather(
+            *(_list_account_notebooks(pool, name, query) for name in names),
+            return_exceptions=True
+        )
+
+        notebooks = []
+        seen = set()
+        errors = []
+        for name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                errors.append(result)
+                continue
+            for notebook in result[0]:
+                if notebook["id"] not in seen:
+                    seen.add(notebook["id"])
+                    notebooks.append({**notebook, "account": name})
+
+        if errors and len(errors) == len(names):
+            raise errors[0]
+        _schedule_prefetch(notebooks)
+        return notebooks
+
     except AuthenticationError:
         raise
     except PlaywrightTimeoutError as e:
@@ -106,6 +680,7 @@ async def list_notebooks() -> List[Dict[str, str]]:
 
 
 @mcp.tool()
+@browser_tool()
 async def create_notebook(
     name: str = Field(description="Name for the new notebook")
 ) -> Dict[str, str]:
@@ -118,29 +693,26 @@ async def create_notebook(
     Returns:
         Created notebook details (id, title, url)
     """
-    try:
-        async with NotebookLMBrowser(headless=get_headless_mode()) as browser:
-            # Check authentication
-            is_authenticated = await browser.check_authentication()
-            if not is_authenticated:
-                raise AuthenticationError(
-                    "Not authenticated. Run: python scripts/setup_auth.py"
-                )
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
+    try:
+        async with get_account_pool().lease() as browser:
             # Navigate to NotebookLM home
             await browser.goto("https://notebooklm.google.com")
-            await browser.page.wait_for_timeout(2000)
+            await browser.page.wait_for_timeout(budget(2000))
 
             # Click create notebook button
+            set_phase("create_notebook")
             create_button = await find_element(
                 browser.page,
                 Selectors.CREATE_NOTEBOOK_BUTTON,
                 timeout=10000
             )
+            mark_side_effect()
             await create_button.click()
 
             # Wait for notebook to be created and page to load
-            await browser.page.wait_for_timeout(3000)
+            await browser.page.wait_for_timeout(budget(3000))
 
             # Try to set notebook name if input is available
             try:
@@ -157,11 +729,13 @@ async def create_notebook(
                 pass
 
             # Wait for URL to update with notebook ID
-            await browser.page.wait_for_timeout(2000)
+            await browser.page.wait_for_timeout(budget(2000))
             current_url = browser.page.url
 
             if "/notebook/" in current_url:
                 notebook_id = current_url.split("/notebook/")[-1].split("?")[0]
+                get_account_pool().remember_notebooks(browser.account.name, [notebook_id])
+                get_title_index().update([{"id": notebook_id, "title": name}])
                 return {
                     "id": notebook_id,
                     "title": name,
@@ -178,108 +752,332 @@ async def create_notebook(
         raise RuntimeError(f"Failed to create notebook: {str(e)}")
 
 
+async def _open_add_source_dialog(browser: PageLease, notebook_id: str) -> None:
+    """
+    Open a notebook on a leased page and open its add-source dialog.
+
+    Args:
+        browser: Leased page
+        notebook_id: ID of the notebook
+    """
+    # Navigate to notebook
+    notebook_url = f"https://notebooklm.google.com/notebook/{notebook_id}"
+    await browser.goto(notebook_url)
+    await browser.page.wait_for_timeout(budget(2000))
+
+    # Click add source button
+    set_phase("open_add_source")
+    add_button = await find_element(
+        browser.page,
+        Selectors.ADD_SOURCE_BUTTON,
+        timeout=10000
+    )
+    await add_button.click()
+    await browser.page.wait_for_timeout(budget(1000))
+
+
+async def _add_text_parts(
+    notebook_id: str,
+    content: str,
+    directory: Path,
+    ledger: Optional[SourceLedger],
+    force: bool,
+    settle_timeout: int,
+    live_titles: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Split oversized text and add the parts as numbered sources.
+
+    Up to NOTEBOOKLM_CHUNK_CONCURRENCY parts are uploaded at once, each on
+    its own page. Parts are recorded in the ledger as they are added, so a
+    repeated call only adds the parts that are still missing. Once every
+    part is in the notebook, the whole document is recorded as well.
+
+    Args:
+        notebook_id: ID of the notebook
+        content: Text over NOTEBOOKLM_MAX_SOURCE_WORDS
+        directory: Directory for the part files
+        ledger: Source ledger, or None if disabled
+        force: Add parts even if the ledger has them
+        settle_timeout: Milliseconds to wait for each part to be processed
+        live_titles: Titles of the notebook's current sources, if cached;
+            recorded parts no longer listed are added again
+
+    Returns:
+        Manifest tying each part's source title back to the document
+
+    Raises:
+        RuntimeError: If no part could be added
+    """
+    parts = split_text(content, get_max_source_words())
+    title = text_title(content)
+    semaphore = asyncio.Semaphore(get_chunk_concurrency())
+    keys = [source_key("text", text) for text in parts]
+
+    async def add_part(number: int, text: str) -> Dict[str, Any]:
+        part: Dict[str, Any] = {
+            "part": number,
+            "title": f"{title} (part {number} of {len(parts)})",
+            "words": count_words(text),
+            "chars": len(text),
+        }
+        key = keys[number - 1]
+        if ledger is not None and not force and ledger.check(notebook_id, key, live_titles)[0] == "skipped":
+            part["status"] = "skipped"
+            return part
+
+        path = write_text_upload(text, directory, part["title"])
+        try:
+            async with semaphore:
+                async with get_account_pool().lease(notebook_id) as browser:
+                    await _open_add_source_dialog(browser, notebook_id)
+                    mark_side_effect()
+                    part["upload"], part["source"] = await upload_source_file(
+                        browser.page, notebook_id, path, get_upload_timeout(), settle_timeout,
+                        match_file_name=True
+                    )
+        except AuthenticationError:
+            raise
+        except Exception as e:
+            part.update(status="failed", error=str(e) or type(e).__name__)
+            return part
+
+        if part["source"]["state"] == "failed":
+            part.update(status="failed", error="NotebookLM could not process the source")
+            return part
+        part["status"] = "added"
+        if ledger is not None:
+            try:
+                ledger.record(notebook_id, key, "text", title=part["source"]["title"])
+            except OSError:
+                pass
+        return part
+
+    results = await asyncio.gather(
+        *(add_part(number, text) for number, text in enumerate(parts, 1)),
+        return_exceptions=True,
+    )
+    done: List[Dict[str, Any]] = []
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+        done.append(result)
+
+    counts = {status: sum(1 for part in done if part["status"] == status) for status in ("added", "skipped", "failed")}
+    if counts["failed"] == len(parts):
+        raise RuntimeError(f"All {len(parts)} parts failed; first error: {done[0]['error']}")
+
+    if ledger is not None and not counts["failed"]:
+        try:
+            # The parts are the notebook's sources; the document key only skips re-splitting
+            ledger.record(notebook_id, source_key("text", content), "text", alias=True, parts=keys)
+        except OSError:
+            pass
+
+    return {
+        "status": "partial" if counts["failed"] else "success",
+        "message": (
+            f"Split text into {len(parts)} sources "
+            f"({counts['added']} added, {counts['skipped']} already present, {counts['failed']} failed)"
+        ),
+        "notebook_id": notebook_id,
+        "document": {
+            "title": title,
+            "words": count_words(content),
+            "chars": len(content),
+            "parts": len(parts),
+        },
+        "parts": done,
+    }
+
+
 @mcp.tool()
+@notebook_argument
+@browser_tool()
 async def add_source(
     notebook_id: str = Field(description="Notebook ID to add source to"),
-    source_type: Literal["website", "youtube", "text"] = Field(
+    source_type: Literal["website", "youtube", "text", "file"] = Field(
         description="Type of source to add"
     ),
     content: str = Field(
-        description="Source content (URL for website/youtube, text for text)"
+        description="Source content (URL for website/youtube, text for text, local path for file)"
+    ),
+    force: bool = Field(
+        default=False,
+        description="Add the source even if the ledger says the notebook already has it"
+    ),
+    wait_until_indexed: bool = Field(
+        default=False,
+        description="Wait until NotebookLM has processed the source, so it can be queried right away"
     )
-) -> Dict[str, str]:
+) -> Dict[str, Any]:
     """
     Add a source to a NotebookLM notebook.
 
+    Files (PDF, txt, md, docx) are handed to the upload control, and text
+    of NOTEBOOKLM_TEXT_UPLOAD_BYTES or more is uploaded as a .txt file
+    instead of being typed into the text box. Text over
+    NOTEBOOKLM_MAX_SOURCE_WORDS is split on heading and paragraph
+    boundaries and added as numbered sources, several at a time.
+
+    Sources are recorded in a persistent ledger (normalized URL or content
+    digest per notebook). A source the notebook already has is skipped
+    without opening the browser, unless ``force`` is set or the notebook's
+    cached live source list no longer shows the title it was recorded with.
+
     Args:
         notebook_id: ID of the notebook
-        source_type: Type of source (website, youtube, or text)
-        content: URL for website/youtube, or raw text for text source
+        source_type: Type of source (website, youtube, text, or file)
+        content: URL for website/youtube, raw text for text source, or
+            path of a local file for file source
+        force: Skip the ledger check
+        wait_until_indexed: Wait (up to NOTEBOOKLM_INDEX_TIMEOUT) until the
+            new source has finished processing instead of a few seconds
 
     Returns:
-        Status message
+        Status message; status is "skipped" for a source already added.
+        Uploads also report the new source's title, size, upload time and
+        throughput, and processing time. Split text returns a manifest of
+        its parts, with status "partial" if some could not be added.
+        Added sources are reported with their state (pending, processing
+        or ready), timings and a source_handle for get_source_status.
     """
-    try:
-        async with NotebookLMBrowser(headless=get_headless_mode()) as browser:
-            # Check authentication
-            is_authenticated = await browser.check_authentication()
-            if not is_authenticated:
-                raise AuthenticationError(
-                    "Not authenticated. Run: python scripts/setup_auth.py"
-                )
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+    upload: Optional[Path] = None
+    upload_dir: Optional[str] = None
+    if source_type == "file":
+        try:
+            upload = check_upload_file(content)
+        except ValueError as e:
+            raise RuntimeError(f"Failed to add source: {str(e)}")
+        content = str(upload)
+
+    ledger = get_source_ledger() if get_ledger_mode() else None
+    key = source_key(source_type, content) if ledger is not None else None
+    live = _source_cache.get(notebook_id) if _source_cache is not None else None
+    live_titles = [source["title"] for source in live] if live is not None else None
+    if ledger is not None and key is not None and not force:
+        # A recorded source whose title is no longer listed was removed: add it again
+        check, entry = ledger.check(notebook_id, key, live_titles)
+        SOURCE_LEDGER_CHECKS.inc(result=check)
+        if check == "skipped" and entry is not None:
+            return {
+                "status": "skipped",
+                "message": f"Notebook already has this {source_type} source (use force to add it again)",
+                "notebook_id": notebook_id,
+                "added_at": entry["added_at"],
+            }
 
-            # Navigate to notebook
-            notebook_url = f"https://notebooklm.google.com/notebook/{notebook_id}"
-            await browser.goto(notebook_url)
-            await browser.page.wait_for_timeout(2000)
+    settle_timeout = get_index_timeout() if wait_until_indexed else SETTLE_TIMEOUT_MS
 
-            # Click add source button
-            add_button = await find_element(
-                browser.page,
-                Selectors.ADD_SOURCE_BUTTON,
-                timeout=10000
+    try:
+        if source_type == "text" and count_words(content) > get_max_source_words():
+            upload_dir = tempfile.mkdtemp(prefix="notebooklm-upload-")
+            return await _add_text_parts(
+                notebook_id, content, Path(upload_dir), ledger, force, settle_timeout, live_titles
             )
-            await add_button.click()
-            await browser.page.wait_for_timeout(1000)
 
-            # Select source type
-            if source_type == "website":
-                type_button = await find_element(
-                    browser.page,
-                    Selectors.SOURCE_TYPE_URL
-                )
-                await type_button.click()
-                await browser.page.wait_for_timeout(500)
+        if source_type == "text" and len(content.encode("utf-8")) >= get_text_upload_bytes():
+            upload_dir = tempfile.mkdtemp(prefix="notebooklm-upload-")
+            upload = write_text_upload(content, Path(upload_dir))
 
-                url_input = await find_element(
-                    browser.page,
-                    Selectors.SOURCE_URL_INPUT
-                )
-                await url_input.fill(content)
+        async with get_account_pool().lease(notebook_id) as browser:
+            await _open_add_source_dialog(browser, notebook_id)
 
-            elif source_type == "youtube":
-                type_button = await find_element(
-                    browser.page,
-                    Selectors.SOURCE_TYPE_YOUTUBE
+            upload_result = None
+            if upload is not None:
+                # Files and large text go through the upload control
+                set_phase("upload_source")
+                mark_side_effect()
+                upload_result, source = await upload_source_file(
+                    browser.page, notebook_id, upload, get_upload_timeout(), settle_timeout
                 )
-                await type_button.click()
-                await browser.page.wait_for_timeout(500)
+            else:
+                # Select source type
+                set_phase("fill_source")
+                if source_type == "website":
+                    type_button = await find_element(
+                        browser.page,
+                        Selectors.SOURCE_TYPE_URL
+                    )
+                    await type_button.click()
+                    await browser.page.wait_for_timeout(budget(500))
 
-                url_input = await find_element(
-                    browser.page,
-                    Selectors.SOURCE_URL_INPUT
-                )
-                await url_input.fill(content)
+                    url_input = await find_element(
+                        browser.page,
+                        Selectors.SOURCE_URL_INPUT
+                    )
+                    await url_input.fill(content)
 
-            elif source_type == "text":
-                type_button = await find_element(
+                elif source_type == "youtube":
+                    type_button = await find_element(
+                        browser.page,
+                        Selectors.SOURCE_TYPE_YOUTUBE
+                    )
+                    await type_button.click()
+                    await browser.page.wait_for_timeout(budget(500))
+
+                    url_input = await find_element(
+                        browser.page,
+                        Selectors.SOURCE_URL_INPUT
+                    )
+                    await url_input.fill(content)
+
+                elif source_type == "text":
+                    type_button = await find_element(
+                        browser.page,
+                        Selectors.SOURCE_TYPE_TEXT
+                    )
+                    await type_button.click()
+                    await browser.page.wait_for_timeout(budget(500))
+
+                    text_input = await find_element(
+                        browser.page,
+                        Selectors.SOURCE_TEXT_INPUT
+                    )
+                    await text_input.fill(content)
+
+                # Submit
+                submit_button = await find_element(
                     browser.page,
-                    Selectors.SOURCE_TYPE_TEXT
+                    Selectors.SUBMIT_BUTTON
                 )
-                await type_button.click()
-                await browser.page.wait_for_timeout(500)
+                known = await snapshot_titles(browser.page)
+                mark_side_effect()
+                submitted_at = time.time()
+                await submit_button.click()
 
-                text_input = await find_element(
+                # Wait for the source to be listed and processed
+                set_phase("track_source")
+                source = await track_new_source(
                     browser.page,
-                    Selectors.SOURCE_TEXT_INPUT
+                    notebook_id,
+                    known,
+                    submitted_at,
+                    max(LIST_TIMEOUT_MS, settle_timeout),
+                    settle_timeout,
                 )
-                await text_input.fill(content)
 
-            # Submit
-            submit_button = await find_element(
-                browser.page,
-                Selectors.SUBMIT_BUTTON
-            )
-            await submit_button.click()
+            if source["state"] == "failed":
+                raise RuntimeError(f"NotebookLM could not process the source: {source['title']}")
 
-            # Wait for source to be processed
-            await browser.page.wait_for_timeout(3000)
+            if ledger is not None and key is not None:
+                try:
+                    ledger.record(notebook_id, key, source_type, title=source["title"])
+                except OSError:
+                    # The source is added; only its duplicate check is lost
+                    pass
 
-            return {
+            result = {
                 "status": "success",
                 "message": f"Added {source_type} source to notebook",
-                "notebook_id": notebook_id
+                "notebook_id": notebook_id,
+                "source": source
             }
+            if upload_result is not None:
+                result["upload"] = upload_result
+            return result
 
     except AuthenticationError:
         raise
@@ -287,107 +1085,336 @@ async def add_source(
         raise RuntimeError(f"NotebookLM UI timed out: {str(e)}")
     except Exception as e:
         raise RuntimeError(f"Failed to add source: {str(e)}")
+    finally:
+        if upload_dir is not None:
+            shutil.rmtree(upload_dir, ignore_errors=True)
+        # The source list may have changed, even if the call failed late
+        if _source_cache is not None:
+            _source_cache.invalidate(notebook_id)
 
 
 @mcp.tool()
+@browser_tool(idempotent=True, coalesce=True)
+async def get_source_status(
+    source_handle: str = Field(description="source_handle returned by add_source")
+) -> Dict[str, Any]:
+    """
+    Check whether a source added with add_source has been processed.
+
+    Args:
+        source_handle: Handle from the ``source`` of an add_source result
+
+    Returns:
+        Dictionary with notebook_id, title, state (pending, processing,
+        ready or failed), ready, elapsed_seconds since the source was
+        submitted, and an updated source_handle
+    """
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+    try:
+        handle = decode_source_handle(source_handle)
+        notebook_id = handle["notebook_id"]
+
+        async with get_account_pool().lease(notebook_id) as browser:
+            # Navigate to notebook
+            notebook_url = f"https://notebooklm.google.com/notebook/{notebook_id}"
+            await browser.goto(notebook_url)
+            set_phase("read_sources")
+            try:
+                await browser.page.wait_for_selector(", ".join(Selectors.SOURCES_LIST), timeout=budget(10000))
+            except PlaywrightTimeoutError:
+                pass
+            states = await read_source_states(browser.page)
+
+        source = find_tracked_source(states, handle)
+        title = source["title"] if source else handle["title"]
+        state = source["state"] if source else "pending"
+        return {
+            "notebook_id": notebook_id,
+            "title": title,
+            "state": state,
+            "ready": state == "ready",
+            "elapsed_seconds": round(time.time() - handle["submitted_at"], 3),
+            "source_handle": (
+                encode_source_handle(notebook_id, title, [], handle["submitted_at"])
+                if title is not None else source_handle
+            ),
+        }
+
+    except AuthenticationError:
+        raise
+    except PlaywrightTimeoutError as e:
+        raise RuntimeError(f"NotebookLM UI timed out: {str(e)}")
+    except Exception as e:
+        raise RuntimeError(f"Failed to get source status: {str(e)}")
+
+
+async def _ask_notebook(page, query: str, structured: bool = False) -> Union[str, Dict[str, Any]]:
+    """
+    Submit a question in the notebook chat shown on a page and read its answer.
+
+    The answer is tied to this turn by counting responses before submitting,
+    so earlier turns on the page are never mistaken for it.
+
+    Args:
+        page: Playwright page showing the notebook chat
+        query: Question to ask
+        structured: Return the answer with its citations instead of plain text
+
+    Returns:
+        Answer text, or the structured answer dictionary
+    """
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+    # Find chat input
+    set_phase("submit_query")
+    chat_input = await find_element(
+        page,
+        Selectors.CHAT_INPUT,
+        timeout=10000
+    )
+
+    # Type query
+    await chat_input.fill(query)
+    before = await count_responses(page)
+
+    # Submit query
+    try:
+        submit_button = await find_element(
+            page,
+            Selectors.CHAT_SUBMIT,
+            timeout=3000
+        )
+        mark_side_effect()
+        await submit_button.click()
+    except PlaywrightTimeoutError:
+        # Fallback: press Enter
+        mark_side_effect()
+        await chat_input.press("Enter")
+
+    # Wait for thinking message to appear (indicates query is being processed)
+    await page.wait_for_timeout(budget(1000))
+
+    # Wait for loading/thinking to complete (AI generates response)
+    set_phase("wait_for_thinking")
+    try:
+        # Wait for thinking message to disappear (indicates response is ready)
+        await page.wait_for_selector(
+            '.thinking-message',
+            state="hidden",
+            timeout=budget(45000)  # Increased timeout for complex queries
+        )
+    except PlaywrightTimeoutError:
+        # If no thinking message detected, try other loading indicators
+        try:
+            await page.wait_for_selector(
+                ', '.join(Selectors.LOADING_INDICATOR[1:]),  # Skip .thinking-message
+                state="hidden",
+                timeout=budget(10000)
+            )
+        except PlaywrightTimeoutError:
+            # Continue even if we don't detect loading indicator
+            pass
+
+    # Wait for this turn's response, then for it to fully render
+    set_phase("wait_for_response")
+    try:
+        await wait_for_response(page, before, timeout=10000)
+    except PlaywrightTimeoutError:
+        raise RuntimeError("No response received from NotebookLM")
+    await page.wait_for_timeout(budget(2000))
+
+    set_phase("extract_answer")
+    answer: Union[str, Dict[str, Any], None]
+    if structured:
+        answer = await extract_structured_answer(page, before)
+    else:
+        text = await extract_answer_text(page, before)
+        answer = text.strip() if text is not None else None
+
+    if answer is None:
+        raise RuntimeError("No response received from NotebookLM")
+    return answer
+
+
+async def _ask_if_changed(
+    browser: PageLease,
+    notebook_id: str,
+    query: str,
+    structured: bool,
+    if_changed_since: Optional[str],
+    fingerprint: Optional[Dict[str, Any]] = None
+) -> Union[str, Dict[str, Any]]:
+    """
+    Ask a question unless the notebook still has the caller's fingerprint.
+
+    Args:
+        browser: Leased page showing the notebook chat
+        notebook_id: ID of the notebook
+        query: Question to ask
+        structured: Return the answer with its citations instead of plain text
+        if_changed_since: Fingerprint the caller has, or None to always ask
+        fingerprint: Current fingerprint, already found to differ from
+            if_changed_since, or None to read it off the page
+
+    Returns:
+        The answer, or with if_changed_since a dictionary with status,
+        fingerprint and (if modified) the answer
+    """
+    if not if_changed_since:
+        return await _ask_notebook(browser.page, query, structured)
+
+    if fingerprint is None:
+        set_phase("read_fingerprint")
+        fingerprint = await read_fingerprint(browser.page)
+        if not_modified("query_notebook", fingerprint, if_changed_since):
+            # The lease counted a question that is not asked
+            browser.account.refund_quota()
+            return {"status": "not_modified", "notebook_id": notebook_id, "fingerprint": fingerprint["fingerprint"]}
+    return {
+        "status": "modified",
+        "notebook_id": notebook_id,
+        "fingerprint": fingerprint["fingerprint"],
+        "answer": await _ask_notebook(browser.page, query, structured),
+    }
+
+
+@mcp.tool()
+@notebook_argument
+@browser_tool(idempotent=True, coalesce=True)
 async def query_notebook(
     notebook_id: str = Field(description="Notebook ID to query"),
-    query: str = Field(description="Question to ask about the notebook sources")
-) -> str:
+    query: str = Field(description="Question to ask about the notebook sources"),
+    structured: bool = Field(
+        default=False,
+        description="Return the answer with its citation spans and the sources they point to"
+    ),
+    session_id: Optional[str] = Field(
+        default=None,
+        description="Session from start_session; asks on the session's open chat instead of reloading the notebook"
+    ),
+    if_changed_since: Optional[str] = Field(
+        default=None,
+        description="Fingerprint from get_notebook_fingerprint or an earlier conditional read; "
+                    "returns status not_modified without asking if the notebook is unchanged"
+    )
+) -> Union[str, Dict[str, Any]]:
     """
     Ask NotebookLM's AI a question about notebook sources.
 
     Args:
         notebook_id: ID of the notebook to query
         query: Question to ask
+        structured: If True, return a dictionary with the answer text
+            (including inline [n] citation markers), the citations (claim
+            span offsets and the source title/ID each marker points to) and
+            the notebook's sources
+        session_id: Session returned by start_session for this notebook.
+            Follow-up questions go straight to the session's chat box.
+        if_changed_since: Fingerprint of the notebook when the caller last
+            asked. If it still matches the fingerprint cached by background
+            prefetch, or else the one read once the notebook is open, the
+            question is not sent.
 
     Returns:
-        AI-generated response from NotebookLM
+        AI-generated response from NotebookLM. With if_changed_since, a
+        dictionary with status (not_modified or modified), the current
+        fingerprint and, if modified, the answer.
     """
-    try:
-        async with NotebookLMBrowser(headless=get_headless_mode()) as browser:
-            # Check authentication
-            is_authenticated = await browser.check_authentication()
-            if not is_authenticated:
-                raise AuthenticationError(
-                    "Not authenticated. Run: python scripts/setup_auth.py"
-                )
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
+    try:
+        fingerprint = _cached_fingerprint(notebook_id) if if_changed_since else None
+        if fingerprint is not None and not_modified("query_notebook", fingerprint, if_changed_since):
+            return {"status": "not_modified", "notebook_id": notebook_id, "fingerprint": fingerprint["fingerprint"]}
+
+        if session_id:
+            manager = get_session_manager()
+            session = manager.get(session_id)
+            if session.notebook_id != notebook_id:
+                raise ValueError(f"Session {session_id} belongs to notebook {session.notebook_id}")
+            async with manager.use(session, consumes_quota=True) as browser:
+                return await _ask_if_changed(browser, notebook_id, query, structured, if_changed_since, fingerprint)
+
+        async with get_account_pool().lease(notebook_id, consumes_quota=True) as browser:
             # Navigate to notebook
             notebook_url = f"https://notebooklm.google.com/notebook/{notebook_id}"
             await browser.goto(notebook_url)
-            await browser.page.wait_for_timeout(2000)
-
-            # Find chat input
-            chat_input = await find_element(
-                browser.page,
-                Selectors.CHAT_INPUT,
-                timeout=10000
-            )
+            await browser.page.wait_for_timeout(budget(2000))
 
-            # Type query
-            await chat_input.fill(query)
+            return await _ask_if_changed(browser, notebook_id, query, structured, if_changed_since, fingerprint)
 
-            # Submit query
-            try:
-                submit_button = await find_element(
-                    browser.page,
-                    Selectors.CHAT_SUBMIT,
-                    timeout=3000
-                )
-                await submit_button.click()
-            except PlaywrightTimeoutError:
-                # Fallback: press Enter
-                await chat_input.press("Enter")
+    except AuthenticationError:
+        raise
+    except PlaywrightTimeoutError as e:
+        raise RuntimeError(f"NotebookLM UI timed out: {str(e)}")
+    except Exception as e:
+        raise RuntimeError(f"Failed to query notebook: {str(e)}")
 
-            # Wait for thinking message to appear (indicates query is being processed)
-            await browser.page.wait_for_timeout(1000)
 
-            # Wait for loading/thinking to complete (AI generates response)
-            try:
-                # Wait for thinking message to disappear (indicates response is ready)
-                await browser.page.wait_for_selector(
-                    '.thinking-message',
-                    state="hidden",
-                    timeout=45000  # Increased timeout for complex queries
-                )
-            except PlaywrightTimeoutError:
-                # If no thinking message detected, try other loading indicators
-                try:
-                    await browser.page.wait_for_selector(
-                        ', '.join(Selectors.LOADING_INDICATOR[1:]),  # Skip .thinking-message
-                        state="hidden",
-                        timeout=10000
-                    )
-                except PlaywrightTimeoutError:
-                    # Continue even if we don't detect loading indicator
-                    pass
+@mcp.tool()
+@notebook_argument
+@browser_tool()
+async def start_session(
+    notebook_id: str = Field(description="Notebook ID to hold a conversation with")
+) -> Dict[str, Any]:
+    """
+    Open a chat session pinned to one live notebook page.
 
-            # Additional wait for response to fully render
-            await browser.page.wait_for_timeout(2000)
+    Pass the returned session_id to query_notebook for follow-up questions;
+    they skip the notebook reload. The session keeps one browser page busy
+    until end_session is called or it has been idle for the idle timeout.
 
-            # Get the latest response
-            response_elements = await find_all_elements(
-                browser.page,
-                Selectors.CHAT_RESPONSE,
-                timeout=10000
-            )
+    Args:
+        notebook_id: ID of the notebook
 
-            if not response_elements:
-                raise RuntimeError("No response received from NotebookLM")
+    Returns:
+        Session information including session_id
+    """
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
-            # Get the last response (most recent)
-            last_response = response_elements[-1]
-            response_text = await last_response.inner_text()
+    manager = get_session_manager()
+    try:
+        session = await manager.start(get_account_pool(), notebook_id)
+        try:
+            notebook_url = f"https://notebooklm.google.com/notebook/{notebook_id}"
+            await session.lease.goto(notebook_url)
+            set_phase("open_chat")
+            await find_element(session.lease.page, Selectors.CHAT_INPUT, timeout=10000)
+        except BaseException as e:
+            await manager.abort(session, e)
+            raise
 
-            return response_text.strip()
+        return {**session.info(), "idle_timeout": manager.idle_timeout}
 
     except AuthenticationError:
         raise
     except PlaywrightTimeoutError as e:
         raise RuntimeError(f"NotebookLM UI timed out: {str(e)}")
     except Exception as e:
-        raise RuntimeError(f"Failed to query notebook: {str(e)}")
+        raise RuntimeError(f"Failed to start session: {str(e)}")
+
+
+@mcp.tool()
+@browser_tool()
+async def end_session(
+    session_id: str = Field(description="Session ID returned by start_session")
+) -> Dict[str, str]:
+    """
+    Close a chat session and free its browser page.
+
+    Args:
+        session_id: Session to close
+
+    Returns:
+        Status information
+    """
+    try:
+        await get_session_manager().end(session_id)
+    except ValueError as e:
+        raise RuntimeError(str(e))
+
+    return {"status": "closed", "session_id": session_id}
 
 
 # ============================================================================
@@ -395,46 +1422,75 @@ async def query_notebook(
 # ============================================================================
 
 @mcp.tool()
+@notebook_argument
+@browser_tool()
 async def generate_study_guide(
     notebook_id: str = Field(description="Notebook ID to generate study guide for"),
     guide_type: Literal["faq", "briefing_doc", "table_of_contents"] = Field(
         description="Type of study guide to generate"
+    ),
+    force: bool = Field(
+        default=False,
+        description="Generate again even if a guide for the current sources is stored"
     )
-) -> Dict[str, str]:
+) -> Dict[str, Any]:
     """
     Generate a study guide from notebook sources.
 
+    The generated text is captured once it stops changing and stored
+    locally, keyed by notebook, guide type and a digest of the notebook's
+    sources. While the sources are unchanged, the stored guide is returned
+    instead of generating it again. Nothing is stored while the notebook
+    lists no sources.
+
     Args:
         notebook_id: ID of the notebook
         guide_type: Type of guide (faq, briefing_doc, or table_of_contents)
+        force: Generate even if a stored guide matches the current sources
 
     Returns:
-        Status and guide information
+        Status, guide information, artifact metadata and the guide content
+        (artifact and content are None if the content could not be captured)
     """
-    try:
-        async with NotebookLMBrowser(headless=get_headless_mode()) as browser:
-            # Check authentication
-            is_authenticated = await browser.check_authentication()
-            if not is_authenticated:
-                raise AuthenticationError(
-                    "Not authenticated. Run: python scripts/setup_auth.py"
-                )
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
+    store = get_artifact_store()
+    try:
+        async with get_account_pool().lease(notebook_id) as browser:
             # Navigate to notebook
             notebook_url = f"https://notebooklm.google.com/notebook/{notebook_id}"
             await browser.goto(notebook_url)
-            await browser.page.wait_for_timeout(2000)
+
+            # Waits for the sources list, so a page still rendering is not
+            # keyed as an empty notebook; an empty list is never cached
+            set_phase("read_sources")
+            sources = (await read_notebook_state(browser.page, timeout=10000))["sources"]
+            digest = sources_digest(sources) if sources else None
+            if not force and digest is not None:
+                stored = store.get(notebook_id, guide_type, digest)
+                ARTIFACT_LOOKUPS.inc(result="hit" if stored is not None else "miss")
+                if stored is not None:
+                    return {
+                        "status": "cached",
+                        "message": f"Sources unchanged; returning stored {guide_type} study guide",
+                        "notebook_id": notebook_id,
+                        "guide_type": guide_type,
+                        **stored,
+                    }
 
             # Click generate study guide button
+            set_phase("generate_guide")
             guide_button = await find_element(
                 browser.page,
                 Selectors.GENERATE_GUIDE_BUTTON,
                 timeout=10000
             )
             await guide_button.click()
-            await browser.page.wait_for_timeout(1000)
+            await browser.page.wait_for_timeout(budget(1000))
 
-            # Select guide type
+            # Select guide type (starts generation)
+            before = await count_matches(browser.page, Selectors.STUDY_GUIDE_CONTENT)
+            mark_side_effect()
             if guide_type == "faq":
                 type_button = await find_element(
                     browser.page,
@@ -455,14 +1511,33 @@ async def generate_study_guide(
                 await type_button.click()
 
             # Wait for guide to be generated
-            await browser.page.wait_for_timeout(5000)
+            set_phase("wait_for_guide")
+            content = await wait_for_stable_text(
+                browser.page,
+                Selectors.STUDY_GUIDE_CONTENT,
+                before,
+                timeout=get_guide_timeout()
+            )
 
-            return {
-                "status": "success",
-                "message": f"Generated {guide_type} study guide",
-                "notebook_id": notebook_id,
-                "guide_type": guide_type
-            }
+        artifact = None
+        if content is not None and digest is not None:
+            try:
+                artifact = store.put(notebook_id, guide_type, digest, content)
+            except OSError:
+                # The guide is generated; it just cannot be served from the store
+                pass
+
+        return {
+            "status": "success",
+            "message": (
+                f"Generated {guide_type} study guide" if content is not None
+                else f"Generated {guide_type} study guide (content could not be captured)"
+            ),
+            "notebook_id": notebook_id,
+            "guide_type": guide_type,
+            "artifact": artifact,
+            "content": content,
+        }
 
     except AuthenticationError:
         raise
@@ -473,6 +1548,44 @@ async def generate_study_guide(
 
 
 @mcp.tool()
+@notebook_argument
+async def get_study_guide(
+    notebook_id: str = Field(description="Notebook ID the guide was generated for"),
+    guide_type: Literal["faq", "briefing_doc", "table_of_contents"] = Field(
+        description="Type of study guide"
+    ),
+    sources_digest: Optional[str] = Field(
+        default=None,
+        description="Only return a guide generated from these sources (artifact.sources_digest)"
+    )
+) -> Dict[str, Any]:
+    """
+    Get a stored study guide without opening the browser.
+
+    Args:
+        notebook_id: ID of the notebook
+        guide_type: Type of guide (faq, briefing_doc, or table_of_contents)
+        sources_digest: Source digest the guide must match, or None for
+            the newest stored guide
+
+    Returns:
+        Artifact metadata and the guide content
+
+    Raises:
+        RuntimeError: If no such guide is stored
+    """
+    stored = get_artifact_store().get(notebook_id, guide_type, sources_digest)
+    if stored is None:
+        raise RuntimeError(
+            f"No stored {guide_type} study guide for notebook {notebook_id}; "
+            "generate one with generate_study_guide"
+        )
+    return {"notebook_id": notebook_id, "guide_type": guide_type, **stored}
+
+
+@mcp.tool()
+@notebook_argument
+@browser_tool()
 async def generate_audio_overview(
     notebook_id: str = Field(description="Notebook ID to generate audio overview for")
 ) -> Dict[str, str]:
@@ -488,30 +1601,27 @@ async def generate_audio_overview(
     Returns:
         Status message
     """
-    try:
-        async with NotebookLMBrowser(headless=get_headless_mode()) as browser:
-            # Check authentication
-            is_authenticated = await browser.check_authentication()
-            if not is_authenticated:
-                raise AuthenticationError(
-                    "Not authenticated. Run: python scripts/setup_auth.py"
-                )
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
+    try:
+        async with get_account_pool().lease(notebook_id) as browser:
             # Navigate to notebook
             notebook_url = f"https://notebooklm.google.com/notebook/{notebook_id}"
             await browser.goto(notebook_url)
-            await browser.page.wait_for_timeout(2000)
+            await browser.page.wait_for_timeout(budget(2000))
 
             # Click generate audio button
+            set_phase("generate_audio")
             audio_button = await find_element(
                 browser.page,
                 Selectors.GENERATE_AUDIO_BUTTON,
                 timeout=10000
             )
+            mark_side_effect()
             await audio_button.click()
 
             # Wait for generation to start
-            await browser.page.wait_for_timeout(3000)
+            await browser.page.wait_for_timeout(budget(3000))
 
             return {
                 "status": "success",
@@ -529,56 +1639,242 @@ async def generate_audio_overview(
 
 
 @mcp.tool()
-async def get_notebook_sources(
-    notebook_id: str = Field(description="Notebook ID to get sources from")
-) -> List[Dict[str, str]]:
+@notebook_argument
+@browser_tool(idempotent=True, coalesce=True)
+async def download_audio_overview(
+    notebook_id: str = Field(description="Notebook ID to download the audio overview of")
+) -> Dict[str, Any]:
     """
-    Get list of sources in a notebook.
+    Download a notebook's generated audio overview to local storage.
+
+    Waits up to NOTEBOOKLM_AUDIO_TIMEOUT for the audio to become playable,
+    then streams it to the data directory in chunks. An interrupted download
+    resumes from where it stopped, and audio that was already downloaded is
+    not fetched again.
 
     Args:
         notebook_id: ID of the notebook
 
     Returns:
-        List of sources with their titles and types
+        Dictionary with the local path, size in bytes and duration in seconds
     """
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
     try:
-        async with NotebookLMBrowser(headless=get_headless_mode()) as browser:
-            # Check authentication
-            is_authenticated = await browser.check_authentication()
-            if not is_authenticated:
-                raise AuthenticationError(
-                    "Not authenticated. Run: python scripts/setup_auth.py"
-                )
+        async with get_account_pool().lease(notebook_id) as browser:
+            page = browser.page
 
             # Navigate to notebook
             notebook_url = f"https://notebooklm.google.com/notebook/{notebook_id}"
             await browser.goto(notebook_url)
-            await browser.page.wait_for_timeout(2000)
+            await page.wait_for_timeout(budget(2000))
 
-            # Find source list elements
-            source_elements = await find_all_elements(
-                browser.page,
-                Selectors.SOURCES_LIST,
-                timeout=10000
-            )
+            # The player only gets a source once the audio is loaded
+            set_phase("wait_for_audio")
+            if await read_audio_source(page) is None:
+                try:
+                    load_button = await find_element(page, Selectors.AUDIO_LOAD_BUTTON, timeout=2000)
+                    await load_button.click()
+                except PlaywrightTimeoutError:
+                    pass
+            try:
+                audio = await wait_for_audio_source(page, timeout=get_audio_timeout())
+            except PlaywrightTimeoutError:
+                raise RuntimeError(
+                    "No audio overview is ready for this notebook; "
+                    "start one with generate_audio_overview and try again later"
+                )
 
-            if not source_elements:
-                return []
+            async def save_via_download(path: Path) -> None:
+                async with page.expect_download(timeout=budget(get_audio_timeout())) as download_info:
+                    download_button = await find_element(page, Selectors.AUDIO_DOWNLOAD_BUTTON, timeout=5000)
+                    await download_button.click()
+                download = await download_info.value
+                await download.save_as(path)
 
-            sources = []
-            for idx, element in enumerate(source_elements):
-                try:
-                    # Extract source title/name
-                    title = await element.inner_text()
+            set_phase("download_audio")
+            started = time.monotonic()
+            result = await download_audio(page, notebook_id, audio, save_via_download)
+            if audio.get("duration") is None:
+                # Metadata is usually loaded by the time the download finishes
+                audio = await read_audio_source(page) or audio
+
+            return {
+                "status": "success",
+                "message": (
+                    "Audio overview already downloaded" if result["deduplicated"]
+                    else "Audio overview downloaded"
+                ),
+                "notebook_id": notebook_id,
+                "path": result["path"],
+                "bytes": result["bytes"],
+                "duration_seconds": audio.get("duration"),
+                "content_type": result["content_type"],
+                "deduplicated": result["deduplicated"],
+                "resumed_from": result["resumed_from"],
+                "downloaded_bytes": result["downloaded_bytes"],
+                "seconds": round(time.monotonic() - started, 3),
+            }
+
+    except AuthenticationError:
+        raise
+    except PlaywrightTimeoutError as e:
+        raise RuntimeError(f"NotebookLM UI timed out: {str(e)}")
+    except Exception as e:
+        raise RuntimeError(f"Failed to download audio overview: {str(e)}")
+
+
+async def _read_notebook_sources(
+    browser: PageLease,
+    notebook_id: str
+) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+    """
+    Open a notebook on a leased page and read its source list.
+
+    Args:
+        browser: Leased page
+        notebook_id: ID of the notebook
+
+    Returns:
+        Tuple of the sources with their titles and types, and the
+        notebook's fingerprint
+    """
+    # Navigate to notebook
+    notebook_url = f"https://notebooklm.google.com/notebook/{notebook_id}"
+    await browser.goto(notebook_url)
+    set_phase("read_fingerprint")
+    # As long as the source list was waited for before
+    fingerprint = await read_fingerprint(browser.page, timeout=10000)
+    set_phase("read_sources")
+    if not fingerprint["source_count"]:
+        return [], fingerprint
+    return await _scrape_notebook_sources(browser.page), fingerprint
+
+
+def _sources_if_changed(
+    notebook_id: str,
+    fingerprint: Dict[str, Any],
+    sources: Optional[List[Dict[str, str]]]
+) -> Dict[str, Any]:
+    """Result of a conditional source read; sources is None if not modified."""
+    result: Dict[str, Any] = {
+        "status": "not_modified" if sources is None else "modified",
+        "notebook_id": notebook_id,
+        "fingerprint": fingerprint["fingerprint"],
+    }
+    if sources is not None:
+        result["sources"] = sources
+    return result
+
+
+def _cached_fingerprint(notebook_id: str) -> Optional[Dict[str, Any]]:
+    """Fingerprint of a notebook from the prefetch cache, if enabled and fresh."""
+    if not get_prefetch_mode():
+        return None
+    return get_source_cache().fingerprint(notebook_id)
+
+
+async def _scrape_notebook_sources(page) -> List[Dict[str, str]]:
+    """
+    Read the source list of the notebook open on a page.
+
+    Args:
+        page: Playwright page showing the notebook
+
+    Returns:
+        List of sources with their titles and types
+    """
+    # Find source list elements
+    source_elements = await find_all_elements(
+        page,
+        Selectors.SOURCES_LIST,
+        timeout=10000
+    )
+
+    if not source_elements:
+        return []
+
+    sources = []
+    for idx, element in enumerate(source_elements):
+        try:
+            # Extract source title/name
+            title = await element.inner_text()
+
+            sources.append({
+                "index": str(idx + 1),
+                "title": title.strip()[:100],  # Truncate long titles
+            })
+        except Exception as e:
+            if is_browser_crash(e):
+                raise
+            continue
+
+    return sources
+
+
+@mcp.tool()
+@notebook_argument
+@browser_tool(idempotent=True, coalesce=True)
+async def get_notebook_sources(
+    notebook_id: str = Field(description="Notebook ID to get sources from"),
+    if_changed_since: Optional[str] = Field(
+        default=None,
+        description="Fingerprint from get_notebook_fingerprint or an earlier conditional read; "
+                    "returns status not_modified without the sources if the notebook is unchanged"
+    )
+) -> Union[List[Dict[str, str]], Dict[str, Any]]:
+    """
+    Get list of sources in a notebook.
+
+    With background prefetch enabled, sources read in the last
+    NOTEBOOKLM_PREFETCH_TTL seconds are returned from the cache.
+
+    Args:
+        notebook_id: ID of the notebook
+        if_changed_since: Fingerprint the caller already has. It is compared
+            with the fingerprint cached with the sources; without a fresh
+            cache entry the notebook is loaded and fingerprinted, and if the
+            fingerprint still matches, the source list is not scraped.
 
-                    sources.append({
-                        "index": str(idx + 1),
-                        "title": title.strip()[:100],  # Truncate long titles
-                    })
-                except Exception:
-                    continue
+    Returns:
+        List of sources with their titles and types. With if_changed_since,
+        a dictionary with status (not_modified or modified), the current
+        fingerprint and, if modified, the sources.
+    """
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+    cache = get_source_cache() if get_prefetch_mode() else None
+    if cache is not None:
+        cached = cache.get(notebook_id)
+        fingerprint = cache.fingerprint(notebook_id)
+        # Sources cached without a fingerprint cannot answer a conditional read
+        hit = cached is not None and (fingerprint is not None or not if_changed_since)
+        SOURCE_CACHE_LOOKUPS.inc(result="hit" if hit else "miss")
+        if cached is not None and not if_changed_since:
+            return cached
+        if cached is not None and fingerprint is not None:
+            unchanged = not_modified("get_notebook_sources", fingerprint, if_changed_since)
+            return _sources_if_changed(notebook_id, fingerprint, None if unchanged else cached)
 
-            return sources
+    try:
+        async with get_account_pool().lease(notebook_id) as browser:
+            if if_changed_since:
+                notebook_url = f"https://notebooklm.google.com/notebook/{notebook_id}"
+                await browser.goto(notebook_url)
+                set_phase("read_fingerprint")
+                fingerprint = await read_fingerprint(browser.page)
+                if not_modified("get_notebook_sources", fingerprint, if_changed_since):
+                    return _sources_if_changed(notebook_id, fingerprint, None)
+                set_phase("read_sources")
+                sources = await _scrape_notebook_sources(browser.page) if fingerprint["source_count"] else []
+            else:
+                sources, fingerprint = await _read_notebook_sources(browser, notebook_id)
+
+        if cache is not None:
+            cache.put(notebook_id, sources, fingerprint)
+        if if_changed_since:
+            return _sources_if_changed(notebook_id, fingerprint, sources)
+        return sources
 
     except AuthenticationError:
         raise
@@ -588,6 +1884,89 @@ async def get_notebook_sources(
         raise RuntimeError(f"Failed to get notebook sources: {str(e)}")
 
 
+@mcp.tool()
+@notebook_argument
+@browser_tool(idempotent=True, coalesce=True)
+async def get_notebook_fingerprint(
+    notebook_id: str = Field(description="Notebook ID to fingerprint")
+) -> Dict[str, Any]:
+    """
+    Get a cheap fingerprint of a notebook's current state.
+
+    The fingerprint covers the source titles, how many sources are still
+    processing or failed, and the last-modified time where NotebookLM shows
+    one, read in a single pass over the page. Pass it as if_changed_since to
+    get_notebook_sources or query_notebook to skip the read when nothing
+    changed. With background prefetch enabled, a fingerprint read in the
+    last NOTEBOOKLM_PREFETCH_TTL seconds is returned from the cache.
+
+    Args:
+        notebook_id: ID of the notebook
+
+    Returns:
+        Dictionary with notebook_id, fingerprint, source_count,
+        sources_digest, pending_sources and last_modified
+    """
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+    cached = _cached_fingerprint(notebook_id)
+    if cached is not None:
+        return {"notebook_id": notebook_id, **cached}
+
+    try:
+        async with get_account_pool().lease(notebook_id) as browser:
+            notebook_url = f"https://notebooklm.google.com/notebook/{notebook_id}"
+            await browser.goto(notebook_url)
+            set_phase("read_fingerprint")
+            return {"notebook_id": notebook_id, **await read_fingerprint(browser.page)}
+
+    except AuthenticationError:
+        raise
+    except PlaywrightTimeoutError as e:
+        raise RuntimeError(f"NotebookLM UI timed out: {str(e)}")
+    except Exception as e:
+        raise RuntimeError(f"Failed to get notebook fingerprint: {str(e)}")
+
+
+@mcp.tool()
+async def list_flight_recordings(
+    limit: int = Field(default=20, ge=1, le=200, description="Maximum number of recordings to return"),
+    tool: Optional[str] = Field(default=None, description="Only recordings of this tool")
+) -> List[Dict[str, Any]]:
+    """
+    List recorded slow and failed tool calls, newest first.
+
+    Args:
+        limit: Maximum number of recordings
+        tool: Tool name to filter by, or None for all tools
+
+    Returns:
+        Recording summaries with id, tool, reason (error, slow or
+        cancelled), error, started_at, seconds and the phase the call ended in
+    """
+    return list_recordings(limit, tool)
+
+
+@mcp.tool()
+async def get_flight_recording(
+    recording_id: str = Field(description="Recording ID from list_flight_recordings")
+) -> Dict[str, Any]:
+    """
+    Get one recorded call: its phase and selector timings, and the paths of
+    the page screenshot and DOM snapshot taken when it failed or ran slow.
+
+    Args:
+        recording_id: ID of the recording
+
+    Returns:
+        The recording
+
+    Raises:
+        ValueError: If the recording does not exist (or was pruned)
+    """
+    return get_recording(recording_id)
+
+
 # ============================================================================
 # Health Check Endpoints
 # ============================================================================
@@ -602,18 +1981,52 @@ async def health_check(request):
         "headless": get_headless_mode()
     })
 
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics(request):
+    """Prometheus metrics endpoint (account health and load)."""
+    from starlette.responses import PlainTextResponse
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+@mcp.custom_route("/recordings", methods=["GET"])
+async def recordings(request):
+    """Flight recorder index: the newest slow and failed calls."""
+    from starlette.responses import JSONResponse
+    try:
+        limit = max(1, min(200, int(request.query_params.get("limit", "20"))))
+    except ValueError:
+        return JSONResponse({"error": "limit must be an integer"}, status_code=400)
+    return JSONResponse(list_recordings(limit, request.query_params.get("tool")))
+
 @mcp.custom_route("/readiness", methods=["GET"])
 async def readiness_check(request):
-    """Readiness probe - checks if browser can be initialized."""
+    """
+    Readiness probe - reports real browser warm state.
+
+    Ready once at least one account has a running, authenticated browser
+    (in this process or in any worker). With prewarm disabled, browsers start
+    on the first call and the server is always reported ready.
+    """
     from starlette.responses import JSONResponse
-    try:
-        from playwright.async_api import async_playwright
-        return JSONResponse({"status": "ready", "playwright": "available"})
-    except Exception as e:
-        return JSONResponse(
-            {"status": "not_ready", "error": str(e)},
-            status_code=503
-        )
+
+    state = get_warm_state()
+    dispatcher = _worker_dispatcher
+    if dispatcher is not None:
+        state["workers"] = await dispatcher.warm_state()
+        accounts = [a for worker in state["workers"] for a in worker.get("accounts", [])]
+    else:
+        accounts = state["accounts"]
+
+    if not get_prewarm_mode():
+        ready = True
+    else:
+        ready = any(account["warm"] for account in accounts)
+
+    state["status"] = "ready" if ready else "not_ready"
+    state["pages"] = sum(
+        account["idle_pages"] + account["in_flight"]
+        for account in accounts if account["browser_running"]
+    )
+    return JSONResponse(state, status_code=200 if ready else 503)
 
 
 # ============================================================================
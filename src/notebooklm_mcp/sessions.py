@@ -0,0 +1,302 @@
+"""
+Session-scoped notebook conversations.
+
+A session pins one pooled page to a notebook's chat for as long as the
+conversation lasts, so follow-up questions go straight to the chat box
+instead of reloading the notebook. Sessions hold one of their account's page
+slots and are evicted after an idle timeout.
+"""
+import asyncio
+import os
+import time
+import uuid
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .accounts import AccountPool, PageLease
+from .browser import is_browser_crash
+from .calls import budget, start_background_task
+from .metrics import REGISTRY
+from .recorder import capture_outlier, watch_page
+
+
+SESSIONS_OPEN = REGISTRY.gauge(
+    "notebooklm_sessions_open",
+    "Chat sessions currently holding a page",
+)
+SESSIONS_CLOSED = REGISTRY.counter(
+    "notebooklm_sessions_closed_total",
+    "Chat sessions closed, by reason",
+    ["reason"],
+)
+
+
+def get_session_idle_timeout() -> float:
+    """Get the session idle timeout in seconds from environment variable."""
+    return float(os.getenv("NOTEBOOKLM_SESSION_IDLE_TIMEOUT", "600"))
+
+
+def get_max_sessions() -> int:
+    """Get the maximum number of open sessions from environment variable."""
+    return max(1, int(os.getenv("NOTEBOOKLM_MAX_SESSIONS", "4")))
+
+
+def new_session_id() -> str:
+    """
+    Generate a session ID.
+
+    Inside a worker process the ID is prefixed with the worker number so
+    follow-up calls can be routed back to the worker holding the page.
+    """
+    worker_id = os.getenv("NOTEBOOKLM_WORKER_ID")
+    token = uuid.uuid4().hex
+    return f"w{worker_id}-{token}" if worker_id is not None else token
+
+
+def session_worker(session_id: Optional[str]) -> Optional[int]:
+    """
+    Get the worker process that owns a session.
+
+    Args:
+        session_id: Session ID, or None
+
+    Returns:
+        Worker number, or None if the session is not tied to a worker
+    """
+    if not session_id or not session_id.startswith("w"):
+        return None
+    prefix, _, _ = session_id.partition("-")
+    return int(prefix[1:]) if prefix[1:].isdigit() else None
+
+
+class ChatSession:
+    """A notebook chat pinned to one leased page."""
+
+    def __init__(self, session_id: str, notebook_id: str, lease: PageLease, stack: AsyncExitStack):
+        self.id = session_id
+        self.notebook_id = notebook_id
+        self.lease = lease
+        self.turns = 0
+        self.created = time.monotonic()
+        self.last_used = self.created
+        self.closed = False
+        self._stack = stack
+        self._lock = asyncio.Lock()
+
+    @property
+    def busy(self) -> bool:
+        """True while a question is being answered."""
+        return self._lock.locked()
+
+    @property
+    def idle(self) -> float:
+        """Seconds since the session was last used."""
+        return time.monotonic() - self.last_used
+
+    def info(self) -> Dict[str, Any]:
+        """
+        Describe the session.
+
+        Returns:
+            Session information dictionary
+        """
+        return {
+            "session_id": self.id,
+            "notebook_id": self.notebook_id,
+            "account": self.lease.account.name,
+            "turns": self.turns,
+            "idle_seconds": round(self.idle, 1),
+        }
+
+
+class SessionManager:
+    """Opens, looks up and evicts chat sessions."""
+
+    def __init__(self, idle_timeout: Optional[float] = None, max_sessions: Optional[int] = None):
+        """
+        Initialize session manager.
+
+        Args:
+            idle_timeout: Seconds of inactivity before a session is evicted
+                (default from environment)
+            max_sessions: Maximum number of open sessions (default from environment)
+        """
+        self.idle_timeout = idle_timeout if idle_timeout is not None else get_session_idle_timeout()
+        self.max_sessions = max_sessions if max_sessions is not None else get_max_sessions()
+        self._sessions: Dict[str, ChatSession] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+
+        REGISTRY.add_collector(lambda: SESSIONS_OPEN.set(len(self._sessions)))
+
+    async def start(self, pool: AccountPool, notebook_id: str) -> ChatSession:
+        """
+        Open a session on a notebook.
+
+        The caller is responsible for loading the notebook chat on the
+        session's page.
+
+        Args:
+            pool: Account pool to lease the page from
+            notebook_id: Notebook to converse with
+
+        Returns:
+            The new session
+
+        Raises:
+            RuntimeError: If the maximum number of sessions is open
+        """
+        if len(self._sessions) >= self.max_sessions:
+            raise RuntimeError(
+                f"Too many open sessions ({self.max_sessions}). End one with end_session first."
+            )
+
+        stack = AsyncExitStack()
+        lease = await stack.enter_async_context(pool.lease(notebook_id))
+        session = ChatSession(new_session_id(), notebook_id, lease, stack)
+        self._sessions[session.id] = session
+        self._ensure_sweeper()
+        return session
+
+    def get(self, session_id: str) -> ChatSession:
+        """
+        Look up an open session.
+
+        Args:
+            session_id: Session ID returned by ``start``
+
+        Returns:
+            The session
+
+        Raises:
+            ValueError: If the session does not exist or has expired
+        """
+        session = self._sessions.get(session_id)
+        if session is None:
+            raise ValueError(f"Unknown or expired session: {session_id}. Start a new one with start_session.")
+        return session
+
+    @asynccontextmanager
+    async def use(self, session: ChatSession, consumes_quota: bool = False) -> AsyncIterator[PageLease]:
+        """
+        Run one turn on a session. Turns on the same session run one at a time.
+
+        Args:
+            session: Session to use
+            consumes_quota: True if the turn counts against the daily query quota
+
+        Yields:
+            The session's page lease
+
+        Raises:
+            ValueError: If the session was closed while waiting
+            RuntimeError: If the account has no quota left
+        """
+        async with session._lock:
+            expired = f"Unknown or expired session: {session.id}. Start a new one with start_session."
+            if session.closed:
+                raise ValueError(expired)
+            account = session.lease.account
+            browser = account.browser
+            if browser is None or session.lease.page.is_closed():
+                # Another call found the browser dead and detached it
+                await self._close(session, "crash")
+                raise ValueError(expired)
+
+            if consumes_quota:
+                if account.quota_remaining == 0:
+                    raise RuntimeError(f"Account {account.name} has no daily quota left")
+                account.consume_quota()
+
+            # The page keeps the default timeout of the call that set it last
+            session.lease.page.set_default_timeout(budget(browser.timeout))
+            watch_page(session.lease.page)
+            try:
+                yield session.lease
+            except asyncio.CancelledError as e:
+                # The abandoned question may still be answered on the page, so
+                # the session's page is closed rather than reused
+                await asyncio.shield(self._close(session, "cancelled", e))
+                raise
+            except BaseException as e:
+                if session.lease.page.is_closed() or is_browser_crash(e):
+                    # The page is gone; hand the failure to the pool and drop the session
+                    await self._close(session, "crash", e)
+                else:
+                    await capture_outlier(session.lease.page, e)
+                raise
+            else:
+                session.turns += 1
+                account.record_success()
+                await capture_outlier(session.lease.page)
+            finally:
+                watch_page(None)
+                session.last_used = time.monotonic()
+
+    async def end(self, session_id: str) -> None:
+        """
+        Close a session and return its page to the pool.
+
+        Args:
+            session_id: Session ID
+
+        Raises:
+            ValueError: If the session does not exist or has expired
+        """
+        session = self.get(session_id)
+        async with session._lock:
+            await self._close(session, "ended")
+
+    async def abort(self, session: ChatSession, error: BaseException) -> None:
+        """
+        Close a session whose setup failed or was cancelled.
+
+        The error is passed on to the page lease, so a crashed browser is
+        detached and a cancelled page is discarded instead of going back to
+        the pool as after a successful call.
+
+        Args:
+            session: Session returned by ``start``
+            error: The error setup ended with
+        """
+        reason = "cancelled" if isinstance(error, asyncio.CancelledError) else "error"
+        await asyncio.shield(self._close(session, reason, error))
+
+    async def _close(self, session: ChatSession, reason: str, error: Optional[BaseException] = None) -> None:
+        if session.closed:
+            return
+        session.closed = True
+        self._sessions.pop(session.id, None)
+        SESSIONS_CLOSED.inc(reason=reason)
+        try:
+            if error is None:
+                await session._stack.aclose()
+            else:
+                await session._stack.__aexit__(type(error), error, error.__traceback__)
+        except Exception:
+            pass
+
+    def _ensure_sweeper(self) -> None:
+        if (self._sweeper is None or self._sweeper.done()) and self.idle_timeout > 0:
+            # Evictions must not be logged or recorded against start_session
+            self._sweeper = start_background_task(self._sweep())
+
+    async def _sweep(self) -> None:
+        # Evict sessions that have been idle too long; busy sessions are never touched
+        interval = min(30.0, max(1.0, self.idle_timeout / 4))
+        while self._sessions:
+            await asyncio.sleep(interval)
+            for session in list(self._sessions.values()):
+                if not session.busy and session.idle >= self.idle_timeout:
+                    await self._close(session, "expired")
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Describe every open session."""
+        return [session.info() for session in self._sessions.values()]
+
+    async def close(self) -> None:
+        """Close all sessions."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+        for session in list(self._sessions.values()):
+            await self._close(session, "shutdown")
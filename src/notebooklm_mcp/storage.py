@@ -0,0 +1,135 @@
+"""
+Local persistent storage under ``NOTEBOOKLM_DATA_DIR``.
+
+Files here are shared by the server and its worker processes. Writes go to
+a temporary file that is renamed into place, so readers never see a partial
+file, and JSON files are reloaded only when another process changed them.
+Changes to a JSON file are made under an exclusive lock on a ``.lock`` file
+next to it, so processes updating it at the same time do not drop each
+other's entries.
+"""
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes stay atomic but are not serialized
+    fcntl = None  # type: ignore[assignment]
+
+
+DEFAULT_DATA_DIR = Path(__file__).parent.parent.parent / "notebooklm-data"
+
+
+def get_data_dir() -> Path:
+    """Get the directory for persistent server data from environment variable."""
+    value = os.getenv("NOTEBOOKLM_DATA_DIR")
+    return Path(value).expanduser() if value else DEFAULT_DATA_DIR
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    """
+    Write a file so that readers see either the old or the new contents.
+
+    Args:
+        path: File to write
+        data: New contents
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}-", suffix=path.suffix)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """
+    Hold an exclusive lock shared by all processes using a file.
+
+    Args:
+        path: File to lock; the lock is taken on ``<path>.lock``
+    """
+    lock_path = path.with_name(path.name + ".lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class JsonFile:
+    """A JSON object kept in memory and in sync with its file."""
+
+    def __init__(self, path: Path):
+        """
+        Initialize file.
+
+        Args:
+            path: File path (created on first save)
+        """
+        self.path = Path(path)
+        self._data: dict = {}
+        self._mtime_ns: Optional[int] = None
+
+    @property
+    def data(self) -> dict:
+        """Current contents, reloaded if the file changed since it was last read."""
+        try:
+            mtime_ns = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._data, self._mtime_ns = {}, None
+            return self._data
+        if mtime_ns != self._mtime_ns:
+            try:
+                self._data = json.loads(self.path.read_text())
+            except (OSError, ValueError):
+                # A damaged file only loses what it stored, never fails a call
+                self._data = {}
+            self._mtime_ns = mtime_ns
+        return self._data
+
+    @contextmanager
+    def update(self) -> Iterator[dict]:
+        """
+        Change the contents under the file's lock.
+
+        The file is read again once the lock is held, so changes other
+        processes made in the meantime are kept, and written back when the
+        block exits without an error.
+
+        Yields:
+            Current contents, to be changed in place
+        """
+        with file_lock(self.path):
+            # The modification time may not have moved for a write within its resolution
+            self._mtime_ns = None
+            data = self.data
+            yield data
+            self.save()
+
+    def save(self, data: Any = None) -> None:
+        """
+        Write the contents back to the file.
+
+        Other processes may have changed the file since it was read; use
+        ``update`` to change shared files.
+
+        Args:
+            data: New contents (default: the object returned by ``data``)
+        """
+        if data is not None:
+            self._data = data
+        atomic_write(self.path, json.dumps(self._data, separators=(",", ":")).encode())
+        self._mtime_ns = self.path.stat().st_mtime_ns
@@ -0,0 +1,210 @@
+"""
+Fuzzy index of notebook titles.
+
+Tools take an opaque ``notebook_id``, so agents would have to call
+``list_notebooks`` just to turn a title into an ID. The index keeps the
+title of every notebook seen by ``list_notebooks`` and ``create_notebook``
+in ``NOTEBOOKLM_DATA_DIR/notebook_titles.json`` (shared with worker
+processes) and resolves an approximate title with a trigram lookup, without
+opening the browser.
+
+A title is scored by how many of the query's character trigrams it
+contains, averaged with the trigram Jaccard similarity, so both partial
+titles ("q3 report") and small typos match. When the best matches score
+too close together the lookup is ambiguous and fails with the candidates.
+"""
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from .metrics import REGISTRY
+from .storage import JsonFile, get_data_dir
+
+
+NOTEBOOK_RESOLUTIONS = REGISTRY.counter(
+    "notebooklm_notebook_resolutions_total",
+    "Notebook arguments resolved to an ID, by result",
+    ["result"],
+)
+
+# Scores run from 0 (nothing in common) to 1 (same title)
+MIN_SCORE = 0.5
+# A runner-up closer than this to the best match makes the title ambiguous
+AMBIGUITY_MARGIN = 0.1
+# Candidates listed in an ambiguity error
+MAX_CANDIDATES = 5
+
+_NOTEBOOK_ID = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.IGNORECASE)
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase a title and collapse punctuation and whitespace to single spaces."""
+    return _NON_WORD.sub(" ", title.casefold()).strip()
+
+
+def trigrams(title: str) -> Set[str]:
+    """
+    Character trigrams of a normalized title, with each word padded so that
+    word starts and ends count.
+
+    Args:
+        title: Title
+
+    Returns:
+        Set of trigrams
+    """
+    grams: Set[str] = set()
+    for word in normalize_title(title).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def looks_like_notebook_id(value: str) -> bool:
+    """Check whether a value has the shape of a NotebookLM notebook ID."""
+    return bool(_NOTEBOOK_ID.match(value.strip()))
+
+
+class AmbiguousNotebookError(ValueError):
+    """Raised when a title matches several notebooks about equally well."""
+
+    def __init__(self, query: str, matches: List[Dict[str, object]]):
+        """
+        Initialize error.
+
+        Args:
+            query: Title that was looked up
+            matches: Best matches, best first
+        """
+        listed = "; ".join(f"'{match['title']}' ({match['id']})" for match in matches)
+        super().__init__(
+            f"Notebook '{query}' is ambiguous; it matches {listed}. "
+            "Pass a more specific title or the notebook_id."
+        )
+        self.matches = matches
+
+
+class TitleIndex:
+    """Notebook titles with a trigram index for approximate lookup."""
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Initialize index.
+
+        Args:
+            path: JSON file mapping notebook IDs to titles (default:
+                ``notebook_titles.json`` in the data directory)
+        """
+        self._file = JsonFile(path or get_data_dir() / "notebook_titles.json")
+        self._indexed: Optional[dict] = None
+        self._postings: Dict[str, Set[str]] = {}
+        self._sizes: Dict[str, int] = {}
+        self._normalized: Dict[str, str] = {}
+
+    def _titles(self) -> Dict[str, str]:
+        titles = self._file.data
+        if titles is not self._indexed:
+            # First use, or another process updated the file
+            self._rebuild(titles)
+        return titles
+
+    def _rebuild(self, titles: Dict[str, str]) -> None:
+        postings: Dict[str, Set[str]] = {}
+        sizes: Dict[str, int] = {}
+        for notebook_id, title in titles.items():
+            grams = trigrams(title)
+            sizes[notebook_id] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, set()).add(notebook_id)
+        self._normalized = {notebook_id: normalize_title(title) for notebook_id, title in titles.items()}
+        self._postings, self._sizes, self._indexed = postings, sizes, titles
+
+    def update(self, notebooks: Iterable[Dict[str, str]]) -> None:
+        """
+        Record the titles of listed or created notebooks.
+
+        Args:
+            notebooks: Notebooks with ``id`` and ``title``
+        """
+        titles = self._titles()
+        changes = {}
+        for notebook in notebooks:
+            notebook_id, title = notebook.get("id"), notebook.get("title")
+            if notebook_id and title and titles.get(notebook_id) != title:
+                changes[notebook_id] = title
+        if changes:
+            with self._file.update() as titles:
+                titles.update(changes)
+            self._rebuild(titles)
+
+    def search(self, query: str, limit: int = MAX_CANDIDATES) -> List[Dict[str, Any]]:
+        """
+        Rank known notebooks by title similarity.
+
+        Args:
+            query: Approximate title
+            limit: Maximum number of matches
+
+        Returns:
+            Matches with ``id``, ``title`` and ``score``, best first; only
+            titles scoring at least ``MIN_SCORE``
+        """
+        titles = self._titles()
+        grams = trigrams(query)
+        if not grams:
+            return []
+
+        shared: Counter = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+
+        wanted = normalize_title(query)
+        matches = []
+        for notebook_id, common in shared.items():
+            if self._normalized[notebook_id] == wanted:
+                score = 1.0
+            else:
+                containment = common / len(grams)
+                jaccard = common / (len(grams) + self._sizes[notebook_id] - common)
+                # Only an identical title scores 1
+                score = min(0.99, (containment + jaccard) / 2)
+            if score >= MIN_SCORE:
+                matches.append({"id": notebook_id, "title": titles[notebook_id], "score": round(score, 3)})
+        matches.sort(key=lambda match: (-match["score"], match["title"], match["id"]))
+        return matches[:limit]
+
+    def resolve(self, notebook: str) -> str:
+        """
+        Turn a notebook ID or approximate title into a notebook ID.
+
+        Args:
+            notebook: Notebook ID, or a title of a notebook seen by
+                ``list_notebooks`` or ``create_notebook``
+
+        Returns:
+            Notebook ID
+
+        Raises:
+            AmbiguousNotebookError: If several notebooks match about equally well
+            ValueError: If no known notebook matches
+        """
+        value = notebook.strip()
+        if value in self._titles() or looks_like_notebook_id(value):
+            NOTEBOOK_RESOLUTIONS.inc(result="id")
+            return value
+
+        matches = self.search(value)
+        if not matches:
+            NOTEBOOK_RESOLUTIONS.inc(result="not_found")
+            raise ValueError(
+                f"No known notebook matches '{value}'. Call list_notebooks to refresh "
+                "the known titles, or pass the notebook_id."
+            )
+        close = [match for match in matches if matches[0]["score"] - match["score"] < AMBIGUITY_MARGIN]
+        if len(close) > 1:
+            NOTEBOOK_RESOLUTIONS.inc(result="ambiguous")
+            raise AmbiguousNotebookError(value, close)
+        NOTEBOOK_RESOLUTIONS.inc(result="title")
+        return matches[0]["id"]
@@ -0,0 +1,152 @@
+"""
+File uploads to NotebookLM's add-source dialog.
+
+Local files are handed to the dialog's file input with ``set_input_files``;
+Playwright passes the path to a local browser and streams the file to a
+remote one, so the document never has to fit in a CDP message or be typed
+into a textarea. Large ``text`` sources take the same path through a
+temporary ``.txt`` file.
+"""
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .calls import budget
+from .indexing import SETTLE_TIMEOUT_MS, expected_titles, snapshot_titles, track_new_source
+from .selectors import Selectors, find_element
+
+
+# File types the NotebookLM upload dialog accepts
+UPLOAD_EXTENSIONS = (".pdf", ".txt", ".md", ".docx")
+
+
+def get_text_upload_bytes() -> int:
+    """Get the text size from which text sources are uploaded as a file from environment variable."""
+    return max(0, int(os.getenv("NOTEBOOKLM_TEXT_UPLOAD_BYTES", "200000")))
+
+
+def get_upload_timeout() -> int:
+    """Get the file upload timeout in milliseconds from environment variable."""
+    return int(float(os.getenv("NOTEBOOKLM_UPLOAD_TIMEOUT", "120")) * 1000)
+
+
+def check_upload_file(path: str) -> Path:
+    """
+    Check that a local file can be uploaded as a source.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        Resolved path
+
+    Raises:
+        ValueError: If the file does not exist, is empty or has an unsupported type
+    """
+    resolved = Path(path).expanduser().resolve()
+    if not resolved.is_file():
+        raise ValueError(f"File not found: {path}")
+    if resolved.suffix.lower() not in UPLOAD_EXTENSIONS:
+        raise ValueError(
+            f"Unsupported file type {resolved.suffix or '(none)'}; "
+            f"supported: {', '.join(UPLOAD_EXTENSIONS)}"
+        )
+    if resolved.stat().st_size == 0:
+        raise ValueError(f"File is empty: {path}")
+    return resolved
+
+
+def text_title(content: str) -> str:
+    """
+    Derive a source title from the first line of a text.
+
+    Args:
+        content: Text source
+
+    Returns:
+        First non-empty line, stripped of characters not allowed in file names
+    """
+    first_line = next((line.strip() for line in content.splitlines() if line.strip()), "")
+    return re.sub(r"[^\w\- ]+", "", first_line)[:60].strip() or "Pasted text"
+
+
+def write_text_upload(content: str, directory: Path, title: Optional[str] = None) -> Path:
+    """
+    Write a text source to a file for upload.
+
+    NotebookLM titles uploaded sources by file name, so the file is named
+    after the title.
+
+    Args:
+        content: Text source
+        directory: Directory to write the file in
+        title: Source title (default: derived from the first line)
+
+    Returns:
+        Path of the written file
+    """
+    stem = re.sub(r"[\\/:*?\"<>|]+", "", title).strip() if title else text_title(content)
+    path = Path(directory) / f"{stem}.txt"
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+async def _set_upload_file(page, path: Path) -> None:
+    """Hand a file to the upload dialog."""
+    for selector in Selectors.SOURCE_FILE_INPUT:
+        inputs = await page.query_selector_all(selector)
+        if inputs:
+            await inputs[0].set_input_files(str(path))
+            return
+
+    # The input is created on demand: go through the file chooser instead
+    async with page.expect_file_chooser(timeout=budget(10000)) as chooser_info:
+        button = await find_element(page, Selectors.SOURCE_TYPE_FILE)
+        await button.click()
+    chooser = await chooser_info.value
+    await chooser.set_files(str(path))
+
+
+async def upload_source_file(
+    page,
+    notebook_id: str,
+    path: Path,
+    timeout: int,
+    settle_timeout: int = SETTLE_TIMEOUT_MS,
+    match_file_name: bool = False
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Upload a file in an open add-source dialog and time it.
+
+    Args:
+        page: Playwright page showing the notebook with the dialog open
+        notebook_id: ID of the notebook
+        path: File to upload
+        timeout: Milliseconds to wait for the new source to be listed
+        settle_timeout: Milliseconds to wait for it to finish processing
+        match_file_name: Only take a new source titled after the file (with
+            or without extension), for uploads running in parallel on the
+            same notebook
+
+    Returns:
+        Tuple of upload statistics (``bytes``, ``upload_seconds`` from
+        handing over the file until the source is listed, and
+        ``throughput_mb_s``) and the new source as tracked by
+        ``track_new_source``
+    """
+    known = await snapshot_titles(page)
+    size = path.stat().st_size
+
+    submitted_at = time.time()
+    await _set_upload_file(page, path)
+    expected = expected_titles([path.stem, path.name]) if match_file_name else None
+    source = await track_new_source(page, notebook_id, known, submitted_at, timeout, settle_timeout, expected)
+
+    upload_seconds = source["listed_seconds"]
+    return {
+        "bytes": size,
+        "upload_seconds": upload_seconds,
+        "throughput_mb_s": round(size / 1e6 / upload_seconds, 3) if upload_seconds else None,
+    }, source
@@ -0,0 +1,348 @@
+"""
+Process pool of browser workers.
+
+In worker mode every worker process owns its own Chromium and account pool,
+and the MCP server process only dispatches tool invocations to them over a
+pipe. This spreads the Python-side CDP handling and JSON decoding of many
+concurrent pages across CPU cores.
+"""
+import asyncio
+import itertools
+import multiprocessing
+import os
+import threading
+import zlib
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from typing import Any, Dict, List, Optional
+
+from .browser import AuthenticationError
+from .metrics import REGISTRY
+
+
+# Affinity is dropped when the preferred worker is this many calls behind the least-loaded one
+AFFINITY_SLACK = 4
+
+WORKER_QUEUE_DEPTH = REGISTRY.gauge(
+    "notebooklm_worker_queue_depth",
+    "Tool invocations dispatched to the worker and not yet answered",
+    ["worker"],
+)
+WORKER_UP = REGISTRY.gauge(
+    "notebooklm_worker_up",
+    "1 if the worker process is running",
+    ["worker"],
+)
+WORKER_RESTARTS = REGISTRY.counter(
+    "notebooklm_worker_restarts_total",
+    "Worker processes restarted after a crash",
+    ["worker"],
+)
+WORKER_CALLS = REGISTRY.counter(
+    "notebooklm_worker_calls_total",
+    "Tool invocations dispatched to the worker by outcome",
+    ["worker", "outcome"],
+)
+
+
+class WorkerCrashedError(RuntimeError):
+    """Raised for calls that were in flight on a worker that died."""
+    pass
+
+
+class _Worker:
+    """Server-side handle of one worker process."""
+
+    def __init__(self, worker_id: int):
+        self.id = worker_id
+        self.process: Optional[BaseProcess] = None
+        self.conn: Optional[Connection] = None
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.send_lock = threading.Lock()
+
+    @property
+    def label(self) -> str:
+        return str(self.id)
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self.pending)
+
+    def send(self, message: tuple) -> None:
+        with self.send_lock:
+            if self.conn is None:
+                raise RuntimeError(f"Worker {self.id} is not running")
+            self.conn.send(message)
+
+
+class WorkerDispatcher:
+    """Sends tool invocations to browser worker processes."""
+
+    def __init__(self, size: int, mp_context: str = "spawn"):
+        """
+        Initialize dispatcher.
+
+        Args:
+            size: Number of worker processes
+            mp_context: Multiprocessing start method
+        """
+        if size < 1:
+            raise ValueError("Worker mode needs at least one worker")
+
+        self.size = size
+        # Any start method: the stub of the generic context has no Process
+        self._ctx: Any = multiprocessing.get_context(mp_context)
+        self._workers: List[_Worker] = [_Worker(i) for i in range(size)]
+        self._call_ids = itertools.count(1)
+        self._closing = False
+
+    def start(self) -> None:
+        """Start all worker processes."""
+        for worker in self._workers:
+            self._spawn(worker)
+
+    def _spawn(self, worker: _Worker) -> None:
+        parent_conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(
+            target=worker_main,
+            args=(child_conn, worker.id),
+            name=f"notebooklm-worker-{worker.id}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+
+        worker.process = process
+        worker.conn = parent_conn
+        WORKER_UP.set(1, worker=worker.label)
+
+        reader = threading.Thread(
+            target=self._read_loop,
+            args=(worker, parent_conn, asyncio.get_running_loop()),
+            name=f"notebooklm-worker-{worker.id}-reader",
+            daemon=True,
+        )
+        reader.start()
+
+    def _read_loop(self, worker: _Worker, conn, loop: asyncio.AbstractEventLoop) -> None:
+        # Runs in a thread: blocking reads, results handed back to the event loop
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                break
+            loop.call_soon_threadsafe(self._on_message, worker, message)
+        loop.call_soon_threadsafe(self._on_exit, worker, conn)
+
+    def _on_message(self, worker: _Worker, message: tuple) -> None:
+        kind, call_id = message[0], message[1]
+        future = worker.pending.pop(call_id, None)
+        if future is None or future.done():
+            return
+
+        if kind == "result":
+            WORKER_CALLS.inc(worker=worker.label, outcome="success")
+            future.set_result(message[2])
+        else:
+            error_type, error_message = message[2], message[3]
+            WORKER_CALLS.inc(worker=worker.label, outcome="error")
+            if error_type == "AuthenticationError":
+                future.set_exception(AuthenticationError(error_message))
+            elif error_type == "CancelledError":
+                future.cancel()
+            else:
+                future.set_exception(RuntimeError(error_message))
+
+    def _on_exit(self, worker: _Worker, conn) -> None:
+        if worker.conn is not conn:
+            # Already replaced by a newer process
+            return
+
+        WORKER_UP.set(0, worker=worker.label)
+        pending, worker.pending = worker.pending, {}
+        for future in pending.values():
+            if not future.done():
+                WORKER_CALLS.inc(worker=worker.label, outcome="crashed")
+                future.set_exception(WorkerCrashedError(
+                    f"Browser worker {worker.id} crashed during the call; "
+                    "its side effects may or may not have been applied"
+                ))
+
+        if worker.process is not None:
+            worker.process.join(timeout=0)
+        if not self._closing:
+            WORKER_RESTARTS.inc(worker=worker.label)
+            self._spawn(worker)
+
+    def _pick(self, notebook_id: Optional[str]) -> _Worker:
+        least_loaded = min(self._workers, key=lambda w: w.queue_depth)
+        if not notebook_id:
+            return least_loaded
+
+        # Stable notebook -> worker mapping keeps that notebook's pages warm in one browser
+        preferred = self._workers[zlib.crc32(notebook_id.encode()) % self.size]
+        if preferred.queue_depth - least_loaded.queue_depth >= AFFINITY_SLACK:
+            return least_loaded
+        return preferred
+
+    def _submit(self, worker: _Worker, kind: str, *payload: Any):
+        call_id = next(self._call_ids)
+        future = asyncio.get_running_loop().create_future()
+        worker.pending[call_id] = future
+        worker.send((kind, call_id, *payload))
+        return call_id, future
+
+    async def call(
+        self,
+        tool: str,
+        arguments: Dict[str, Any],
+        notebook_id: Optional[str] = None,
+        worker_id: Optional[int] = None
+    ) -> Any:
+        """
+        Run a tool invocation on a worker.
+
+        Args:
+            tool: Tool name
+            arguments: Tool arguments
+            notebook_id: Target notebook, used for worker affinity
+            worker_id: Run on this worker regardless of load (for calls on
+                state that lives in one worker, such as chat sessions)
+
+        Returns:
+            Tool result
+        """
+        if worker_id is not None:
+            if not 0 <= worker_id < self.size:
+                raise ValueError(f"Unknown browser worker: {worker_id}")
+            worker = self._workers[worker_id]
+        else:
+            worker = self._pick(notebook_id)
+        call_id, future = self._submit(worker, "call", tool, arguments)
+
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if worker.pending.pop(call_id, None) is not None:
+                try:
+                    worker.send(("cancel", call_id))
+                except OSError:
+                    pass
+            raise
+
+    async def warm_state(self, timeout: float = 2.0) -> List[Dict[str, Any]]:
+        """
+        Ask every worker for its browser warm state.
+
+        Args:
+            timeout: Seconds to wait for each worker's answer
+
+        Returns:
+            Warm state per worker (with an error entry for unresponsive workers)
+        """
+        async def ask(worker: _Worker) -> Dict[str, Any]:
+            try:
+                call_id, future = self._submit(worker, "status")
+                state = await asyncio.wait_for(future, timeout)
+            except (asyncio.TimeoutError, OSError, RuntimeError) as e:
+                state = {"error": str(e) or type(e).__name__}
+            return {"worker": worker.id, **state}
+
+        return list(await asyncio.gather(*(ask(worker) for worker in self._workers)))
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Describe every worker process."""
+        return [
+            {
+                "worker": worker.id,
+                "pid": worker.process.pid if worker.process else None,
+                "alive": bool(worker.process and worker.process.is_alive()),
+                "queue_depth": worker.queue_depth,
+            }
+            for worker in self._workers
+        ]
+
+    def collect_metrics(self) -> None:
+        """Refresh per-worker gauges."""
+        for worker in self._workers:
+            WORKER_QUEUE_DEPTH.set(worker.queue_depth, worker=worker.label)
+
+    async def close(self) -> None:
+        """Stop all worker processes."""
+        self._closing = True
+        for worker in self._workers:
+            try:
+                worker.send(("shutdown", 0))
+            except (OSError, AttributeError):
+                pass
+        for worker in self._workers:
+            if worker.process is not None:
+                await asyncio.get_running_loop().run_in_executor(None, worker.process.join, 10)
+                if worker.process.is_alive():
+                    worker.process.terminate()
+
+
+def worker_main(conn, worker_id: int) -> None:
+    """
+    Entry point of a worker process.
+
+    Args:
+        conn: Pipe connection to the dispatcher
+        worker_id: Index of the worker
+    """
+    os.environ["NOTEBOOKLM_WORKER_ID"] = str(worker_id)
+    asyncio.run(_serve(conn))
+
+
+async def _serve(conn) -> None:
+    from . import server
+
+    loop = asyncio.get_running_loop()
+    tasks: Dict[int, asyncio.Task] = {}
+    prewarm = asyncio.create_task(server.prewarm_browsers()) if server.get_prewarm_mode() else None
+
+    def reply(message: tuple) -> None:
+        try:
+            conn.send(message)
+        except OSError:
+            pass
+
+    async def run(call_id: int, tool: str, arguments: Dict[str, Any]) -> None:
+        try:
+            implementation = server.TOOL_IMPLEMENTATIONS.get(tool)
+            if implementation is None:
+                raise RuntimeError(f"Unknown tool: {tool}")
+            result = await implementation(**arguments)
+            reply(("result", call_id, result))
+        except asyncio.CancelledError:
+            reply(("error", call_id, "CancelledError", "Call cancelled"))
+        except BaseException as e:
+            reply(("error", call_id, type(e).__name__, str(e)))
+        finally:
+            tasks.pop(call_id, None)
+
+    try:
+        while True:
+            try:
+                message = await loop.run_in_executor(None, conn.recv)
+            except (EOFError, OSError):
+                break
+
+            kind = message[0]
+            if kind == "call":
+                call_id, tool, arguments = message[1:]
+                tasks[call_id] = asyncio.create_task(run(call_id, tool, arguments))
+            elif kind == "status":
+                reply(("result", message[1], server.get_warm_state()))
+            elif kind == "cancel":
+                task = tasks.get(message[1])
+                if task:
+                    task.cancel()
+            elif kind == "shutdown":
+                break
+    finally:
+        running = list(tasks.values()) + ([prewarm] if prewarm else [])
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        await server.close_browsers()
@@ -0,0 +1,51 @@
+"""Tests for splitting long text sources into parts."""
+from notebooklm_mcp.chunking import count_words, split_text
+
+
+def words(n: int, word: str = "word") -> str:
+    return " ".join([word] * n)
+
+
+def test_text_within_limit_is_one_part():
+    text = f"{words(10)}\n\n{words(10)}"
+    assert split_text(text, 100) == [text]
+
+
+def test_parts_stay_within_limit_and_keep_every_word():
+    text = "\n\n".join(words(30, f"p{i}") for i in range(10))
+    parts = split_text(text, 100)
+    assert len(parts) == 4
+    assert all(count_words(part) <= 100 for part in parts)
+    assert sum(count_words(part) for part in parts) == count_words(text)
+
+
+def test_paragraphs_are_kept_whole():
+    paragraphs = [words(40, f"p{i}") for i in range(5)]
+    parts = split_text("\n\n".join(paragraphs), 100)
+    for part in parts:
+        for paragraph in part.split("\n\n"):
+            assert paragraph in paragraphs
+
+
+def test_heading_starts_next_part_once_half_full():
+    text = f"{words(60)}\n\n# Section\n\n{words(10)}"
+    assert split_text(text, 100) == [words(60), f"# Section\n\n{words(10)}"]
+
+
+def test_heading_stays_in_part_below_half():
+    text = f"{words(20)}\n\n# Section\n\n{words(10)}"
+    assert split_text(text, 100) == [text]
+
+
+def test_oversized_paragraph_is_split_on_lines_then_words():
+    lines = "\n".join(words(30) for _ in range(4))
+    parts = split_text(lines, 50)
+    assert all(count_words(part) <= 50 for part in parts)
+    assert sum(count_words(part) for part in parts) == 120
+
+    parts = split_text(words(250), 100)
+    assert [count_words(part) for part in parts] == [100, 100, 50]
+
+
+def test_blank_paragraphs_are_dropped():
+    assert split_text(f"\n\n{words(5)}\n \n\n\n{words(5)}\n\n", 100) == [f"{words(5)}\n\n{words(5)}"]
@@ -0,0 +1,80 @@
+"""Tests for sharing one run between identical in-flight calls."""
+import asyncio
+
+import pytest
+
+from notebooklm_mcp.coalescing import SingleFlight, normalize_arguments
+
+
+def test_normalize_arguments():
+    assert normalize_arguments({"b": 1, "a": "x  y\n"}) == normalize_arguments({"a": "x y", "b": 1})
+    assert normalize_arguments({"a": ["p  q"]}) == normalize_arguments({"a": ("p q",)})
+    assert normalize_arguments({"a": "x y"}) != normalize_arguments({"a": "xy"})
+
+
+def test_identical_calls_share_one_run():
+    runs = 0
+
+    async def call():
+        nonlocal runs
+        runs += 1
+        run = runs
+        await asyncio.sleep(0.01)
+        return run
+
+    async def main():
+        flight = SingleFlight()
+        results = await asyncio.gather(
+            flight.run("get_notebook_sources", {"notebook_id": "nb"}, call),
+            flight.run("get_notebook_sources", {"notebook_id": " nb "}, call),
+            flight.run("get_notebook_sources", {"notebook_id": "other"}, call),
+        )
+        # Finished calls are not reused
+        results.append(await flight.run("get_notebook_sources", {"notebook_id": "nb"}, call))
+        return results
+
+    assert asyncio.run(main()) == [1, 1, 2, 3]
+
+
+def test_errors_are_shared():
+    async def call():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def main():
+        flight = SingleFlight()
+        return await asyncio.gather(
+            flight.run("list_notebooks", {}, call),
+            flight.run("list_notebooks", {}, call),
+            return_exceptions=True,
+        )
+
+    assert [str(result) for result in asyncio.run(main())] == ["boom", "boom"]
+
+
+def test_run_is_cancelled_only_when_every_caller_has_gone():
+    started = []
+
+    async def call():
+        started.append(asyncio.current_task())
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        flight = SingleFlight()
+        first = asyncio.create_task(flight.run("list_notebooks", {}, call))
+        second = asyncio.create_task(flight.run("list_notebooks", {}, call))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        third = asyncio.create_task(flight.run("list_notebooks", {}, call))
+        await asyncio.sleep(0.01)
+        third.cancel()
+        await asyncio.gather(third, return_exceptions=True)
+        await asyncio.sleep(0)
+        return started[-1].cancelled()
+
+    assert asyncio.run(main())
@@ -0,0 +1,55 @@
+"""Tests for notebook fingerprints and the cache that answers conditional reads."""
+from notebooklm_mcp.fingerprints import fingerprint_state, not_modified
+from notebooklm_mcp.prefetch import SourceCache
+
+
+def state(*sources, last_modified=None):
+    return {"sources": [{"title": title, "state": status} for title, status in sources], "last_modified": last_modified}
+
+
+def test_fingerprint_summary():
+    fingerprint = fingerprint_state(state(("A", "ready"), ("B", "processing"), ("C", "failed")))
+    assert fingerprint["source_count"] == 3
+    assert fingerprint["pending_sources"] == 2
+    assert fingerprint["last_modified"] is None
+    assert len(fingerprint["fingerprint"]) == 16
+
+
+def test_fingerprint_changes_with_the_notebook():
+    base = fingerprint_state(state(("A", "ready"), ("B", "processing")))["fingerprint"]
+    assert fingerprint_state(state(("A", "ready"), ("B", "processing")))["fingerprint"] == base
+    changed = [
+        state(("A", "ready"), ("B", "ready")),
+        state(("A", "ready"), ("B", "processing"), ("C", "ready")),
+        state(("A", "ready"), ("B2", "processing")),
+        state(("A", "ready"), ("B", "processing"), last_modified="Jun 10, 2025"),
+    ]
+    assert all(fingerprint_state(other)["fingerprint"] != base for other in changed)
+
+
+def test_not_modified():
+    fingerprint = fingerprint_state(state(("A", "ready")))
+    assert not_modified("get_notebook_sources", fingerprint, f" {fingerprint['fingerprint']} ")
+    assert not not_modified("get_notebook_sources", fingerprint, "0000000000000000")
+    assert not not_modified("get_notebook_sources", fingerprint, None)
+
+
+def test_cache_keeps_the_fingerprint_with_the_sources():
+    cache = SourceCache(ttl=60)
+    fingerprint = fingerprint_state(state(("A", "ready")))
+    cache.put("nb", [{"index": "1", "title": "A"}], fingerprint)
+    cache.put("plain", [])
+    assert cache.fingerprint("nb") == fingerprint
+    assert cache.fingerprint("plain") is None
+    assert cache.fingerprint("missing") is None
+
+    cache.invalidate("nb")
+    assert cache.get("nb") is None
+    assert cache.fingerprint("nb") is None
+
+
+def test_expired_entries_have_no_fingerprint():
+    cache = SourceCache(ttl=0.000001)
+    cache.put("nb", [], fingerprint_state(state()))
+    assert cache.fingerprint("nb") is None
+    assert not cache.fresh("nb")
@@ -0,0 +1,98 @@
+"""Tests for the source ledger and its handling of split documents."""
+import pytest
+
+from notebooklm_mcp.chunking import split_text
+from notebooklm_mcp.ledger import SourceLedger, normalize_url, source_key
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    return SourceLedger(tmp_path / "sources.json")
+
+
+def record_split(ledger, notebook_id, content, max_words):
+    # As add_source records a text over the limit: every part under its own
+    # key and title, and the document as an alias of the parts
+    parts = split_text(content, max_words)
+    keys = [source_key("text", text) for text in parts]
+    titles = [f"Doc (part {number} of {len(parts)})" for number in range(1, len(parts) + 1)]
+    for key, title in zip(keys, titles):
+        ledger.record(notebook_id, key, "text", title=title)
+    ledger.record(notebook_id, source_key("text", content), "text", alias=True, parts=keys)
+    return keys, titles
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://www.Example.com/a/?b=2&a=1#frag", "https://example.com/a?a=1&b=2"),
+    ("http://example.com:80//a//b/", "https://example.com/a/b"),
+    ("example.com/a?utm_source=x&id=3", "https://example.com/a?id=3"),
+    ("https://example.com:8443/a", "https://example.com:8443/a"),
+    ("https://youtu.be/dQw4w9WgXcQ", "youtube:dQw4w9WgXcQ"),
+    ("https://m.youtube.com/watch?v=dQw4w9WgXcQ&t=10", "youtube:dQw4w9WgXcQ"),
+    ("https://www.youtube.com/shorts/dQw4w9WgXcQ", "youtube:dQw4w9WgXcQ"),
+])
+def test_normalize_url(url, expected):
+    assert normalize_url(url) == expected
+
+
+def test_source_key_ignores_line_endings_and_trailing_whitespace():
+    assert source_key("text", "a  \r\nb\n\n") == source_key("text", "a\nb")
+    assert source_key("text", "a\nb") != source_key("text", "a b")
+    assert source_key("youtube", "https://youtu.be/dQw4w9WgXcQ") == "youtube:dQw4w9WgXcQ"
+    assert source_key("url", "http://www.example.com/") == "url:https://example.com"
+
+
+def test_file_key_is_content_digest(tmp_path):
+    first, second = tmp_path / "a.txt", tmp_path / "b.txt"
+    first.write_bytes(b"same")
+    second.write_bytes(b"same")
+    assert source_key("file", str(first)) == source_key("file", str(second))
+
+
+def test_record_and_check(ledger):
+    key = source_key("url", "https://example.com")
+    assert ledger.check("nb", key) == ("new", None)
+    ledger.record("nb", key, "url", title="Example")
+    result, entry = ledger.check("nb", key)
+    assert result == "skipped"
+    assert entry["source_type"] == "url"
+    assert ledger.check("other", key)[0] == "new"
+
+
+def test_entry_is_stale_once_its_title_is_no_longer_listed(ledger):
+    key = source_key("url", "https://example.com")
+    ledger.record("nb", key, "url", title="Example  page")
+    assert ledger.check("nb", key, ["Example page\nwebsite"])[0] == "skipped"
+    assert ledger.check("nb", key, ["Something else"])[0] == "stale"
+
+
+def test_entry_without_title_is_trusted(ledger):
+    key = source_key("url", "https://example.com")
+    ledger.record("nb", key, "url")
+    assert ledger.check("nb", key, [])[0] == "skipped"
+
+
+def test_split_document_counts_its_parts_once(ledger):
+    content = "\n\n".join(" ".join([f"p{i}"] * 40) for i in range(5))
+    keys, _ = record_split(ledger, "nb", content, 100)
+    assert len(keys) == 3
+    assert ledger.count("nb") == len(keys)
+
+
+def test_split_document_is_present_while_all_parts_are_listed(ledger):
+    content = "\n\n".join(" ".join([f"p{i}"] * 40) for i in range(5))
+    keys, titles = record_split(ledger, "nb", content, 100)
+    document = source_key("text", content)
+
+    assert ledger.check("nb", document)[0] == "skipped"
+    assert ledger.check("nb", document, titles)[0] == "skipped"
+    assert ledger.check("nb", document, titles[1:])[0] == "stale"
+    # The listed parts are still skipped on their own
+    assert ledger.check("nb", keys[1], titles[1:])[0] == "skipped"
+
+
+def test_ledger_is_shared_between_instances(tmp_path):
+    path = tmp_path / "sources.json"
+    SourceLedger(path).record("nb", "url:https://a.example", "url")
+    SourceLedger(path).record("nb", "url:https://b.example", "url")
+    assert SourceLedger(path).count("nb") == 2
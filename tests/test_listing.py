@@ -0,0 +1,68 @@
+"""Tests for filtering, sorting and paging notebook listings."""
+from datetime import date
+
+import pytest
+
+from notebooklm_mcp.listing import NotebookQuery, decode_cursor, encode_cursor, parse_created
+
+
+ROWS = [
+    {"title": "Beta notes", "created": "Mar 5, 2025", "role": "Owner"},
+    {"title": "alpha", "created": "2024-12-01", "role": "Viewer"},
+    {"title": "Gamma", "created": None, "role": "Owner"},
+    {"title": "Beta plans", "created": "Today", "role": "owner"},
+]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Mar 5, 2025", date(2025, 3, 5)),
+    ("March 5, 2025", date(2025, 3, 5)),
+    ("5 Mar 2025", date(2025, 3, 5)),
+    ("2025-03-05", date(2025, 3, 5)),
+    ("Today", date(2025, 6, 10)),
+    ("yesterday", date(2025, 6, 9)),
+    ("last week", None),
+    (None, None),
+])
+def test_parse_created(text, expected):
+    assert parse_created(text, today=date(2025, 6, 10)) == expected
+
+
+def test_filters():
+    assert [row["title"] for row in NotebookQuery(title_prefix="beta").apply(ROWS)] == ["Beta notes", "Beta plans"]
+    assert [row["title"] for row in NotebookQuery(role="OWNER").apply(ROWS)] == ["Beta notes", "Gamma", "Beta plans"]
+    # Rows without a readable date do not match a date filter
+    titles = [row["title"] for row in NotebookQuery(created_after="2025-01-01").apply(ROWS)]
+    assert titles == ["Beta notes", "Beta plans"]
+
+
+def test_invalid_created_after():
+    with pytest.raises(ValueError):
+        NotebookQuery(created_after="March")
+
+
+def test_sort_by_title():
+    assert [row["title"] for row in NotebookQuery(sort="title").apply(ROWS)] == [
+        "alpha", "Beta notes", "Beta plans", "Gamma"
+    ]
+
+
+def test_sort_by_date_puts_undated_rows_last():
+    ascending = [row["title"] for row in NotebookQuery(sort="created_asc").apply(ROWS)]
+    descending = [row["title"] for row in NotebookQuery(sort="created_desc").apply(ROWS)]
+    assert ascending == ["alpha", "Beta notes", "Beta plans", "Gamma"]
+    assert descending == ["Beta plans", "Beta notes", "alpha", "Gamma"]
+
+
+def test_cursor_round_trip():
+    query = NotebookQuery(title_prefix="beta", sort="title")
+    cursor = encode_cursor(query, 1, 20, 10)
+    assert decode_cursor(cursor, NotebookQuery(title_prefix="Beta ", sort="title")) == (1, 20, 10)
+
+
+def test_cursor_is_bound_to_its_filters():
+    cursor = encode_cursor(NotebookQuery(title_prefix="beta"), 0, 10, 10)
+    with pytest.raises(ValueError, match="different filters"):
+        decode_cursor(cursor, NotebookQuery(title_prefix="gamma"))
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor("not a cursor", NotebookQuery())
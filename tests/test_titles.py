@@ -0,0 +1,62 @@
+"""Tests for resolving notebooks by approximate title."""
+import pytest
+
+from notebooklm_mcp.titles import AmbiguousNotebookError, TitleIndex, looks_like_notebook_id, normalize_title
+
+
+NOTEBOOK_ID = "0f4c2a3e-1b2c-4d5e-8f90-123456789abc"
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = TitleIndex(tmp_path / "notebook_titles.json")
+    index.update([
+        {"id": "nb-research", "title": "Quantum Computing Research"},
+        {"id": "nb-q3", "title": "Quarterly Report Q3"},
+        {"id": "nb-q4", "title": "Quarterly Report Q4"},
+        {"id": "nb-recipes", "title": "Family Recipes"},
+    ])
+    return index
+
+
+def test_normalize_title():
+    assert normalize_title("  Quarterly_Report: Q3!! ") == "quarterly report q3"
+
+
+def test_looks_like_notebook_id():
+    assert looks_like_notebook_id(NOTEBOOK_ID)
+    assert looks_like_notebook_id(f" {NOTEBOOK_ID.upper()} ")
+    assert not looks_like_notebook_id("Quarterly Report")
+
+
+def test_exact_title_scores_one(index):
+    assert index.search("family recipes")[0] == {"id": "nb-recipes", "title": "Family Recipes", "score": 1.0}
+
+
+def test_approximate_title_resolves(index):
+    assert index.resolve("quantum research") == "nb-research"
+    assert index.resolve("Recipes family") == "nb-recipes"
+
+
+def test_ids_pass_through(index):
+    assert index.resolve("nb-q3") == "nb-q3"
+    assert index.resolve(NOTEBOOK_ID) == NOTEBOOK_ID
+
+
+def test_close_matches_are_ambiguous(index):
+    with pytest.raises(AmbiguousNotebookError) as error:
+        index.resolve("quarterly report")
+    assert {match["id"] for match in error.value.matches} == {"nb-q3", "nb-q4"}
+    assert index.resolve("Quarterly Report Q4") == "nb-q4"
+
+
+def test_unknown_title(index):
+    with pytest.raises(ValueError, match="No known notebook"):
+        index.resolve("gardening")
+
+
+def test_renamed_notebook_is_reindexed(tmp_path, index):
+    index.update([{"id": "nb-recipes", "title": "Holiday Baking"}])
+    assert index.resolve("holiday baking") == "nb-recipes"
+    # Another instance reads the same file
+    assert TitleIndex(tmp_path / "notebook_titles.json").resolve("holiday baking") == "nb-recipes"